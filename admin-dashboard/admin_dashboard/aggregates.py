@@ -0,0 +1,51 @@
+"""Server-side aggregate queries for dashboard KPIs and charts.
+
+Each helper calls one of the ``admin_*`` SQL functions shipped in
+``migrations/001_dashboard_aggregates.sql`` and returns grouped counts, so the
+amount of data transferred does not depend on table size. Helpers raise on
+failure; wrap them in ``safe_query`` / ``safe_query_batch`` at the call site.
+Run and step log charts are assembled from time-bucketed tiles instead (see
+``tiles``).
+
+Results are cached briefly (``AGGREGATE_CACHE_TTL_SECONDS``, also the lifetime
+of open tiles) so the dashboard can be prewarmed (see ``warmup``).
+``window_start(days)`` is the start of the dashboard's rolling window, aligned
+to ``WINDOW_STEP_MINUTES`` so that it stays the same between reruns.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from supabase import Client
+
+from .cache import cached_query
+from .config import get_int_config
+
+AGGREGATE_TTL = get_int_config("AGGREGATE_CACHE_TTL_SECONDS", 60)
+
+# Minutes the start of a rolling window is rounded down to
+WINDOW_STEP_MINUTES = 5
+
+
+def window_start(days: int, now: Optional[datetime] = None) -> datetime:
+    """Return ``now - days`` rounded down to ``WINDOW_STEP_MINUTES``.
+
+    The result is naive UTC, like the datetimes ``tiles`` works with.
+    """
+    since = (now or datetime.now(timezone.utc).replace(tzinfo=None)) - timedelta(days=days)
+    return since.replace(
+        minute=since.minute - since.minute % WINDOW_STEP_MINUTES, second=0, microsecond=0
+    )
+
+
+def _rpc_rows(supabase: Client, function: str, params: Dict) -> List[Dict]:
+    result = supabase.rpc(function, params, get=True).execute()
+    return result.data or []
+
+
+@cached_query("business_subscriptions", ttl=AGGREGATE_TTL)
+def subscriptions_by_plan(_supabase: Client, status: str = "active") -> Dict[str, int]:
+    """Return ``{plan_code: subscription_count}`` for subscriptions in ``status``."""
+    rows = _rpc_rows(_supabase, "admin_subscriptions_by_plan", {"p_status": status})
+    return {r["plan_code"]: int(r["subscription_count"]) for r in rows}
+
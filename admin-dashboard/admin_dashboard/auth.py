@@ -2,7 +2,7 @@
 
 import streamlit as st
 
-from .supabase_utils import _get_config_value
+from .config import get_config_value as _get_config_value
 
 
 def render_login_page() -> None:
@@ -0,0 +1,282 @@
+"""Bulk tenant onboarding from CSV/XLSX files.
+
+Rows are validated in one vectorized pass (required fields, slug format,
+duplicate slugs within the file and against the cached business directory,
+known plan codes, ISO 8601 dates), then inserted in batches. When a batch is rejected it is
+retried row by row so errors are reported per row instead of failing the
+whole batch. Optional channel and subscription columns create the related rows
+for each new business in the same run, and caches are invalidated once at the
+end.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import IO, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from supabase import Client
+
+from .business_directory import BusinessDirectory
+from .cache import invalidate_tables
+
+BUSINESS_COLUMNS = [
+    "name",
+    "legal_name",
+    "slug",
+    "industry",
+    "country",
+    "city",
+    "area",
+    "address",
+    "whatsapp_number",
+    "phone",
+    "email",
+    "website",
+    "is_active",
+]
+
+# Values the single-business form prefills; blank cells get the same
+BUSINESS_DEFAULTS = {"country": "Pakistan"}
+
+# Optional columns that create a primary channel per business
+CHANNEL_COLUMNS = ["channel_type", "channel_identifier", "channel_provider"]
+
+# Optional columns that create a subscription per business
+SUBSCRIPTION_COLUMNS = ["plan_code", "subscription_status", "valid_from", "valid_to"]
+
+CHANNEL_TYPES = {"whatsapp", "sms", "email", "voice"}
+SUBSCRIPTION_STATUSES = {"active", "trial", "past_due", "cancelled"}
+
+_TRUE = {"", "true", "t", "yes", "y", "1"}
+_FALSE = {"false", "f", "no", "n", "0"}
+_SLUG_PATTERN = r"[a-z0-9]+(?:-[a-z0-9]+)*"
+
+
+@dataclass
+class ImportReport:
+    """Outcome of ``import_businesses``."""
+
+    created: int = 0
+    channels_created: int = 0
+    subscriptions_created: int = 0
+    # One {"row", "slug", "error"} entry per failed row (1-based file row)
+    errors: List[Dict] = field(default_factory=list)
+
+
+def read_upload(file: IO, filename: str) -> pd.DataFrame:
+    """Read an uploaded CSV or XLSX file as strings with normalized headers.
+
+    XLSX files need ``openpyxl``; a clear ``ValueError`` is raised without it.
+    """
+    if filename.lower().endswith((".xlsx", ".xls")):
+        try:
+            df = pd.read_excel(file, dtype=str)
+        except ImportError as e:
+            raise ValueError("Reading Excel files requires the openpyxl package") from e
+    else:
+        df = pd.read_csv(file, dtype=str, keep_default_na=False)
+
+    df.columns = [str(c).strip().lower().replace(" ", "_") for c in df.columns]
+    df = df.fillna("")
+    for col in df.columns:
+        df[col] = df[col].astype(str).str.strip()
+    df.index = pd.RangeIndex(1, len(df) + 1, name="row")
+    return df
+
+
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    return df[name] if name in df.columns else pd.Series("", index=df.index)
+
+
+def validate_businesses(
+    df: pd.DataFrame, directory: BusinessDirectory, plan_codes: Iterable[str]
+) -> pd.DataFrame:
+    """Return a copy of ``df`` with an ``error`` column ("" for valid rows).
+
+    All checks are vectorized over the whole frame; a row lists every problem
+    found, separated by "; ".
+    """
+    df = df.copy()
+    name = _column(df, "name")
+    slug = _column(df, "slug")
+    existing_slugs = {s.lower() for s in directory.slugs.values() if s}
+
+    checks = [
+        (name == "", "name is required"),
+        (slug == "", "slug is required"),
+        ((slug != "") & ~slug.str.fullmatch(_SLUG_PATTERN), "slug must be lowercase letters, digits and dashes"),
+        ((slug != "") & slug.str.lower().duplicated(keep=False), "slug is duplicated in the file"),
+        (slug.str.lower().isin(existing_slugs), "slug already exists"),
+    ]
+
+    is_active = _column(df, "is_active").str.lower()
+    checks.append((~is_active.isin(_TRUE | _FALSE), "is_active must be true/false"))
+    df["is_active"] = ~is_active.isin(_FALSE)
+
+    channel_type = _column(df, "channel_type").str.lower()
+    identifier = _column(df, "channel_identifier")
+    checks.append(((identifier != "") & ~channel_type.isin(CHANNEL_TYPES), "unknown channel_type"))
+
+    plan = _column(df, "plan_code")
+    status = _column(df, "subscription_status").str.lower()
+    checks.append(((plan != "") & ~plan.isin(set(plan_codes)), "unknown plan_code"))
+    checks.append(
+        ((plan != "") & (status != "") & ~status.isin(SUBSCRIPTION_STATUSES), "unknown subscription_status")
+    )
+    # One explicit format for every cell; an inferred one would come from the
+    # first row and reject rows written differently
+    for col in ("valid_from", "valid_to"):
+        raw = _column(df, col)
+        parsed = pd.to_datetime(raw.where(raw != ""), format="ISO8601", errors="coerce")
+        checks.append(((raw != "") & parsed.isna(), f"{col} must be an ISO date (YYYY-MM-DD)"))
+        df[col] = parsed.dt.date
+
+    messages = np.array([message for _, message in checks], dtype=object)
+    failed = np.column_stack([mask.to_numpy(dtype=bool) for mask, _ in checks])
+    df["error"] = ["; ".join(messages[row]) for row in failed]
+    return df
+
+
+def _chunks(rows: List[Dict], size: int) -> Iterable[List[Dict]]:
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+def _insert_rows(
+    supabase: Client, table: str, rows: List[Dict], on_error: Callable[[int, str], None]
+) -> List[Dict]:
+    """Insert ``rows`` in one request, falling back to one request per row.
+
+    Returns the inserted rows; ``on_error(index, message)`` is called for each
+    row (by position in ``rows``) that could not be inserted.
+    """
+    try:
+        return supabase.table(table).insert(rows).execute().data or []
+    except Exception as e:
+        if len(rows) == 1:
+            on_error(0, str(e))
+            return []
+    inserted: List[Dict] = []
+    for i, row in enumerate(rows):
+        try:
+            inserted.extend(supabase.table(table).insert(row).execute().data or [])
+        except Exception as e:
+            on_error(i, str(e))
+    return inserted
+
+
+def _value(row: Dict, col: str, default: Optional[str] = None) -> str:
+    """Return ``row[col]`` if it is a non-empty string, else ``default``.
+
+    ``default`` falls back to ``BUSINESS_DEFAULTS`` and then to "", matching
+    what the single-business form submits for a blank field.
+    """
+    value = row.get(col)
+    if isinstance(value, str) and value:
+        return value
+    return default if default is not None else BUSINESS_DEFAULTS.get(col, "")
+
+
+def import_businesses(
+    supabase: Client,
+    df: pd.DataFrame,
+    batch_size: int = 100,
+    create_channels: bool = True,
+    create_subscriptions: bool = True,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> ImportReport:
+    """Insert the valid rows of a ``validate_businesses`` frame in batches.
+
+    Rows with an ``error`` are skipped (the caller reports them). Businesses
+    get every ``BUSINESS_COLUMNS`` field, blanks filled like the
+    single-business form does (``BUSINESS_DEFAULTS``, else ""). For every
+    business created, a channel (``channel_identifier`` set) and a
+    subscription (``plan_code`` set) are created when enabled. Caches are
+    invalidated once at the end, even if a batch fails part-way.
+    """
+    report = ImportReport()
+    valid = df[df["error"] == ""]
+    records = [dict(r, row=i) for i, r in zip(valid.index, valid.to_dict("records"))]
+    now = datetime.now()
+
+    def error_handler(rows: List[Dict], prefix: str = "") -> Callable[[int, str], None]:
+        def on_error(i: int, message: str) -> None:
+            report.errors.append(
+                {"row": rows[i]["row"], "slug": rows[i]["slug"], "error": prefix + message}
+            )
+
+        return on_error
+
+    try:
+        for batch in _chunks(records, max(batch_size, 1)):
+            payload = [
+                {
+                    col: bool(r.get(col, True)) if col == "is_active" else _value(r, col)
+                    for col in BUSINESS_COLUMNS
+                }
+                for r in batch
+            ]
+            created = _insert_rows(supabase, "businesses", payload, error_handler(batch))
+            report.created += len(created)
+            ids = {b["slug"]: b["id"] for b in created}
+            done = [r for r in batch if r["slug"] in ids]
+
+            if create_channels:
+                channel_rows = [r for r in done if _value(r, "channel_identifier")]
+                channels = [
+                    {
+                        "business_id": ids[r["slug"]],
+                        "channel_type": _value(r, "channel_type").lower(),
+                        "identifier": _value(r, "channel_identifier"),
+                        "provider": _value(r, "channel_provider", "twilio"),
+                        "is_primary": True,
+                        "is_active": True,
+                    }
+                    for r in channel_rows
+                ]
+                if channels:
+                    report.channels_created += len(
+                        _insert_rows(
+                            supabase,
+                            "business_channels",
+                            channels,
+                            error_handler(channel_rows, "business created, channel failed: "),
+                        )
+                    )
+
+            if create_subscriptions:
+                sub_rows = [r for r in done if _value(r, "plan_code")]
+                default_from = now.date()
+                default_to = (now + timedelta(days=365)).date()
+                subscriptions = [
+                    {
+                        "business_id": ids[r["slug"]],
+                        "plan_code": r["plan_code"],
+                        "status": _value(r, "subscription_status", "active").lower(),
+                        "valid_from": (
+                            r["valid_from"] if pd.notna(r.get("valid_from")) else default_from
+                        ).isoformat(),
+                        "valid_to": (
+                            r["valid_to"] if pd.notna(r.get("valid_to")) else default_to
+                        ).isoformat(),
+                    }
+                    for r in sub_rows
+                ]
+                if subscriptions:
+                    report.subscriptions_created += len(
+                        _insert_rows(
+                            supabase,
+                            "business_subscriptions",
+                            subscriptions,
+                            error_handler(sub_rows, "business created, subscription failed: "),
+                        )
+                    )
+
+            if on_progress is not None:
+                on_progress(report.created)
+    finally:
+        if report.created:
+            invalidate_tables("businesses", "business_channels", "business_subscriptions")
+
+    return report
@@ -0,0 +1,140 @@
+"""Shared in-memory directory of businesses (id -> name/slug).
+
+Several pages used to query ``businesses`` just to turn IDs into names. The
+directory loads ``id, name, slug`` once into the tagged query cache (so any
+write that calls ``invalidate_tables("businesses")`` refreshes it) and offers
+O(1) lookups plus vectorized mapping for pandas Series. It also carries a
+sorted prefix index and a trigram index over names and slugs for typeahead
+search (see ``ui.business_picker``).
+"""
+
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import pandas as pd
+from supabase import Client
+
+from .cache import cached_query
+from .config import get_int_config
+from .supabase_utils import safe_query
+
+# Rows per request when loading the directory. Must not exceed PostgREST's
+# ``max_rows`` (1000 on Supabase by default): a shorter page ends the load.
+DIRECTORY_PAGE_SIZE = get_int_config("BUSINESS_DIRECTORY_PAGE_SIZE", 1000)
+
+
+class BusinessDirectory:
+    """Read-only snapshot of the ``businesses`` table's id, name and slug.
+
+    The cached instance is shared by every session; do not mutate it.
+    """
+
+    def __init__(self, rows: List[Dict]) -> None:
+        self.rows = rows
+        self.names: Dict[str, str] = {r["id"]: r.get("name") or "" for r in rows}
+        self.slugs: Dict[str, str] = {r["id"]: r.get("slug") or "" for r in rows}
+
+        # Search indexes: sorted (key, id) lists for prefix lookups via bisect,
+        # and trigram -> ids postings for substring lookups.
+        self._by_id: Dict[str, Dict] = {r["id"]: r for r in rows}
+        self._name_index = sorted((self.names[r["id"]].lower(), r["id"]) for r in rows)
+        self._slug_index = sorted((self.slugs[r["id"]].lower(), r["id"]) for r in rows)
+        self._trigram_index: Dict[str, Set[str]] = {}
+        for r in rows:
+            for text in (self.names[r["id"]].lower(), self.slugs[r["id"]].lower()):
+                for i in range(len(text) - 2):
+                    self._trigram_index.setdefault(text[i : i + 3], set()).add(r["id"])
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def name(self, business_id: Optional[str], default: str = "Unknown") -> str:
+        """Return the business name for ``business_id``."""
+        return self.names.get(business_id, default)
+
+    def slug(self, business_id: Optional[str], default: str = "") -> str:
+        """Return the business slug for ``business_id``."""
+        return self.slugs.get(business_id, default)
+
+    def map_names(self, ids: pd.Series) -> pd.Series:
+        """Map a Series of business IDs to names (unknown IDs become NaN)."""
+        return ids.map(self.names)
+
+    def map_slugs(self, ids: pd.Series) -> pd.Series:
+        """Map a Series of business IDs to slugs (unknown IDs become NaN)."""
+        return ids.map(self.slugs)
+
+    def search(self, text: str, limit: int = 20) -> List[Dict]:
+        """Return up to ``limit`` rows matching ``text`` (case-insensitive).
+
+        Name prefix matches rank first, then slug prefix matches, then
+        substring matches anywhere in the name or slug (found through the
+        trigram index for queries of three or more characters). An empty query
+        returns the first rows by name.
+        """
+        needle = text.strip().lower()
+        results: Dict[str, Dict] = {}
+
+        def take(ids: Iterator[str]) -> bool:
+            for business_id in ids:
+                results.setdefault(business_id, self._by_id[business_id])
+                if len(results) >= limit:
+                    return True
+            return False
+
+        if not needle:
+            take(business_id for _, business_id in self._name_index)
+        elif not (
+            take(self._prefix_matches(self._name_index, needle))
+            or take(self._prefix_matches(self._slug_index, needle))
+        ):
+            take(self._substring_matches(needle))
+        return list(results.values())
+
+    @staticmethod
+    def _prefix_matches(index: List[Tuple[str, str]], prefix: str) -> Iterator[str]:
+        for key, business_id in index[bisect_left(index, (prefix,)) :]:
+            if not key.startswith(prefix):
+                break
+            yield business_id
+
+    def _substring_matches(self, needle: str) -> Iterator[str]:
+        if len(needle) < 3:
+            candidates = self._by_id.keys()
+        else:
+            postings = sorted(
+                (self._trigram_index.get(needle[i : i + 3], set()) for i in range(len(needle) - 2)),
+                key=len,
+            )
+            candidates = set.intersection(*postings) if postings else set()
+        for business_id in sorted(candidates, key=lambda i: self.names[i].lower()):
+            if needle in self.names[business_id].lower() or needle in self.slugs[business_id].lower():
+                yield business_id
+
+
+@cached_query(
+    "businesses", ttl=get_int_config("BUSINESS_DIRECTORY_TTL_SECONDS", 600), shared=True
+)
+def get_business_directory(_supabase: Client) -> BusinessDirectory:
+    """Load (or return the cached) business directory; raises on query failure.
+
+    The table is read in keyset pages ordered by ``id``, since a single
+    request is capped at PostgREST's ``max_rows``.
+    """
+    rows: List[Dict] = []
+    while True:
+        query = _supabase.table("businesses").select("id, name, slug").order("id")
+        if rows:
+            query = query.gt("id", rows[-1]["id"])
+        page = query.limit(DIRECTORY_PAGE_SIZE).execute().data or []
+        rows.extend(page)
+        if len(page) < DIRECTORY_PAGE_SIZE:
+            return BusinessDirectory(rows)
+
+
+def load_business_directory(supabase: Client) -> BusinessDirectory:
+    """Return the cached directory, or an empty one if the query fails."""
+    directory = safe_query(
+        lambda: get_business_directory(supabase), "Failed to fetch businesses"
+    )
+    return directory if directory is not None else BusinessDirectory([])
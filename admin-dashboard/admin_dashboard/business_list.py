@@ -0,0 +1,69 @@
+"""Server-side filtered, keyset-paginated listing of ``businesses``.
+
+The Businesses page used to download every column of every matching business
+on each keystroke. Listings now project only the displayed columns and fetch
+one page at a time ordered by ``(created_at, id)``; the ``ilike`` filters are
+served by the trigram indexes in ``migrations/006_businesses_search_indexes.sql``.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from supabase import Client
+
+from .cache import cached_query
+from .pagination import KeysetCursor, fetch_keyset_page
+
+BUSINESS_LIST_COLUMNS = "id, name, slug, industry, city, whatsapp_number, is_active, created_at"
+
+# Characters with meaning in PostgREST filter syntax cannot be escaped inside
+# or_(), so they are dropped from search text.
+_RESERVED = set(",()%*\\")
+
+
+def search_filter(text: str) -> Optional[str]:
+    """Return an ``or_()`` clause matching ``text`` in name or slug, if any."""
+    needle = "".join(c for c in text.strip() if c not in _RESERVED)
+    return f"name.ilike.%{needle}%,slug.ilike.%{needle}%" if needle else None
+
+
+@dataclass(frozen=True)
+class BusinessFilters:
+    """Hashable filter spec for the business list."""
+
+    search: str = ""
+    city: str = ""
+    industry: str = ""
+    active_only: bool = False
+
+    def apply(self, query):
+        """Apply the filters to a PostgREST query builder."""
+        clause = search_filter(self.search)
+        if clause:
+            query = query.or_(clause)
+        if self.city:
+            query = query.ilike("city", f"%{self.city}%")
+        if self.industry:
+            query = query.ilike("industry", f"%{self.industry}%")
+        if self.active_only:
+            query = query.eq("is_active", True)
+        return query
+
+
+@cached_query("businesses", ttl=120)
+def count_businesses(_supabase: Client, filters: BusinessFilters) -> Optional[int]:
+    """Cached exact count of businesses matching ``filters``; raises on failure."""
+    query = filters.apply(_supabase.table("businesses").select("id", count="exact", head=True))
+    return query.execute().count
+
+
+@cached_query("businesses", ttl=60)
+def fetch_businesses_page(
+    _supabase: Client,
+    filters: BusinessFilters,
+    page_size: int,
+    cursor: Optional[KeysetCursor] = None,
+) -> Tuple[List[Dict], Optional[KeysetCursor]]:
+    """Fetch one page of businesses (newest first) after ``cursor``; raises on failure."""
+    query = filters.apply(_supabase.table("businesses").select(BUSINESS_LIST_COLUMNS))
+    return fetch_keyset_page(query, page_size, cursor, sort_column="created_at")
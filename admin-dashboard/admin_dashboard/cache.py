@@ -0,0 +1,296 @@
+"""Table-tagged query cache with per-entry TTL and a memory budget.
+
+``st.cache_data.clear()`` throws away every cached entry for every user, so a
+single write used to cold-start every query in the app. Entries in this cache
+are tagged with the tables they read; after a write, ``invalidate_tables``
+drops only the entries tagged with the written tables.
+
+Values are stored pickled by default: callers always get a private copy (like
+``st.cache_data``), and the pickled size is what counts against the per-entry
+and total memory limits. Read-only objects can be cached with ``shared=True``
+to skip the copy on every hit.
+
+With ``SHARED_CACHE_PATH`` set, ``cached_query`` results are also kept in a
+cross-process ``shared_cache.SharedCache``.
+"""
+
+import functools
+import inspect
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from .config import get_float_config, get_int_config
+from .instrumentation import record_cache
+from .shared_cache import SharedCache, from_config as _shared_cache_from_config
+from .singleflight import SingleFlight
+
+_MISSING = object()
+
+
+@dataclass
+class _Entry:
+    payload: Any
+    size: int
+    shared: bool
+    tags: FrozenSet[str]
+    expires_at: float
+
+
+class TaggedCache:
+    """Thread-safe LRU cache whose entries carry table tags and their own TTL."""
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._tag_index: Dict[str, Set[str]] = {}
+        self._size = 0
+        # Bumped by ``invalidate`` per tag and by ``clear`` for all tags, so a
+        # value computed before an invalidation is not stored after it
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+
+    def get(self, key: str) -> Any:
+        """Return the cached value for ``key`` or the ``_MISSING`` sentinel."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                return _MISSING
+            self._entries.move_to_end(key)
+        return entry.payload if entry.shared else pickle.loads(entry.payload)
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        tags: Iterable[str],
+        ttl: float,
+        max_entry_bytes: Optional[int] = None,
+        shared: bool = False,
+        generation: Optional[Tuple] = None,
+    ) -> bool:
+        """Store ``value``; returns False if it exceeds the entry size limit.
+
+        With ``shared=True`` the object itself is kept and handed to every
+        caller, so it must not be mutated. Pass the ``generation(tags)`` taken
+        before computing ``value`` to skip storing it (and return False) if
+        any of the tags was invalidated in the meantime.
+        """
+        pickled = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        limit = min(max_entry_bytes or self.max_entry_bytes, self.max_entry_bytes)
+        if len(pickled) > limit:
+            return False
+
+        entry = _Entry(
+            payload=value if shared else pickled,
+            size=len(pickled),
+            shared=shared,
+            tags=frozenset(tags),
+            expires_at=time.monotonic() + ttl,
+        )
+        with self._lock:
+            if generation is not None and generation != self._generation(entry.tags):
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._size += entry.size
+            for tag in entry.tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+            while self._size > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+        return True
+
+    def generation(self, tags: Iterable[str]) -> Tuple:
+        """Return a token that changes whenever any of ``tags`` is invalidated."""
+        with self._lock:
+            return self._generation(frozenset(tags))
+
+    def _generation(self, tags: FrozenSet[str]) -> Tuple:
+        return (self._epoch, tuple(sorted((t, self._generations.get(t, 0)) for t in tags)))
+
+    def invalidate(self, *tags: str) -> int:
+        """Drop every entry tagged with any of ``tags``; returns the count."""
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+            keys = set().union(*(self._tag_index.get(tag, set()) for tag in tags))
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._tag_index.clear()
+            self._size = 0
+
+    def stats(self) -> Tuple[int, int]:
+        """Return ``(entry_count, total_bytes)``."""
+        with self._lock:
+            return len(self._entries), self._size
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._size -= entry.size
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+
+query_cache = TaggedCache(
+    max_bytes=int(get_float_config("QUERY_CACHE_MAX_MB", 64) * 1024 * 1024),
+    max_entry_bytes=int(get_float_config("QUERY_CACHE_MAX_ENTRY_MB", 8) * 1024 * 1024),
+)
+
+DEFAULT_TTL = get_int_config("QUERY_CACHE_TTL_SECONDS", 300)
+
+# Other tagged caches (e.g. ``lookups.lookup_cache``) that writes must also
+# invalidate; see ``register_cache``.
+_extra_caches: List[TaggedCache] = []
+
+# Optional cross-process second level (see ``shared_cache``)
+_shared: Optional[SharedCache] = _shared_cache_from_config()
+
+# Concurrent misses of the same key compute once (see ``singleflight``)
+_flight = SingleFlight(timeout=get_float_config("QUERY_COALESCE_TIMEOUT_SECONDS", 60))
+
+
+def cached_query(
+    *tables: str,
+    ttl: Optional[float] = None,
+    max_entry_bytes: Optional[int] = None,
+    shared: bool = False,
+) -> Callable:
+    """Decorator caching a function's result in ``query_cache``, tagged by ``tables``.
+
+    As with ``st.cache_data``, parameters whose names start with an underscore
+    (e.g. ``_supabase``) are not part of the cache key. Exceptions propagate and
+    are never cached, so decorated functions should raise rather than swallow
+    query errors; callers wrap them in ``safe_query``. ``shared=True`` returns
+    the cached object itself instead of a copy (for read-only results).
+
+    Concurrent misses of the same key (e.g. several sessions opening the same
+    page) share one computation; the other callers wait for it.
+
+    With a shared cache configured, misses are looked up there before calling
+    ``func`` and results are stored there too. Keys then carry the shared
+    versions of ``tables``, so writes in any process invalidate them.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        prefix = f"{func.__module__}.{func.__qualname__}"
+
+        def make_key(args, kwargs) -> Tuple[str, Optional[SharedCache]]:
+            """Return the cache key and the shared cache to use with it, if any.
+
+            Without readable shared versions the key is the plain local one
+            and the shared layer is skipped.
+            """
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key_args = [(k, v) for k, v in bound.arguments.items() if not k.startswith("_")]
+            key = f"{prefix}:{key_args!r}"
+            shared_cache = _shared
+            stamp = shared_cache.version_stamp(tables) if shared_cache else None
+            if stamp is None:
+                return key, None
+            return f"{key}@{stamp}", shared_cache
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            key, shared_cache = make_key(args, kwargs)
+            value = query_cache.get(key)
+            outcome = "hit" if value is not _MISSING else "miss"
+            if value is _MISSING:
+                entry_ttl = DEFAULT_TTL if ttl is None else ttl
+
+                def compute() -> Any:
+                    nonlocal outcome
+                    # Taken first: a write during ``func`` keeps its result uncached
+                    generation = query_cache.generation(tables)
+                    found = shared_cache.get(key) if shared_cache else None
+                    if found is not None:
+                        # Keep the shared entry's expiry rather than restarting it
+                        result, remaining = found
+                        outcome = "shared"
+                    else:
+                        result, remaining = func(*args, **kwargs), entry_ttl
+                        if shared_cache:
+                            shared_cache.set(key, result, entry_ttl)
+                    query_cache.set(
+                        key,
+                        result,
+                        tags=tables,
+                        ttl=remaining,
+                        max_entry_bytes=max_entry_bytes,
+                        shared=shared,
+                        generation=generation,
+                    )
+                    return result
+
+                value, leader = _flight.do(key, compute)
+                if not leader and not shared:
+                    # Followers get their own copy from the cache, like a hit;
+                    # results too large to cache are computed separately.
+                    value = query_cache.get(key)
+                    if value is _MISSING:
+                        value = func(*args, **kwargs)
+            record_cache(func.__qualname__, outcome, (time.perf_counter() - started) * 1000)
+            return value
+
+        def peek(*args, **kwargs):
+            """Return the cached value without computing it (``None`` when cold)."""
+            value = query_cache.get(make_key(args, kwargs)[0])
+            return None if value is _MISSING else value
+
+        wrapper.peek = peek
+        wrapper.tables = tables
+        return wrapper
+
+    return decorator
+
+
+def register_cache(cache: TaggedCache) -> TaggedCache:
+    """Have ``invalidate_tables`` and ``clear_caches`` also cover ``cache``."""
+    _extra_caches.append(cache)
+    return cache
+
+
+def set_shared_cache(shared_cache: Optional[SharedCache]) -> None:
+    """Install (or with ``None`` remove) the cross-process second-level cache."""
+    global _shared
+    _shared = shared_cache
+
+
+def invalidate_tables(*tables: str) -> int:
+    """Invalidate cached queries that read any of ``tables`` (call after writes).
+
+    The tables' shared versions are bumped too, which invalidates them in
+    every process.
+    """
+    if _shared is not None:
+        _shared.invalidate(tables)
+    return sum(cache.invalidate(*tables) for cache in [query_cache, *_extra_caches])
+
+
+def clear_caches() -> None:
+    """Drop every entry of ``query_cache``, the registered and shared caches."""
+    if _shared is not None:
+        _shared.clear()
+    for cache in [query_cache, *_extra_caches]:
+        cache.clear()
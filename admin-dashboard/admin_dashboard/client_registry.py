@@ -0,0 +1,193 @@
+"""Process-wide registry of pooled Supabase clients.
+
+Streamlit re-executes ``app.py`` on every widget interaction, so building a new
+client per rerun means new HTTP sessions and TLS handshakes each time. The
+registry keeps one client per ``(url, key, settings)`` for the lifetime of the
+server process, backed by a keep-alive ``httpx`` connection pool, and
+periodically health-checks it so a dead pool is rebuilt instead of reused.
+
+The probe runs outside the registry lock, so a slow Supabase never blocks
+other sessions' ``get()``; they keep using the current client meanwhile. A
+replaced client is closed only after a grace period, because other sessions
+and query-pool threads may still be using it.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+import httpx
+from supabase import Client, ClientOptions, create_client
+
+from .instrumentation import event_hooks
+from .singleflight import CoalescingTransport
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """Connection pool and timeout settings for the shared HTTP client."""
+
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    healthcheck_interval: float = 60.0
+    coalesce_requests: bool = True
+
+    @classmethod
+    def from_config(cls, get_value: Callable[[str], Optional[str]]) -> "PoolSettings":
+        """Build settings from configuration, falling back to defaults.
+
+        ``get_value`` is a config resolver such as
+        ``supabase_utils._get_config_value``. Invalid numbers are ignored.
+        """
+
+        def _number(name: str, default: float, cast: Callable = float):
+            raw = get_value(name)
+            if raw in (None, ""):
+                return default
+            try:
+                return cast(raw)
+            except (TypeError, ValueError):
+                logger.warning("Ignoring invalid %s=%r", name, raw)
+                return default
+
+        def _flag(name: str, default: bool) -> bool:
+            raw = get_value(name)
+            if raw in (None, ""):
+                return default
+            return raw.strip().lower() not in ("0", "false", "no", "off")
+
+        return cls(
+            max_connections=_number("SUPABASE_POOL_MAX_CONNECTIONS", cls.max_connections, int),
+            max_keepalive_connections=_number(
+                "SUPABASE_POOL_MAX_KEEPALIVE", cls.max_keepalive_connections, int
+            ),
+            keepalive_expiry=_number("SUPABASE_POOL_KEEPALIVE_EXPIRY", cls.keepalive_expiry),
+            connect_timeout=_number("SUPABASE_CONNECT_TIMEOUT", cls.connect_timeout),
+            read_timeout=_number("SUPABASE_READ_TIMEOUT", cls.read_timeout),
+            healthcheck_interval=_number(
+                "SUPABASE_HEALTHCHECK_INTERVAL", cls.healthcheck_interval
+            ),
+            coalesce_requests=_flag("SUPABASE_COALESCE_REQUESTS", cls.coalesce_requests),
+        )
+
+
+class _PooledClient:
+    """A Supabase client together with the HTTP pool it runs on."""
+
+    def __init__(self, url: str, key: str, settings: PoolSettings) -> None:
+        self.url = url.rstrip("/")
+        self.key = key
+        transport: httpx.BaseTransport = httpx.HTTPTransport(
+            limits=httpx.Limits(
+                max_connections=settings.max_connections,
+                max_keepalive_connections=settings.max_keepalive_connections,
+                keepalive_expiry=settings.keepalive_expiry,
+            ),
+            http2=True,
+        )
+        if settings.coalesce_requests:
+            # Identical concurrent GETs from different sessions share one request
+            transport = CoalescingTransport(
+                transport, timeout=settings.connect_timeout + settings.read_timeout
+            )
+        self.http_client = httpx.Client(
+            transport=transport,
+            timeout=httpx.Timeout(settings.read_timeout, connect=settings.connect_timeout),
+            follow_redirects=True,
+            event_hooks=event_hooks(),
+        )
+        self.client = create_client(url, key, options=ClientOptions(httpx_client=self.http_client))
+        self.last_checked = time.monotonic()
+        # Set while one thread probes the pool, so others don't probe too
+        self.checking = False
+        # Long enough for requests already in flight on it to finish
+        self.grace_period = 2 * (settings.connect_timeout + settings.read_timeout)
+
+    def is_healthy(self) -> bool:
+        """Return True if PostgREST answers over the pooled connection."""
+        try:
+            response = self.http_client.head(
+                f"{self.url}/rest/v1/",
+                headers={"apikey": self.key, "Authorization": f"Bearer {self.key}"},
+            )
+        except httpx.HTTPError as e:
+            logger.warning("Supabase health check failed: %s", e)
+            return False
+        finally:
+            self.last_checked = time.monotonic()
+        return response.status_code < 500
+
+    def close(self) -> None:
+        try:
+            self.http_client.close()
+        except Exception:  # pragma: no cover - best effort cleanup
+            pass
+
+    def retire(self) -> None:
+        """Close the client after ``grace_period`` seconds, in the background."""
+        timer = threading.Timer(self.grace_period, self.close)
+        timer.daemon = True
+        timer.start()
+
+
+class ClientRegistry:
+    """Thread-safe, process-wide cache of pooled Supabase clients."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str, PoolSettings], _PooledClient] = {}
+
+    def get(self, url: str, key: str, settings: PoolSettings) -> Client:
+        """Return the shared client for ``url``/``key``, creating it on first use.
+
+        Once ``settings.healthcheck_interval`` seconds have passed since the last
+        check, the calling thread probes the pool (without holding the lock)
+        and replaces it if it is unhealthy. The old client is retired, not
+        closed, so requests still using it can finish.
+        """
+        registry_key = (url, key, settings)
+        with self._lock:
+            entry = self._entries.get(registry_key)
+            if entry is None:
+                entry = self._entries[registry_key] = _PooledClient(url, key, settings)
+                return entry.client
+            due = time.monotonic() - entry.last_checked >= settings.healthcheck_interval
+            if not due or entry.checking:
+                return entry.client
+            entry.checking = True
+
+        try:
+            healthy = entry.is_healthy()
+        finally:
+            entry.checking = False
+        if healthy:
+            return entry.client
+
+        logger.info("Rebuilding unhealthy Supabase client pool")
+        replacement = _PooledClient(url, key, settings)
+        with self._lock:
+            current = self._entries.get(registry_key)
+            if current is not None and current is not entry:
+                # Another thread already replaced it
+                replacement.close()
+                return current.client
+            self._entries[registry_key] = replacement
+        entry.retire()
+        return replacement.client
+
+    def close_all(self) -> None:
+        """Close every pooled client (used on shutdown and in maintenance)."""
+        with self._lock:
+            for entry in self._entries.values():
+                entry.close()
+            self._entries.clear()
+
+
+registry = ClientRegistry()
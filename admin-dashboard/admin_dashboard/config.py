@@ -0,0 +1,88 @@
+"""Configuration resolution for the admin dashboard.
+
+Values come from Streamlit secrets first, then the process environment (which
+may be populated from a local ``.env`` file).
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+from dotenv import load_dotenv
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables from a .env file (if present).
+# Checks both the admin-dashboard directory and the monorepo root directory.
+# In production you should prefer real environment variables or Streamlit secrets;
+# this is mainly for local development.
+_current_dir = Path(__file__).parent.parent  # admin-dashboard directory
+_root_dir = _current_dir.parent  # monorepo root directory
+
+# Try loading from root first, then fall back to admin-dashboard directory
+load_dotenv(dotenv_path=_root_dir / ".env", override=False)
+load_dotenv(dotenv_path=_current_dir / ".env", override=False)
+
+
+def get_config_value(name: str) -> Optional[str]:
+    """Return configuration value from Streamlit secrets or environment.
+
+    Order of precedence:
+    1. ``st.secrets[name]`` if available
+    2. ``os.environ[name]`` (which may have been populated by ``.env``)
+    """
+
+    # 1) Streamlit secrets (e.g. for Streamlit Cloud or secret-managed envs)
+    try:
+        if hasattr(st, "secrets") and name in st.secrets:
+            value = st.secrets[name]
+            return str(value) if value is not None else None
+    except (RuntimeError, AttributeError):
+        # If not in Streamlit context or secrets are misconfigured, fall back to environment.
+        pass
+    except Exception:
+        # Other exceptions, fall back to environment
+        pass
+
+    # 2) Plain environment variables (including those loaded from .env)
+    return os.environ.get(name)
+
+
+def get_int_config(name: str, default: int) -> int:
+    """Return an integer setting, or ``default`` if unset or invalid."""
+    raw = get_config_value(name)
+    if raw in (None, ""):
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        logger.warning("Ignoring invalid %s=%r", name, raw)
+        return default
+
+
+def get_float_config(name: str, default: float) -> float:
+    """Return a float setting, or ``default`` if unset or invalid."""
+    raw = get_config_value(name)
+    if raw in (None, ""):
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        logger.warning("Ignoring invalid %s=%r", name, raw)
+        return default
+
+
+def get_bool_config(name: str, default: bool) -> bool:
+    """Return a boolean setting ("1/true/yes/on" or "0/false/no/off")."""
+    raw = get_config_value(name)
+    if raw in (None, ""):
+        return default
+    value = raw.strip().lower()
+    if value in ("1", "true", "yes", "on"):
+        return True
+    if value in ("0", "false", "no", "off"):
+        return False
+    logger.warning("Ignoring invalid %s=%r", name, raw)
+    return default
@@ -0,0 +1,164 @@
+"""Streaming exports of filtered workflow runs to gzip CSV or Parquet.
+
+Exports page through the whole filtered range with keyset pagination and write
+each page to a file as soon as it arrives, so peak memory is about one page
+no matter how many runs match. Streamlit serves downloads from memory, so
+files are capped at ``EXPORT_MAX_MB``: an export stops after the page that
+reaches the cap and reports itself as truncated.
+
+Files are written to ``EXPORT_DIR``. Sessions delete their own file when they
+export again or change filters; files left behind by abandoned sessions are
+swept on the next export once they are older than ``EXPORT_TTL_SECONDS``.
+"""
+
+import gzip
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import pandas as pd
+from supabase import Client
+
+from .business_directory import BusinessDirectory
+from .config import get_config_value, get_float_config, get_int_config
+from .pagination import fetch_keyset_page
+from .run_cache import RunFilters
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow ships with Streamlit
+    pa = pq = None
+
+EXPORT_DIR = Path(
+    get_config_value("EXPORT_DIR") or Path(tempfile.gettempdir()) / "admin-dashboard-exports"
+)
+EXPORT_TTL_SECONDS = get_int_config("EXPORT_TTL_SECONDS", 3600)
+EXPORT_MAX_MB = get_float_config("EXPORT_MAX_MB", 100)
+
+EXPORT_FORMATS: Dict[str, str] = {"CSV (gzip)": ".csv.gz"}
+if pq is not None:
+    EXPORT_FORMATS["Parquet"] = ".parquet"
+
+
+def _flatten(df: pd.DataFrame) -> pd.DataFrame:
+    """Serialize nested JSON values (dicts/lists) so every cell is scalar."""
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].map(
+                lambda v: json.dumps(v) if isinstance(v, (dict, list)) else v
+            )
+    return df
+
+
+def _parquet_schema(df: pd.DataFrame) -> "pa.Schema":
+    """Derive the file schema from the first page."""
+    fields = []
+    for col in df.columns:
+        if df[col].isna().all():
+            fields.append(pa.field(col, pa.string()))
+        elif pd.api.types.is_bool_dtype(df[col]):
+            fields.append(pa.field(col, pa.bool_()))
+        elif pd.api.types.is_numeric_dtype(df[col]):
+            # Integers become float64 so later pages with nulls still fit.
+            fields.append(pa.field(col, pa.float64()))
+        else:
+            fields.append(pa.field(col, pa.string()))
+    return pa.schema(fields)
+
+
+def _to_arrow(df: pd.DataFrame, schema: "pa.Schema") -> "pa.Table":
+    """Coerce a page to the file schema fixed by the first page."""
+    df = df.reindex(columns=schema.names)
+    for f in schema:
+        # String columns take whatever later pages hold (e.g. numbers in a
+        # column that was all-null on the first page).
+        if f.type == pa.string():
+            df[f.name] = df[f.name].where(df[f.name].isna(), df[f.name].astype(str))
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False, safe=False)
+
+
+def sweep_exports(max_age: float = EXPORT_TTL_SECONDS) -> int:
+    """Delete export files older than ``max_age`` seconds; returns the count."""
+    cutoff = time.time() - max_age
+    removed = 0
+    for path in EXPORT_DIR.glob("workflow_runs_*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def export_runs(
+    supabase: Client,
+    filters: RunFilters,
+    suffix: str = ".csv.gz",
+    columns: str = "*",
+    page_size: int = 1000,
+    directory: Optional[BusinessDirectory] = None,
+    on_progress: Optional[Callable[[int], None]] = None,
+    max_bytes: Optional[int] = None,
+) -> Tuple[Path, int, bool]:
+    """Write every run matching ``filters`` to a new file in ``EXPORT_DIR``.
+
+    ``suffix`` selects the format (see ``EXPORT_FORMATS``). When ``directory``
+    is given a ``business_name`` column is added. ``on_progress`` is called
+    with the number of rows written after each page. Writing stops once the
+    file reaches ``max_bytes`` (default ``EXPORT_MAX_MB``). The caller owns
+    the returned file and should delete it when done. Returns
+    ``(path, rows, truncated)``; a Parquet export with no rows leaves an empty
+    file. Raises on query failure, after removing the partial file.
+    """
+    if max_bytes is None:
+        max_bytes = int(EXPORT_MAX_MB * 1024 * 1024)
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    sweep_exports()
+    fd, name = tempfile.mkstemp(prefix="workflow_runs_", suffix=suffix, dir=EXPORT_DIR)
+    os.close(fd)
+    path = Path(name)
+
+    writer = None
+    csv_file = gzip.open(path, "wt", newline="") if suffix == ".csv.gz" else None
+    written = 0
+    cursor = None
+    truncated = False
+    try:
+        try:
+            while True:
+                query = filters.apply(supabase.table("workflow_runs").select(columns))
+                rows, cursor = fetch_keyset_page(query, page_size, cursor, sort_column="start_time")
+                if rows:
+                    df = _flatten(pd.DataFrame(rows))
+                    if directory is not None and "business_id" in df.columns:
+                        df["business_name"] = directory.map_names(df["business_id"])
+                    if csv_file is not None:
+                        df.to_csv(csv_file, index=False, header=written == 0)
+                    else:
+                        if writer is None:
+                            writer = pq.ParquetWriter(path, _parquet_schema(df), compression="zstd")
+                        writer.write_table(_to_arrow(df, writer.schema))
+                    written += len(rows)
+                    if on_progress is not None:
+                        on_progress(written)
+                if cursor is None:
+                    break
+                # Compressed bytes still buffered are not counted; the cap is approximate
+                if path.stat().st_size >= max_bytes:
+                    truncated = True
+                    break
+        finally:
+            if csv_file is not None:
+                csv_file.close()
+            if writer is not None:
+                writer.close()
+    except Exception:
+        path.unlink(missing_ok=True)
+        raise
+
+    return path, written, truncated
@@ -0,0 +1,236 @@
+"""Per-query timing, size and cache statistics for the performance panel.
+
+Every PostgREST request made through the pooled HTTP client is recorded by
+``httpx`` event hooks (see ``client_registry``): table or RPC name, filters,
+wall time, rows (from ``Content-Range``), response bytes and status. Every
+``@cached_query`` call records a cache hit or miss. Records go to:
+
+- the log of the current render (a ``ContextVar`` set by ``start_render``),
+  shown as "slowest queries" in the sidebar;
+- rolling per-signature windows for p50/p95, where a signature is the method,
+  table and filter operators without their values;
+- optionally a JSONL file (``QUERY_LOG_PATH``), written by a background
+  thread so query threads never wait on disk.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+import httpx
+import numpy as np
+
+from .config import get_config_value, get_int_config
+
+# Durations kept per signature for the rolling percentiles
+WINDOW_SIZE = get_int_config("QUERY_STATS_WINDOW", 500)
+MAX_SIGNATURES = 500
+
+# Query parameters that shape the response rather than filter rows
+_NON_FILTER_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+@dataclass
+class QueryRecord:
+    """One HTTP query or cached-query call."""
+
+    signature: str
+    source: str  # "http" or "cache"
+    duration_ms: float
+    table: str = ""
+    filters: str = ""
+    rows: Optional[int] = None
+    bytes: Optional[int] = None
+    status: Optional[int] = None
+    cache: Optional[str] = None  # "hit" / "shared" / "miss" for cached queries
+    coalesced: bool = False  # joined an identical request already in flight
+    timestamp: float = field(default_factory=time.time)
+
+
+@dataclass
+class RenderLog:
+    """Records collected during one script run of one session."""
+
+    page: str
+    started: float = field(default_factory=time.perf_counter)
+    records: List[QueryRecord] = field(default_factory=list)
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+
+_current_render: contextvars.ContextVar[Optional[RenderLog]] = contextvars.ContextVar(
+    "current_render", default=None
+)
+
+_lock = threading.Lock()
+_windows: "OrderedDict[str, Deque[float]]" = OrderedDict()
+_log_path = get_config_value("QUERY_LOG_PATH") or None
+
+
+def _query_logger(path: Optional[str]) -> Optional[logging.Logger]:
+    """Logger whose records are queued and appended to ``path`` by one writer thread."""
+    if not path:
+        return None
+    lines: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = logging.FileHandler(path, encoding="utf-8", delay=True)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(lines, handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    query_log = logging.getLogger(f"{__name__}.query_log")
+    query_log.setLevel(logging.INFO)
+    query_log.propagate = False
+    query_log.handlers = [logging.handlers.QueueHandler(lines)]
+    return query_log
+
+
+_query_log = _query_logger(_log_path)
+
+
+def start_render(page: str) -> RenderLog:
+    """Start collecting the queries of this script run; returns its log."""
+    render = RenderLog(page=page)
+    _current_render.set(render)
+    return render
+
+
+def record(entry: QueryRecord) -> None:
+    """Add ``entry`` to the current render, the rolling stats and the JSONL log."""
+    render = _current_render.get()
+    if render is not None:
+        render.records.append(entry)
+
+    with _lock:
+        window = _windows.get(entry.signature)
+        if window is None:
+            window = _windows[entry.signature] = deque(maxlen=WINDOW_SIZE)
+            while len(_windows) > MAX_SIGNATURES:
+                _windows.popitem(last=False)
+        else:
+            _windows.move_to_end(entry.signature)
+        window.append(entry.duration_ms)
+
+    if _query_log is not None:
+        line = dict(asdict(entry), page=render.page if render else None)
+        _query_log.info(json.dumps(line))
+
+
+def signature_stats() -> List[Dict]:
+    """Return count, p50, p95 and max (ms) per signature, slowest p95 first."""
+    with _lock:
+        windows = {sig: np.fromiter(w, dtype=float) for sig, w in _windows.items()}
+    stats = [
+        {
+            "signature": sig,
+            "count": len(values),
+            "p50_ms": float(np.percentile(values, 50)),
+            "p95_ms": float(np.percentile(values, 95)),
+            "max_ms": float(values.max()),
+        }
+        for sig, values in windows.items()
+        if len(values)
+    ]
+    return sorted(stats, key=lambda s: s["p95_ms"], reverse=True)
+
+
+def reset_stats() -> None:
+    with _lock:
+        _windows.clear()
+
+
+def _describe_request(request: httpx.Request) -> Tuple[str, str, str]:
+    """Return ``(table, filters, signature)`` for a PostgREST request."""
+    path = request.url.path
+    marker = "/rest/v1/"
+    table = path.split(marker, 1)[1] if marker in path else path
+    table = table.replace("rpc/", "rpc:", 1)
+
+    filters = []
+    operators = []
+    for name, value in parse_qsl(request.url.query.decode(), keep_blank_values=True):
+        if name in _NON_FILTER_PARAMS:
+            continue
+        if table.startswith("rpc:"):
+            # GET RPC arguments are values, not filters
+            operators.append(name)
+        else:
+            operator = value.split(".", 1)[0] if name not in ("or", "and") else "(...)"
+            operators.append(f"{name}.{operator}")
+        filters.append(f"{name}={value[:80]}")
+
+    signature = f"{request.method} {table}"
+    if operators:
+        signature += " ?" + "&".join(sorted(operators))
+    return table, "&".join(filters), signature
+
+
+def _on_request(request: httpx.Request) -> None:
+    request.extensions["query_started"] = time.perf_counter()
+
+
+def _on_response(response: httpx.Response) -> None:
+    started = response.request.extensions.get("query_started")
+    if started is None:
+        return
+    # Callers read the whole body anyway; reading it here makes the timing
+    # and the byte count cover the transfer.
+    response.read()
+    duration_ms = (time.perf_counter() - started) * 1000
+
+    rows = None
+    content_range = response.headers.get("content-range", "")
+    span = content_range.split("/", 1)[0]
+    if "-" in span:
+        first, last = span.split("-", 1)
+        if first.isdigit() and last.isdigit():
+            rows = int(last) - int(first) + 1
+    elif span == "*":
+        rows = 0
+
+    table, filters, signature = _describe_request(response.request)
+    record(
+        QueryRecord(
+            signature=signature,
+            source="http",
+            duration_ms=duration_ms,
+            table=table,
+            filters=filters,
+            rows=rows,
+            bytes=response.num_bytes_downloaded or len(response.content),
+            status=response.status_code,
+            coalesced=bool(response.extensions.get("coalesced")),
+        )
+    )
+
+
+def event_hooks() -> Dict[str, list]:
+    """``httpx`` event hooks that record every request made by a client."""
+    return {"request": [_on_request], "response": [_on_response]}
+
+
+def record_cache(name: str, outcome: str, duration_ms: float) -> None:
+    """Record a ``@cached_query`` call of ``name``.
+
+    ``outcome`` is "hit", "shared" (found in the cross-process cache) or
+    "miss". Each gets its own signature so their percentiles don't mix.
+    """
+    record(
+        QueryRecord(
+            signature=f"cache {name} ({outcome})",
+            source="cache",
+            duration_ms=duration_ms,
+            cache=outcome,
+        )
+    )
@@ -0,0 +1,120 @@
+"""Batched lookups of rows by ID for arbitrarily long ID lists.
+
+Pages used to resolve foreign keys with a single ``.in_("id", ids)`` query
+built from every ID on screen. Long lists overflow PostgREST/proxy URL limits
+and fail outright, and duplicate IDs were sent as-is. ``fetch_by_ids``
+deduplicates the IDs, serves the ones seen recently from a small tagged LRU
+(``lookup_cache``, invalidated with the table like every other cache), splits
+the rest into URL-safe chunks and fetches the chunks concurrently on the
+shared query pool.
+"""
+
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+from urllib.parse import quote
+
+import pandas as pd
+from supabase import Client
+
+from .cache import _MISSING, TaggedCache, register_cache
+from .config import get_float_config, get_int_config
+from .supabase_utils import _in_query_pool, _submit
+
+# Budget for the encoded ``in.(...)`` filter value; URLs are typically capped
+# around 8 KB by PostgREST's proxy, and the rest of the query needs room too.
+MAX_FILTER_CHARS = get_int_config("LOOKUP_MAX_FILTER_CHARS", 4000)
+
+# Never ask for more IDs per request than PostgREST returns rows (max-rows)
+MAX_CHUNK_IDS = get_int_config("LOOKUP_MAX_CHUNK_IDS", 500)
+
+LOOKUP_TTL = get_int_config("LOOKUP_CACHE_TTL_SECONDS", 300)
+
+lookup_cache = register_cache(
+    TaggedCache(
+        max_bytes=int(get_float_config("LOOKUP_CACHE_MAX_MB", 4) * 1024 * 1024),
+        max_entry_bytes=64 * 1024,
+    )
+)
+
+
+def _cache_key(table: str, columns: str, row_id: Hashable) -> str:
+    return f"{table}:{columns}:{row_id!r}"
+
+
+def chunk_ids(
+    ids: Iterable[Any],
+    max_chars: int = MAX_FILTER_CHARS,
+    max_ids: int = MAX_CHUNK_IDS,
+) -> List[List[Any]]:
+    """Split ``ids`` into lists whose encoded ``in.(...)`` value fits ``max_chars``."""
+    chunks: List[List[Any]] = []
+    current: List[Any] = []
+    length = 0
+    for row_id in ids:
+        # Value plus its URL-encoded comma separator (%2C)
+        size = len(quote(str(row_id), safe="")) + 3
+        if current and (length + size > max_chars or len(current) >= max_ids):
+            chunks.append(current)
+            current, length = [], 0
+        current.append(row_id)
+        length += size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def fetch_by_ids(
+    supabase: Client,
+    table: str,
+    ids: Iterable[Any],
+    columns: str = "id, name",
+    id_column: str = "id",
+) -> Dict[Any, Dict]:
+    """Return ``{id: row}`` for the rows of ``table`` whose ``id_column`` is in ``ids``.
+
+    ``columns`` must include ``id_column``. Missing (``None``/NaN) and
+    duplicate IDs are ignored; IDs with no row are absent from the result (and remembered as
+    missing until the cache entry expires). Raises on query failure, so callers
+    wrap it in ``safe_query``.
+    """
+    wanted = list(dict.fromkeys(i for i in ids if pd.notna(i)))
+    found: Dict[Any, Dict] = {}
+    pending: List[Any] = []
+    for row_id in wanted:
+        row = lookup_cache.get(_cache_key(table, columns, row_id))
+        if row is _MISSING:
+            pending.append(row_id)
+        elif row is not None:
+            found[row_id] = row
+
+    if not pending:
+        return found
+    generation = lookup_cache.generation((table,))
+
+    def fetch_chunk(chunk: List[Any]) -> List[Dict]:
+        query = supabase.table(table).select(columns).in_(id_column, chunk)
+        return query.execute().data or []
+
+    chunks = chunk_ids(pending)
+    # Pool threads run chunks inline: waiting on the pool from inside it could
+    # deadlock once every worker is blocked the same way.
+    if len(chunks) == 1 or _in_query_pool():
+        results = [fetch_chunk(chunk) for chunk in chunks]
+    else:
+        futures = [_submit(fetch_chunk, chunk) for chunk in chunks]
+        results = [future.result() for future in futures]
+
+    fetched: Dict[Any, Optional[Dict]] = dict.fromkeys(pending)
+    for rows in results:
+        for row in rows:
+            fetched[row[id_column]] = row
+    for row_id, row in fetched.items():
+        lookup_cache.set(
+            _cache_key(table, columns, row_id),
+            row,
+            tags=(table,),
+            ttl=LOOKUP_TTL,
+            generation=generation,
+        )
+        if row is not None:
+            found[row_id] = row
+    return found
@@ -1 +1,52 @@
-"""Page modules for the admin dashboard Streamlit app."""
+"""Page modules for the admin dashboard Streamlit app.
+
+Pages are registered here by navigation label and imported on first use, so
+a page's heavy dependencies (e.g. ``plotly`` for the dashboard) are only paid
+for when someone opens it.
+"""
+
+import importlib
+import sys
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+from .. import startup
+
+
+@dataclass(frozen=True)
+class PageSpec:
+    """A navigation entry and the function that renders it."""
+
+    label: str
+    module: str
+    function: str
+
+
+PAGES: List[PageSpec] = [
+    PageSpec("📊 Dashboard", "dashboard", "render_dashboard_page"),
+    PageSpec("🏢 Businesses", "businesses", "render_businesses_page"),
+    PageSpec("📦 Plans & Modules", "plans_modules", "render_plans_modules_page"),
+    PageSpec("🔄 Workflow Runs", "workflow_runs", "render_workflow_runs_page"),
+    PageSpec("📝 Workflow Step Logs", "step_logs", "render_step_logs_page"),
+    PageSpec("🛒 Vertical Data", "vertical_data", "render_vertical_data_page"),
+]
+
+PAGE_LABELS: List[str] = [page.label for page in PAGES]
+
+_BY_LABEL: Dict[str, PageSpec] = {page.label: page for page in PAGES}
+
+
+def load_page(label: str) -> Callable[..., None]:
+    """Return the ``render_*_page(supabase)`` function for ``label``.
+
+    The page module is imported on the first call (and its import time
+    recorded in the startup report); later calls hit ``sys.modules``.
+    """
+    spec = _BY_LABEL[label]
+    name = f"{__name__}.{spec.module}"
+    if name in sys.modules:
+        module = sys.modules[name]
+    else:
+        with startup.timed(f"import page {spec.module}"):
+            module = importlib.import_module(name)
+    return getattr(module, spec.function)
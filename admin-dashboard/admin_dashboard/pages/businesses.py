@@ -1,20 +1,35 @@
 """Businesses page for the admin dashboard Streamlit app."""
 
 import json
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import pandas as pd
 import streamlit as st
 from supabase import Client
 
+from ..bulk_import import (
+    BUSINESS_COLUMNS,
+    BUSINESS_DEFAULTS,
+    CHANNEL_COLUMNS,
+    SUBSCRIPTION_COLUMNS,
+    import_businesses,
+    read_upload,
+    validate_businesses,
+)
+from ..business_directory import load_business_directory
+from ..business_list import BusinessFilters, count_businesses, fetch_businesses_page
+from ..cache import invalidate_tables
+from ..pagination import KeysetCursor
 from ..supabase_utils import (
-    clear_cache,
-    format_datetime,
+    format_datetime_series,
     format_duration,
-    get_module_types,
     get_subscription_plans,
     safe_query,
 )
+from ..tenant import load_tenant_snapshot
+from ..ui import fragment, lazy_tabs, rerun_fragment
+
+PAGE_SIZES = [25, 50, 100, 200]
 
 
 def render_businesses_page(supabase: Client) -> None:
@@ -22,7 +37,7 @@ def render_businesses_page(supabase: Client) -> None:
     st.title("🏢 Businesses")
 
     # Tabs for different views
-    tab1, tab2 = st.tabs(["Business List", "New Business"])
+    tab1, tab2, tab3 = st.tabs(["Business List", "New Business", "Bulk Import"])
 
     with tab1:
         render_business_list(supabase)
@@ -30,39 +45,65 @@ def render_businesses_page(supabase: Client) -> None:
     with tab2:
         render_new_business_form(supabase)
 
+    with tab3:
+        render_bulk_import(supabase)
+
 
 def render_business_list(supabase: Client) -> None:
-    """Render searchable, filterable list of businesses."""
+    """Render searchable, filterable, paginated list of businesses."""
     st.subheader("Business List")
 
-    # Filters
-    col1, col2, col3 = st.columns(3)
+    # Filters live in a form, so typing does not rerun the page; the query
+    # runs when the form is submitted (Enter in any field or the button).
+    with st.form("business_filters"):
+        col1, col2, col3 = st.columns(3)
 
-    with col1:
-        search_name = st.text_input("Search by name/slug", key="biz_search")
-    with col2:
-        filter_city = st.text_input("Filter by city", key="biz_city")
-    with col3:
-        filter_industry = st.text_input("Filter by industry", key="biz_industry")
+        with col1:
+            search_name = st.text_input("Search by name/slug", key="biz_search")
+        with col2:
+            filter_city = st.text_input("Filter by city", key="biz_city")
+        with col3:
+            filter_industry = st.text_input("Filter by industry", key="biz_industry")
+
+        col1, col2, _ = st.columns([1, 1, 1])
+        with col1:
+            filter_active = st.checkbox("Active only", value=False, key="biz_active")
+        with col2:
+            page_size = st.selectbox(
+                "Page size", options=PAGE_SIZES, index=PAGE_SIZES.index(50), key="biz_page_size"
+            )
 
-    filter_active = st.checkbox("Active only", value=False, key="biz_active")
+        st.form_submit_button("🔍 Search")
 
-    # Fetch businesses with filters
-    query = supabase.table("businesses").select("*")
+    filters = BusinessFilters(
+        search=search_name.strip(),
+        city=filter_city.strip(),
+        industry=filter_industry.strip(),
+        active_only=filter_active,
+    )
 
-    if search_name:
-        query = query.or_(f"name.ilike.%{search_name}%,slug.ilike.%{search_name}%")
-    if filter_city:
-        query = query.ilike("city", f"%{filter_city}%")
-    if filter_industry:
-        query = query.ilike("industry", f"%{filter_industry}%")
-    if filter_active:
-        query = query.eq("is_active", True)
+    # Keyset pagination, reset whenever the filters or the page size change
+    if st.session_state.get("biz_page_spec") != (filters, page_size):
+        st.session_state.biz_page_spec = (filters, page_size)
+        st.session_state.biz_cursors = []
+    cursors: List[Optional[KeysetCursor]] = st.session_state.biz_cursors
 
-    result = safe_query(lambda: query.order("created_at", desc=True).execute())
+    page = safe_query(
+        lambda: fetch_businesses_page(
+            supabase, filters, page_size, cursors[-1] if cursors else None
+        )
+    )
+    businesses, next_cursor = page if page else ([], None)
+    total = safe_query(
+        lambda: count_businesses(supabase, filters), "Failed to count businesses"
+    )
 
-    if result and result.data:
-        businesses = result.data
+    if businesses:
+        first_row = len(cursors) * page_size + 1
+        st.caption(
+            f"{total if total is not None else '?'} businesses · page {len(cursors) + 1} · "
+            f"showing {first_row}–{first_row + len(businesses) - 1}"
+        )
 
         # Display as table with selection
         df = pd.DataFrame(businesses)
@@ -79,10 +120,20 @@ def render_business_list(supabase: Client) -> None:
         available_columns = [col for col in display_columns if col in df.columns]
 
         display_df = df[available_columns].copy()
-        display_df["created_at"] = display_df["created_at"].apply(format_datetime)
+        display_df["created_at"] = format_datetime_series(display_df["created_at"])
 
         st.dataframe(display_df, use_container_width=True, hide_index=True)
 
+        col1, col2, _ = st.columns([1, 1, 6])
+        with col1:
+            if st.button("◀ Previous", disabled=not cursors, key="biz_prev_page"):
+                cursors.pop()
+                st.rerun()
+        with col2:
+            if st.button("Next ▶", disabled=next_cursor is None, key="biz_next_page"):
+                cursors.append(next_cursor)
+                st.rerun()
+
         # Business detail view
         st.markdown("---")
         st.subheader("Business Details")
@@ -93,118 +144,126 @@ def render_business_list(supabase: Client) -> None:
         )
 
         if selected_business_label:
-            selected_business_id = business_options[selected_business_label]
-            selected_business = next(
-                b for b in businesses if b["id"] == selected_business_id
-            )
-
-            render_business_detail(supabase, selected_business)
+            render_business_detail(supabase, business_options[selected_business_label])
     else:
         st.info("No businesses found")
 
 
-def render_business_detail(supabase: Client, business: Dict) -> None:
-    """Render detailed view and editor for a single business."""
-    business_id = business["id"]
+@fragment
+def render_business_detail(supabase: Client, business_id: str) -> None:
+    """Render detailed view and editor for a single business.
 
-    # Tabs for different sections
-    tabs = st.tabs(["Basic Info", "Channels", "Subscription", "Modules"])
+    All of the business's data comes from one cached tenant snapshot
+    (``admin_dashboard.tenant``), so opening a business is a single request.
+    Only the selected section is rendered, and each section is a fragment, so
+    interacting with one section (e.g. toggling a module) reruns only that
+    section. Sections re-read the snapshot themselves, as fragment reruns
+    reuse their original arguments.
+    """
+    if load_tenant_snapshot(supabase, business_id) is None:
+        st.info("Business not found")
+        return
 
-    # TAB: Basic Info
-    with tabs[0]:
-        with st.form(f"business_form_{business_id}"):
-            st.subheader("Edit Business Information")
+    section = lazy_tabs(
+        ["Basic Info", "Channels", "Subscription", "Modules"], key="business_detail_section"
+    )
 
-            col1, col2 = st.columns(2)
+    if section == "Basic Info":
+        render_business_info(supabase, business_id)
+    elif section == "Channels":
+        render_business_channels(supabase, business_id)
+    elif section == "Subscription":
+        render_business_subscription(supabase, business_id)
+    elif section == "Modules":
+        render_business_modules(supabase, business_id)
 
-            with col1:
-                name = st.text_input("Name*", value=business.get("name", ""))
-                legal_name = st.text_input(
-                    "Legal Name", value=business.get("legal_name", "")
-                )
-                slug = st.text_input("Slug*", value=business.get("slug", ""))
-                industry = st.text_input(
-                    "Industry", value=business.get("industry", "")
-                )
-                country = st.text_input(
-                    "Country", value=business.get("country", "")
-                )
-                city = st.text_input("City", value=business.get("city", ""))
 
-            with col2:
-                area = st.text_input("Area", value=business.get("area", ""))
-                address = st.text_area("Address", value=business.get("address", ""))
-                whatsapp_number = st.text_input(
-                    "WhatsApp", value=business.get("whatsapp_number", "")
-                )
-                phone = st.text_input("Phone", value=business.get("phone", ""))
-                email = st.text_input("Email", value=business.get("email", ""))
-                website = st.text_input(
-                    "Website", value=business.get("website", "")
-                )
+@fragment
+def render_business_info(supabase: Client, business_id: str) -> None:
+    """Render the basic information editor for a business."""
+    snapshot = load_tenant_snapshot(supabase, business_id)
+    if snapshot is None:
+        return
+    business = snapshot.business
 
-            is_active = st.checkbox("Active", value=business.get("is_active", True))
-
-            submit = st.form_submit_button("💾 Save Changes")
-
-            if submit:
-                if not name or not slug:
-                    st.error("Name and slug are required")
-                else:
-                    update_data = {
-                        "name": name,
-                        "legal_name": legal_name,
-                        "slug": slug,
-                        "industry": industry,
-                        "country": country,
-                        "city": city,
-                        "area": area,
-                        "address": address,
-                        "whatsapp_number": whatsapp_number,
-                        "phone": phone,
-                        "email": email,
-                        "website": website,
-                        "is_active": is_active,
-                    }
-
-                    result = safe_query(
-                        lambda: supabase.table("businesses")
-                        .update(update_data)
-                        .eq("id", business_id)
-                        .execute(),
-                        "Failed to update business",
-                    )
-
-                    if result:
-                        st.success("✅ Business updated successfully")
-                        st.rerun()
-
-    # TAB: Channels
-    with tabs[1]:
-        render_business_channels(supabase, business_id)
+    with st.form(f"business_form_{business_id}"):
+        st.subheader("Edit Business Information")
 
-    # TAB: Subscription
-    with tabs[2]:
-        render_business_subscription(supabase, business_id)
+        col1, col2 = st.columns(2)
 
-    # TAB: Modules
-    with tabs[3]:
-        render_business_modules(supabase, business_id)
+        with col1:
+            name = st.text_input("Name*", value=business.get("name", ""))
+            legal_name = st.text_input(
+                "Legal Name", value=business.get("legal_name", "")
+            )
+            slug = st.text_input("Slug*", value=business.get("slug", ""))
+            industry = st.text_input(
+                "Industry", value=business.get("industry", "")
+            )
+            country = st.text_input(
+                "Country", value=business.get("country", "")
+            )
+            city = st.text_input("City", value=business.get("city", ""))
+
+        with col2:
+            area = st.text_input("Area", value=business.get("area", ""))
+            address = st.text_area("Address", value=business.get("address", ""))
+            whatsapp_number = st.text_input(
+                "WhatsApp", value=business.get("whatsapp_number", "")
+            )
+            phone = st.text_input("Phone", value=business.get("phone", ""))
+            email = st.text_input("Email", value=business.get("email", ""))
+            website = st.text_input(
+                "Website", value=business.get("website", "")
+            )
 
+        is_active = st.checkbox("Active", value=business.get("is_active", True))
 
+        submit = st.form_submit_button("💾 Save Changes")
+
+        if submit:
+            if not name or not slug:
+                st.error("Name and slug are required")
+            else:
+                update_data = {
+                    "name": name,
+                    "legal_name": legal_name,
+                    "slug": slug,
+                    "industry": industry,
+                    "country": country,
+                    "city": city,
+                    "area": area,
+                    "address": address,
+                    "whatsapp_number": whatsapp_number,
+                    "phone": phone,
+                    "email": email,
+                    "website": website,
+                    "is_active": is_active,
+                }
+
+                result = safe_query(
+                    lambda: supabase.table("businesses")
+                    .update(update_data)
+                    .eq("id", business_id)
+                    .execute(),
+                    "Failed to update business",
+                )
+
+                if result:
+                    invalidate_tables("businesses")
+                    st.success("✅ Business updated successfully")
+                    st.rerun()  # full rerun: the list shows the new name
+
+
+@fragment
 def render_business_channels(supabase: Client, business_id: str) -> None:
     """Render business channels management."""
     st.subheader("Channels")
 
-    # Fetch channels
-    result = safe_query(
-        lambda: supabase.table("business_channels")
-        .select("*")
-        .eq("business_id", business_id)
-        .execute()
-    )
-
-    channels = result.data if result else []
+    snapshot = load_tenant_snapshot(supabase, business_id)
+    if snapshot is None:
+        return
+    channels = snapshot.channels
 
     if channels:
         df = pd.DataFrame(channels)
@@ -261,31 +320,23 @@ def render_business_channels(supabase: Client, business_id: str) -> None:
                 )
 
                 if result:
+                    invalidate_tables("business_channels")
                     st.success("✅ Channel added successfully")
-                    st.rerun()
+                    rerun_fragment()
 
 
+@fragment
 def render_business_subscription(supabase: Client, business_id: str) -> None:
     """Render business subscription management."""
     from datetime import datetime, timedelta
 
     st.subheader("Subscription")
 
-    # Fetch current subscription
-    result = safe_query(
-        lambda: supabase.table("business_subscriptions")
-        .select("*")
-        .eq("business_id", business_id)
-        .order("valid_from", desc=True)
-        .limit(1)
-        .execute()
-    )
-
-    current_sub = result.data[0] if result and result.data else None
-
-    # Get available plans
-    plans = get_subscription_plans(supabase)
-    plan_codes = [p["code"] for p in plans]
+    snapshot = load_tenant_snapshot(supabase, business_id)
+    if snapshot is None:
+        return
+    current_sub = snapshot.subscription
+    plan_codes = snapshot.plan_codes
 
     with st.form(f"subscription_form_{business_id}"):
         if current_sub:
@@ -359,36 +410,39 @@ def render_business_subscription(supabase: Client, business_id: str) -> None:
                 )
 
             if result:
+                invalidate_tables("business_subscriptions")
                 st.success("✅ Subscription saved successfully")
-                st.rerun()
+                rerun_fragment()
 
 
+@fragment
 def render_business_modules(supabase: Client, business_id: str) -> None:
-    """Render business modules assignment interface."""
-    st.subheader("Modules")
-
-    # Get all module types
-    module_types = get_module_types(supabase)
+    """Render business modules assignment interface.
 
-    # Get business modules
-    result = safe_query(
-        lambda: supabase.table("business_modules")
-        .select("*")
-        .eq("business_id", business_id)
-        .execute()
-    )
+    Toggles and config edits are only staged in widget state (each one reruns
+    just this fragment); "Apply" then writes every change in a single bulk
+    upsert on ``(business_id, module_code)``.
+    """
+    st.subheader("Modules")
 
-    business_modules = result.data if result else []
-    business_module_map = {bm["module_code"]: bm for bm in business_modules}
+    snapshot = load_tenant_snapshot(supabase, business_id)
+    if snapshot is None:
+        return
+    module_types = snapshot.module_types
+    business_module_map = snapshot.module_map
 
     st.write("Enable/disable modules for this business:")
 
+    staged: List[Dict] = []
+    summary: List[str] = []
+    invalid: List[str] = []
+    widget_keys: List[str] = []
+
     for module in module_types:
         module_code = module["code"]
-        is_enabled = (
-            module_code in business_module_map
-            and business_module_map[module_code].get("is_active", False)
-        )
+        existing = business_module_map.get(module_code)
+        is_enabled = bool(existing and existing.get("is_active", False))
+        current_config = (existing.get("config") if existing else None) or {}
 
         col1, col2 = st.columns([3, 1])
 
@@ -397,73 +451,81 @@ def render_business_modules(supabase: Client, business_id: str) -> None:
             st.caption(module.get("description", ""))
 
         with col2:
-            new_state = st.checkbox(
-                "Enabled",
-                value=is_enabled,
-                key=f"module_{business_id}_{module_code}",
-            )
+            checkbox_key = f"module_{business_id}_{module_code}"
+            widget_keys.append(checkbox_key)
+            new_state = st.checkbox("Enabled", value=is_enabled, key=checkbox_key)
 
-            # Handle state change
-            if new_state != is_enabled:
-                if module_code in business_module_map:
-                    # Update existing
-                    safe_query(
-                        lambda: supabase.table("business_modules")
-                        .update({"is_active": new_state})
-                        .eq("id", business_module_map[module_code]["id"])
-                        .execute(),
-                        f"Failed to update module {module_code}",
-                    )
-                else:
-                    # Create new
-                    safe_query(
-                        lambda: supabase.table("business_modules")
-                        .insert(
-                            {
-                                "business_id": business_id,
-                                "module_code": module_code,
-                                "is_active": new_state,
-                                "config": {},
-                            }
-                        )
-                        .execute(),
-                        f"Failed to enable module {module_code}",
-                    )
-
-        # Config editor for enabled modules
-        if module_code in business_module_map:
-            with st.expander(f"⚙️ Configure {module['display_name']}"):
-                current_config = business_module_map[module_code].get("config", {})
-                config_json = json.dumps(current_config, indent=2)
+        new_config = current_config
 
+        # Config editor for assigned (or newly enabled) modules
+        if existing or new_state:
+            with st.expander(f"⚙️ Configure {module['display_name']}"):
+                config_key = f"config_{business_id}_{module_code}"
+                widget_keys.append(config_key)
                 new_config_json = st.text_area(
                     "Module Config (JSON)",
-                    value=config_json,
+                    value=json.dumps(current_config, indent=2),
                     height=150,
-                    key=f"config_{business_id}_{module_code}",
+                    key=config_key,
                 )
-
-                if st.button(
-                    "Save Config", key=f"save_config_{business_id}_{module_code}"
-                ):
-                    try:
-                        new_config = json.loads(new_config_json)
-
-                        safe_query(
-                            lambda: supabase.table("business_modules")
-                            .update({"config": new_config})
-                            .eq("id", business_module_map[module_code]["id"])
-                            .execute(),
-                            f"Failed to update config for {module_code}",
-                        )
-
-                        st.success("✅ Config saved")
-                        st.rerun()
-                    except json.JSONDecodeError:
-                        st.error("Invalid JSON format")
+                try:
+                    new_config = json.loads(new_config_json)
+                except json.JSONDecodeError:
+                    st.error("Invalid JSON format")
+                    invalid.append(module["display_name"])
+
+        if new_state != is_enabled:
+            summary.append(f"{'Enable' if new_state else 'Disable'} **{module['display_name']}**")
+        if new_config != current_config:
+            summary.append(f"Update config of **{module['display_name']}**")
+        if new_state != is_enabled or new_config != current_config:
+            staged.append(
+                {
+                    "business_id": business_id,
+                    "module_code": module_code,
+                    "is_active": new_state,
+                    "config": new_config,
+                }
+            )
 
         st.markdown("---")
 
+    if not staged and not invalid:
+        st.caption("No pending changes")
+        return
+
+    st.markdown("**Pending changes:**\n" + "\n".join(f"- {line}" for line in summary))
+    if invalid:
+        st.warning(f"Fix the invalid config JSON before applying: {', '.join(invalid)}")
+
+    col1, col2, _ = st.columns([1, 1, 3])
+    with col1:
+        apply = st.button(
+            f"✅ Apply {len(staged)} change(s)",
+            type="primary",
+            disabled=bool(invalid),
+            key=f"apply_modules_{business_id}",
+        )
+    with col2:
+        discard = st.button("↩️ Discard", key=f"discard_modules_{business_id}")
+
+    if discard:
+        for key in widget_keys:
+            st.session_state.pop(key, None)
+        rerun_fragment()
+
+    if apply:
+        result = safe_query(
+            lambda: supabase.table("business_modules")
+            .upsert(staged, on_conflict="business_id,module_code")
+            .execute(),
+            "Failed to update modules",
+        )
+        if result:
+            invalidate_tables("business_modules")
+            st.success(f"✅ Applied {len(staged)} module change(s)")
+            rerun_fragment()
+
 
 def render_new_business_form(supabase: Client) -> None:
     """Render form to create a new business."""
@@ -477,7 +539,7 @@ def render_new_business_form(supabase: Client) -> None:
             legal_name = st.text_input("Legal Name")
             slug = st.text_input("Slug*")
             industry = st.text_input("Industry")
-            country = st.text_input("Country", value="Pakistan")
+            country = st.text_input("Country", value=BUSINESS_DEFAULTS["country"])
             city = st.text_input("City")
 
         with col2:
@@ -521,5 +583,107 @@ def render_new_business_form(supabase: Client) -> None:
 
                 if result:
                     st.success("✅ Business created successfully")
-                    clear_cache()
+                    invalidate_tables("businesses")
                     st.rerun()
+
+
+def render_bulk_import(supabase: Client) -> None:
+    """Render bulk business onboarding from a CSV/XLSX file."""
+    st.subheader("Bulk Import")
+
+    st.caption(
+        f"Columns: {', '.join(BUSINESS_COLUMNS)}. Optional channel columns: "
+        f"{', '.join(CHANNEL_COLUMNS)}. Optional subscription columns: "
+        f"{', '.join(SUBSCRIPTION_COLUMNS)}. Dates must be ISO (YYYY-MM-DD)."
+    )
+
+    uploaded = st.file_uploader(
+        "Businesses file", type=["csv", "xlsx"], key="bulk_import_file"
+    )
+    if uploaded is None:
+        return
+
+    try:
+        raw = read_upload(uploaded, uploaded.name)
+    except Exception as e:
+        st.error(f"Failed to read file: {e}")
+        return
+
+    plans = get_subscription_plans(supabase)
+    checked = validate_businesses(
+        raw, load_business_directory(supabase), [p["code"] for p in plans]
+    )
+    invalid = checked[checked["error"] != ""]
+    valid_count = len(checked) - len(invalid)
+
+    col1, col2 = st.columns(2)
+    col1.metric("Valid rows", valid_count)
+    col2.metric("Rows with errors", len(invalid))
+
+    if len(invalid):
+        shown = [c for c in ("name", "slug", "error") if c in invalid.columns]
+        st.dataframe(invalid[shown], use_container_width=True)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        batch_size = st.number_input(
+            "Batch size", min_value=1, max_value=1000, value=100, key="bulk_import_batch"
+        )
+    with col2:
+        create_channels = st.checkbox(
+            "Create channels",
+            value="channel_identifier" in checked.columns,
+            disabled="channel_identifier" not in checked.columns,
+            key="bulk_import_channels",
+        )
+    with col3:
+        create_subscriptions = st.checkbox(
+            "Create subscriptions",
+            value="plan_code" in checked.columns,
+            disabled="plan_code" not in checked.columns,
+            key="bulk_import_subscriptions",
+        )
+
+    if not st.button(
+        f"📥 Import {valid_count} business(es)",
+        type="primary",
+        disabled=valid_count == 0,
+        key="bulk_import_start",
+    ):
+        return
+
+    progress = st.progress(0.0, text="Importing…")
+
+    def on_progress(created: int) -> None:
+        progress.progress(min(created / valid_count, 1.0), text=f"Created {created:,} businesses…")
+
+    report = safe_query(
+        lambda: import_businesses(
+            supabase,
+            checked,
+            batch_size=int(batch_size),
+            create_channels=create_channels,
+            create_subscriptions=create_subscriptions,
+            on_progress=on_progress,
+        ),
+        "Bulk import failed",
+    )
+    progress.empty()
+    if report is None:
+        return
+
+    st.success(
+        f"✅ Created {report.created} business(es), {report.channels_created} channel(s) "
+        f"and {report.subscriptions_created} subscription(s)"
+    )
+    if report.errors:
+        errors_df = pd.DataFrame(report.errors)
+        st.warning(f"{len(errors_df)} row(s) failed during import")
+        st.dataframe(errors_df, use_container_width=True, hide_index=True)
+        st.download_button(
+            "Download errors CSV",
+            data=errors_df.to_csv(index=False),
+            file_name="bulk_import_errors.csv",
+            mime="text/csv",
+            key="bulk_import_errors",
+        )
@@ -1,6 +1,5 @@
 """Dashboard page for the admin dashboard Streamlit app."""
 
-from datetime import datetime, timedelta
 from typing import Dict, List
 
 import pandas as pd
@@ -8,44 +7,81 @@ import plotly.express as px
 import streamlit as st
 from supabase import Client
 
-from ..supabase_utils import safe_query, format_datetime, format_duration
+from .. import aggregates, tiles
+from ..business_directory import BusinessDirectory, get_business_directory
+from ..cache import invalidate_tables
+from ..supabase_utils import (
+    format_datetime_series,
+    format_duration,
+    format_duration_series,
+    safe_query_batch,
+)
+
+# Ranges offered by the range selector; any range is assembled from tiles
+RANGE_DAYS = [7, 30, 90]
+
+# Businesses shown in the "Runs by Business" chart
+TOP_BUSINESSES = 15
 
 
 def render_dashboard_page(supabase: Client) -> None:
     """Render the main dashboard with KPIs and charts."""
     st.title("📊 Dashboard")
 
-    # Refresh button
+    # Range selector and refresh button
     col1, col2 = st.columns([6, 1])
+    with col1:
+        days = st.radio(
+            "Range",
+            options=RANGE_DAYS,
+            format_func=lambda d: f"{d} days",
+            horizontal=True,
+            key="dashboard_range_days",
+        )
     with col2:
         if st.button("🔄 Refresh"):
+            # Settled tiles are kept; only the open ones are recomputed
+            invalidate_tables("workflow_runs", "workflow_step_logs", "business_subscriptions")
             st.rerun()
 
     st.markdown("---")
 
+    # Aligned so the cached tiles (and the warmup) share one cache key
+    since = aggregates.window_start(days=days)
+
+    # All dashboard queries are independent, so fire them together and render
+    # from the results; page latency is roughly the slowest single query.
+    # KPIs come back pre-aggregated from the database, and run/step charts are
+    # assembled from cached per-day and per-hour tiles.
+    results = safe_query_batch(
+        {
+            "businesses": lambda: supabase.table("businesses")
+            .select("id", count="exact", head=True)
+            .execute(),
+            "plan_counts": lambda: aggregates.subscriptions_by_plan(supabase, "active"),
+            "run_tiles": lambda: tiles.run_tiles(supabase, since),
+            "step_tiles": lambda: tiles.step_tiles(supabase, since),
+            "directory": lambda: get_business_directory(supabase),
+            "latest_runs": lambda: supabase.table("workflow_runs")
+            .select("id, workflow_name, business_id, plan_code, status, start_time, duration_ms")
+            .order("start_time", desc=True)
+            .limit(20)
+            .execute(),
+        }
+    )
+
     # KPIs
     col1, col2, col3, col4 = st.columns(4)
 
     # Total businesses
-    businesses_result = safe_query(
-        lambda: supabase.table("businesses").select("id", count="exact").execute()
-    )
+    businesses_result = results["businesses"]
     total_businesses = businesses_result.count if businesses_result else 0
 
     with col1:
         st.metric("Total Businesses", total_businesses)
 
     # Active subscriptions by plan
-    subscriptions_result = safe_query(
-        lambda: supabase.table("business_subscriptions")
-        .select("plan_code")
-        .eq("status", "active")
-        .execute()
-    )
-    subs_data = subscriptions_result.data if subscriptions_result else []
-    plan_counts = (
-        pd.DataFrame(subs_data)["plan_code"].value_counts().to_dict() if subs_data else {}
-    )
+    plan_counts: Dict[str, int] = results["plan_counts"] or {}
 
     with col2:
         st.metric("Basic Plan", plan_counts.get("basic", 0))
@@ -57,55 +93,54 @@ def render_dashboard_page(supabase: Client) -> None:
     st.markdown("---")
 
     # Workflow runs KPIs
-    col1, col2 = st.columns(2)
-
-    seven_days_ago = (datetime.now() - timedelta(days=7)).isoformat()
-
-    # Runs in last 7 days
-    recent_runs_result = safe_query(
-        lambda: supabase.table("workflow_runs")
-        .select("id, status", count="exact")
-        .gte("start_time", seven_days_ago)
-        .execute()
-    )
-    recent_runs_count = recent_runs_result.count if recent_runs_result else 0
-    recent_runs_data = recent_runs_result.data if recent_runs_result else []
+    col1, col2, col3 = st.columns(3)
 
-    failed_runs_count = len([r for r in recent_runs_data if r.get("status") == "Failed"])
+    run_tiles: List[tiles.Tile] = results["run_tiles"] or []
+    runs = tiles.combine(run_tiles, since)
 
     with col1:
-        st.metric("Workflow Runs (7 days)", recent_runs_count)
+        st.metric(f"Workflow Runs ({days} days)", runs.total)
     with col2:
-        st.metric("Failed Runs (7 days)", failed_runs_count, delta_color="inverse")
+        st.metric(
+            f"Failed Runs ({days} days)", runs.by_status.get("Failed", 0), delta_color="inverse"
+        )
+    with col3:
+        avg_ms = runs.avg_duration_ms
+        st.metric("Avg Run Duration", format_duration(None if avg_ms is None else round(avg_ms)))
 
     st.markdown("---")
 
     # Charts section
     st.subheader("📈 Analytics")
 
-    tab1, tab2, tab3 = st.tabs(["Runs per Day", "Failures by Workflow", "Step Status Distribution"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(
+        [
+            "Runs per Day",
+            "Failures by Workflow",
+            "Runs by Business",
+            "Run Durations",
+            "Step Status Distribution",
+        ]
+    )
 
     with tab1:
-        # Line chart: runs per day
-        runs_result = safe_query(
-            lambda: supabase.table("workflow_runs")
-            .select("start_time")
-            .gte("start_time", seven_days_ago)
-            .execute()
-        )
-
-        if runs_result and runs_result.data:
-            df = pd.DataFrame(runs_result.data)
-            df["start_time"] = pd.to_datetime(df["start_time"])
-            df["date"] = df["start_time"].dt.date
-            daily_counts = df.groupby("date").size().reset_index(name="count")
+        # Line chart: runs per day, by status
+        if runs.total:
+            daily_counts = pd.DataFrame(
+                [
+                    {"date": day.start.date(), "status": status, "count": count}
+                    for day in tiles.by_day(run_tiles)
+                    for status, count in day.by_status.items()
+                ]
+            )
 
             fig = px.line(
                 daily_counts,
                 x="date",
                 y="count",
-                title="Workflow Runs per Day (Last 7 Days)",
-                labels={"date": "Date", "count": "Number of Runs"},
+                color="status",
+                title=f"Workflow Runs per Day (Last {days} Days)",
+                labels={"date": "Date", "count": "Number of Runs", "status": "Status"},
             )
             st.plotly_chart(fig, use_container_width=True)
         else:
@@ -113,46 +148,95 @@ def render_dashboard_page(supabase: Client) -> None:
 
     with tab2:
         # Bar chart: failures by workflow
-        failed_runs_result = safe_query(
-            lambda: supabase.table("workflow_runs")
-            .select("workflow_name")
-            .eq("status", "Failed")
-            .gte("start_time", seven_days_ago)
-            .execute()
-        )
+        failures_by_workflow = {
+            workflow: count
+            for (workflow, status), count in runs.by_workflow.items()
+            if status == "Failed"
+        }
 
-        if failed_runs_result and failed_runs_result.data:
-            df = pd.DataFrame(failed_runs_result.data)
-            workflow_failures = df["workflow_name"].value_counts().reset_index()
-            workflow_failures.columns = ["workflow", "failures"]
+        if failures_by_workflow:
+            workflow_failures = pd.DataFrame(
+                list(failures_by_workflow.items()), columns=["workflow", "failures"]
+            ).sort_values("failures", ascending=False)
 
             fig = px.bar(
                 workflow_failures,
                 x="workflow",
                 y="failures",
-                title="Failed Runs by Workflow (Last 7 Days)",
+                title=f"Failed Runs by Workflow (Last {days} Days)",
                 labels={"workflow": "Workflow Name", "failures": "Number of Failures"},
             )
             st.plotly_chart(fig, use_container_width=True)
         else:
-            st.info("No failed workflow runs in the last 7 days")
+            st.info(f"No failed workflow runs in the last {days} days")
+
+    directory = results["directory"] or BusinessDirectory([])
 
     with tab3:
+        # Bar chart: busiest businesses, by status
+        if runs.by_business:
+            business_runs = pd.DataFrame(
+                [
+                    {"business_id": business_id, "status": status, "count": count}
+                    for (business_id, status), count in runs.by_business.items()
+                ]
+            )
+            top_ids = (
+                business_runs.groupby("business_id")["count"]
+                .sum()
+                .nlargest(TOP_BUSINESSES)
+                .index
+            )
+            business_runs = business_runs[business_runs["business_id"].isin(top_ids)]
+            business_runs["business"] = directory.map_names(
+                business_runs["business_id"]
+            ).fillna("Unknown")
+
+            fig = px.bar(
+                business_runs,
+                x="business",
+                y="count",
+                color="status",
+                title=f"Top {TOP_BUSINESSES} Businesses by Runs (Last {days} Days)",
+                labels={"business": "Business", "count": "Number of Runs", "status": "Status"},
+            )
+            fig.update_xaxes(categoryorder="total descending")
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No workflow run data available")
+
+    with tab4:
+        # Histogram of finished run durations
+        if any(runs.histogram):
+            durations = pd.DataFrame(
+                {"duration": tiles.DURATION_BIN_LABELS, "runs": runs.histogram}
+            )
+
+            fig = px.bar(
+                durations,
+                x="duration",
+                y="runs",
+                title=f"Run Duration Distribution (Last {days} Days)",
+                labels={"duration": "Duration", "runs": "Number of Runs"},
+            )
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No finished workflow runs available")
+
+    with tab5:
         # Step status distribution
-        steps_result = safe_query(
-            lambda: supabase.table("workflow_step_logs").select("status").execute()
-        )
+        steps_by_status = tiles.combine(results["step_tiles"] or []).by_status
 
-        if steps_result and steps_result.data:
-            df = pd.DataFrame(steps_result.data)
-            status_counts = df["status"].value_counts().reset_index()
-            status_counts.columns = ["status", "count"]
+        if steps_by_status:
+            status_counts = pd.DataFrame(
+                list(steps_by_status.items()), columns=["status", "count"]
+            )
 
             fig = px.pie(
                 status_counts,
                 names="status",
                 values="count",
-                title="Workflow Step Status Distribution",
+                title=f"Workflow Step Status Distribution (Last {days} Days)",
             )
             st.plotly_chart(fig, use_container_width=True)
         else:
@@ -163,36 +247,16 @@ def render_dashboard_page(supabase: Client) -> None:
     # Recent runs table
     st.subheader("🕐 Latest 20 Workflow Runs")
 
-    latest_runs_result = safe_query(
-        lambda: supabase.table("workflow_runs")
-        .select("id, workflow_name, business_id, plan_code, status, start_time, duration_ms")
-        .order("start_time", desc=True)
-        .limit(20)
-        .execute()
-    )
+    latest_runs_result = results["latest_runs"]
 
     if latest_runs_result and latest_runs_result.data:
         df = pd.DataFrame(latest_runs_result.data)
 
         # Get business names
-        business_ids: List[str] = df["business_id"].unique().tolist()
-        businesses_result = safe_query(
-            lambda: supabase.table("businesses")
-            .select("id, name")
-            .in_("id", business_ids)
-            .execute()
-        )
-
-        if businesses_result:
-            business_map: Dict[str, str] = {
-                b["id"]: b["name"] for b in businesses_result.data
-            }
-            df["business_name"] = df["business_id"].map(business_map)
-        else:
-            df["business_name"] = "Unknown"
+        df["business_name"] = directory.map_names(df["business_id"]).fillna("Unknown")
 
-        df["start_time"] = df["start_time"].apply(format_datetime)
-        df["duration"] = df["duration_ms"].apply(format_duration)
+        df["start_time"] = format_datetime_series(df["start_time"])
+        df["duration"] = format_duration_series(df["duration_ms"])
 
         display_df = df[
             [
@@ -3,7 +3,8 @@
 import streamlit as st
 from supabase import Client
 
-from ..supabase_utils import clear_cache, get_module_types, get_subscription_plans, safe_query
+from ..cache import invalidate_tables
+from ..supabase_utils import get_module_types, get_subscription_plans, safe_query
 
 
 def render_plans_modules_page(supabase: Client) -> None:
@@ -13,7 +14,7 @@ def render_plans_modules_page(supabase: Client) -> None:
     col1, col2 = st.columns([6, 1])
     with col2:
         if st.button("🔄 Refresh Data"):
-            clear_cache()
+            invalidate_tables("module_types", "subscription_plans")
             st.rerun()
 
     tabs = st.tabs(["Module Types", "Subscription Plans"])
@@ -76,7 +77,7 @@ def render_module_types_management(supabase: Client) -> None:
 
                         if result:
                             st.success("✅ Module updated")
-                            clear_cache()
+                            invalidate_tables("module_types")
                             st.rerun()
 
                     if delete:
@@ -104,7 +105,7 @@ def render_module_types_management(supabase: Client) -> None:
 
                             if result:
                                 st.success("✅ Module deleted")
-                                clear_cache()
+                                invalidate_tables("module_types")
                                 st.rerun()
     else:
         st.info("No module types found")
@@ -146,7 +147,7 @@ def render_module_types_management(supabase: Client) -> None:
 
                 if result:
                     st.success("✅ Module type created")
-                    clear_cache()
+                    invalidate_tables("module_types")
                     st.rerun()
 
 
@@ -209,7 +210,7 @@ def render_subscription_plans_management(supabase: Client) -> None:
 
                         if result:
                             st.success("✅ Plan updated")
-                            clear_cache()
+                            invalidate_tables("subscription_plans")
                             st.rerun()
 
                     if delete:
@@ -237,7 +238,7 @@ def render_subscription_plans_management(supabase: Client) -> None:
 
                             if result:
                                 st.success("✅ Plan deleted")
-                                clear_cache()
+                                invalidate_tables("subscription_plans")
                                 st.rerun()
     else:
         st.info("No subscription plans found")
@@ -282,5 +283,5 @@ def render_subscription_plans_management(supabase: Client) -> None:
 
                 if result:
                     st.success("✅ Plan created")
-                    clear_cache()
+                    invalidate_tables("subscription_plans")
                     st.rerun()
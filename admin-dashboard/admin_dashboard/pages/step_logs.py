@@ -1,13 +1,37 @@
 """Workflow Step Logs page for the admin dashboard Streamlit app."""
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import pandas as pd
 import plotly.express as px
 import streamlit as st
 from supabase import Client
 
-from ..supabase_utils import format_datetime, format_duration, safe_query
+from ..cache import cached_query
+from ..supabase_utils import (
+    format_datetime,
+    format_datetime_series,
+    format_duration,
+    format_duration_series,
+    safe_query,
+)
+from ..ui import business_picker, fragment
+
+# Scalar columns used by the table and analytics. Summaries, error messages and
+# raw JSON are only loaded for the selected step via ``_fetch_step``.
+STEP_LIST_COLUMNS = (
+    "id, run_id, step_order, node_name, module_phase, intent_action, "
+    "status, started_at, duration_ms"
+)
+
+
+@cached_query("workflow_step_logs", ttl=60)
+def _fetch_step(_supabase: Client, step_id: str) -> Optional[Dict]:
+    """Cached full row for one step log; raises on failure."""
+    rows = (
+        _supabase.table("workflow_step_logs").select("*").eq("id", step_id).limit(1).execute().data
+    )
+    return rows[0] if rows else None
 
 
 def render_step_logs_page(supabase: Client) -> None:
@@ -40,19 +64,10 @@ def render_step_logs_page(supabase: Client) -> None:
         )
 
     with col3:
-        businesses_result = safe_query(
-            lambda: supabase.table("businesses").select("id, name").execute()
-        )
-        businesses = businesses_result.data if businesses_result else []
-        business_options: Dict[str, str] = {b["name"]: b["id"] for b in businesses}
-        business_filter = st.selectbox(
-            "Business",
-            options=["All"] + list(business_options.keys()),
-            key="steps_business",
-        )
+        business_filter = business_picker(supabase, key="steps_business", allow_all=True)
 
     # Build query
-    query = supabase.table("workflow_step_logs").select("*")
+    query = supabase.table("workflow_step_logs").select(STEP_LIST_COLUMNS)
 
     if run_id_filter:
         query = query.eq("run_id", run_id_filter)
@@ -66,9 +81,8 @@ def render_step_logs_page(supabase: Client) -> None:
     if channel_type_filter != "All":
         query = query.eq("channel_type", channel_type_filter)
 
-    if business_filter != "All":
-        business_id = business_options[business_filter]
-        query = query.eq("business_id", business_id)
+    if business_filter:
+        query = query.eq("business_id", business_filter)
 
     # Execute query
     result = safe_query(
@@ -142,8 +156,8 @@ def render_step_logs_page(supabase: Client) -> None:
         # Step logs table
         st.subheader(f"Step Logs ({len(steps)} steps)")
 
-        df["started_at_fmt"] = df["started_at"].apply(format_datetime)
-        df["duration_fmt"] = df["duration_ms"].apply(format_duration)
+        df["started_at_fmt"] = format_datetime_series(df["started_at"])
+        df["duration_fmt"] = format_duration_series(df["duration_ms"])
 
         display_df = df[
             [
@@ -181,23 +195,31 @@ def render_step_logs_page(supabase: Client) -> None:
             f"{s['node_name']} - Step {s['step_order']} ({s['id'][:8]})": s["id"]
             for s in steps
         }
-        selected_step_label = st.selectbox(
-            "Select step to view details",
-            options=list(step_options.keys()),
-            key="selected_step",
-        )
-
-        if selected_step_label:
-            selected_step_id = step_options[selected_step_label]
-            selected_step = next(s for s in steps if s["id"] == selected_step_id)
-
-            render_step_detail(selected_step)
+        render_step_picker(supabase, step_options)
     else:
         st.info("No step logs found matching the filters")
 
 
-def render_step_detail(step: Dict) -> None:
-    """Render detailed view of a single step log."""
+@fragment
+def render_step_picker(supabase: Client, step_options: Dict[str, str]) -> None:
+    """Step selector plus detail view; switching steps reruns only this fragment."""
+    selected_step_label = st.selectbox(
+        "Select step to view details",
+        options=list(step_options.keys()),
+        key="selected_step",
+    )
+
+    if selected_step_label:
+        render_step_detail(supabase, step_options[selected_step_label])
+
+
+def render_step_detail(supabase: Client, step_id: str) -> None:
+    """Render detailed view of a single step log, fetching its full row."""
+    step = safe_query(lambda: _fetch_step(supabase, step_id), "Failed to load step log")
+    if not step:
+        st.info("This step log no longer exists")
+        return
+
     col1, col2 = st.columns(2)
 
     with col1:
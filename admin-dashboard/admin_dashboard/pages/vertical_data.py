@@ -1,13 +1,48 @@
 """Vertical Data (Grocery) page for the admin dashboard Streamlit app."""
 
 from datetime import datetime, timedelta
-from typing import Dict
+from typing import Dict, List, Optional
 
 import pandas as pd
 import streamlit as st
 from supabase import Client
 
-from ..supabase_utils import format_datetime, safe_query
+from ..cache import cached_query, invalidate_tables
+from ..lookups import fetch_by_ids
+from ..supabase_utils import format_datetime_series, safe_query
+from ..ui import business_picker, lazy_tabs
+
+SECTIONS = ["Products", "Suppliers", "Low Stock Events", "Credit Ledger"]
+
+
+@cached_query("products")
+def _fetch_products(_supabase: Client, business_id: str) -> List[Dict]:
+    result = _supabase.table("products").select("*").eq("business_id", business_id).execute()
+    return result.data or []
+
+
+@cached_query("suppliers")
+def _fetch_suppliers(_supabase: Client, business_id: str) -> List[Dict]:
+    result = _supabase.table("suppliers").select("*").eq("business_id", business_id).execute()
+    return result.data or []
+
+
+# Low stock events and the credit ledger are written by workflows rather than
+# this dashboard, so they get a short TTL instead of write invalidation.
+@cached_query("low_stock_events", ttl=60)
+def _fetch_low_stock_events(
+    _supabase: Client, business_id: str, start: Optional[str], end: Optional[str]
+) -> List[Dict]:
+    query = _supabase.table("low_stock_events").select("*").eq("business_id", business_id)
+    if start and end:
+        query = query.gte("created_at", start).lte("created_at", end)
+    return query.order("created_at", desc=True).limit(100).execute().data or []
+
+
+@cached_query("credit_ledger", ttl=60)
+def _fetch_credit_ledger(_supabase: Client, business_id: str) -> List[Dict]:
+    result = _supabase.table("credit_ledger").select("*").eq("business_id", business_id).execute()
+    return result.data or []
 
 
 def render_vertical_data_page(supabase: Client) -> None:
@@ -21,39 +56,27 @@ def render_vertical_data_page(supabase: Client) -> None:
     )
 
     # Business selector
-    businesses_result = safe_query(
-        lambda: supabase.table("businesses").select("id, name").execute()
-    )
-    businesses = businesses_result.data if businesses_result else []
-    business_options: Dict[str, str] = {b["name"]: b["id"] for b in businesses}
-
-    selected_business_name = st.selectbox(
-        "Select Business",
-        options=list(business_options.keys()),
-        key="vertical_business",
+    selected_business_id = business_picker(
+        supabase, label="Select Business", key="vertical_business"
     )
 
-    if not selected_business_name:
+    if not selected_business_id:
         st.warning("Please select a business")
         return
 
-    selected_business_id = business_options[selected_business_name]
-
     st.markdown("---")
 
-    # Tabs for different vertical data
-    tabs = st.tabs(["Products", "Suppliers", "Low Stock Events", "Credit Ledger"])
+    # Only the selected section is rendered (and queried); its rows are then
+    # cached per business, so switching back and forth is free.
+    section = lazy_tabs(SECTIONS, key="vertical_section")
 
-    with tabs[0]:
+    if section == "Products":
         render_products_tab(supabase, selected_business_id)
-
-    with tabs[1]:
+    elif section == "Suppliers":
         render_suppliers_tab(supabase, selected_business_id)
-
-    with tabs[2]:
+    elif section == "Low Stock Events":
         render_low_stock_events_tab(supabase, selected_business_id)
-
-    with tabs[3]:
+    elif section == "Credit Ledger":
         render_credit_ledger_tab(supabase, selected_business_id)
 
 
@@ -62,34 +85,13 @@ def render_products_tab(supabase: Client, business_id: str) -> None:
     st.subheader("Products")
 
     # Fetch products
-    result = safe_query(
-        lambda: supabase.table("products")
-        .select("*")
-        .eq("business_id", business_id)
-        .execute()
-    )
-
-    products = result.data if result else []
+    products = safe_query(lambda: _fetch_products(supabase, business_id)) or []
 
     if products:
         # Get supplier names
-        supplier_ids = [p.get("supplier_id") for p in products if p.get("supplier_id")]
-        suppliers_result = (
-            safe_query(
-                lambda: supabase.table("suppliers")
-                .select("id, name")
-                .in_("id", supplier_ids)
-                .execute()
-            )
-            if supplier_ids
-            else None
-        )
-
-        supplier_map = (
-            {s["id"]: s["name"] for s in suppliers_result.data}
-            if suppliers_result
-            else {}
-        )
+        supplier_ids = [p.get("supplier_id") for p in products]
+        suppliers = safe_query(lambda: fetch_by_ids(supabase, "suppliers", supplier_ids)) or {}
+        supplier_map = {sid: s["name"] for sid, s in suppliers.items()}
 
         df = pd.DataFrame(products)
         if "supplier_id" in df.columns:
@@ -170,6 +172,7 @@ def render_products_tab(supabase: Client, business_id: str) -> None:
                     )
 
                     if result:
+                        invalidate_tables("products")
                         st.success("✅ Product updated")
                         st.rerun()
     else:
@@ -180,13 +183,7 @@ def render_products_tab(supabase: Client, business_id: str) -> None:
     st.subheader("Create New Product")
 
     # Get suppliers for dropdown
-    suppliers_result = safe_query(
-        lambda: supabase.table("suppliers")
-        .select("id, name")
-        .eq("business_id", business_id)
-        .execute()
-    )
-    suppliers = suppliers_result.data if suppliers_result else []
+    suppliers = safe_query(lambda: _fetch_suppliers(supabase, business_id)) or []
     supplier_options: Dict[str, str] = {s["name"]: s["id"] for s in suppliers}
 
     with st.form("new_product"):
@@ -230,6 +227,7 @@ def render_products_tab(supabase: Client, business_id: str) -> None:
                 )
 
                 if result:
+                    invalidate_tables("products")
                     st.success("✅ Product created")
                     st.rerun()
 
@@ -239,14 +237,7 @@ def render_suppliers_tab(supabase: Client, business_id: str) -> None:
     st.subheader("Suppliers")
 
     # Fetch suppliers
-    result = safe_query(
-        lambda: supabase.table("suppliers")
-        .select("*")
-        .eq("business_id", business_id)
-        .execute()
-    )
-
-    suppliers = result.data if result else []
+    suppliers = safe_query(lambda: _fetch_suppliers(supabase, business_id)) or []
 
     if suppliers:
         df = pd.DataFrame(suppliers)
@@ -310,6 +301,7 @@ def render_suppliers_tab(supabase: Client, business_id: str) -> None:
                     )
 
                     if result:
+                        invalidate_tables("suppliers")
                         st.success("✅ Supplier updated")
                         st.rerun()
     else:
@@ -357,6 +349,7 @@ def render_suppliers_tab(supabase: Client, business_id: str) -> None:
                 )
 
                 if result:
+                    invalidate_tables("suppliers")
                     st.success("✅ Supplier created")
                     st.rerun()
 
@@ -376,45 +369,22 @@ def render_low_stock_events_tab(supabase: Client, business_id: str) -> None:
         )
 
     # Fetch events
-    query = (
-        supabase.table("low_stock_events")
-        .select("*")
-        .eq("business_id", business_id)
-    )
-
-    if date_range and len(date_range) == 2:
-        query = query.gte("created_at", date_range[0].isoformat())
-        query = query.lte(
-            "created_at", (date_range[1] + timedelta(days=1)).isoformat()
-        )
+    has_range = bool(date_range) and len(date_range) == 2
+    start = date_range[0].isoformat() if has_range else None
+    end = (date_range[1] + timedelta(days=1)).isoformat() if has_range else None
 
-    result = safe_query(lambda: query.order("created_at", desc=True).limit(100).execute())
+    events = safe_query(lambda: _fetch_low_stock_events(supabase, business_id, start, end))
 
-    if result and result.data:
-        events = result.data
+    if events:
 
         # Get product names
-        product_ids = [e.get("product_id") for e in events if e.get("product_id")]
-        products_result = (
-            safe_query(
-                lambda: supabase.table("products")
-                .select("id, name")
-                .in_("id", product_ids)
-                .execute()
-            )
-            if product_ids
-            else None
-        )
-
-        product_map = (
-            {p["id"]: p["name"] for p in products_result.data}
-            if products_result
-            else {}
-        )
+        product_ids = [e.get("product_id") for e in events]
+        products = safe_query(lambda: fetch_by_ids(supabase, "products", product_ids)) or {}
+        product_map = {pid: p["name"] for pid, p in products.items()}
 
         df = pd.DataFrame(events)
         df["product_name"] = df["product_id"].map(product_map)
-        df["created_at_fmt"] = df["created_at"].apply(format_datetime)
+        df["created_at_fmt"] = format_datetime_series(df["created_at"])
 
         display_columns = [
             "product_name",
@@ -450,15 +420,9 @@ def render_credit_ledger_tab(supabase: Client, business_id: str) -> None:
     st.subheader("Credit Ledger (Udhaar)")
 
     # Fetch ledger entries (do not assume presence of a specific date column)
-    result = safe_query(
-        lambda: supabase.table("credit_ledger")
-        .select("*")
-        .eq("business_id", business_id)
-        .execute()
-    )
+    entries = safe_query(lambda: _fetch_credit_ledger(supabase, business_id))
 
-    if result and result.data:
-        entries = result.data
+    if entries:
 
         # Calculate totals by contact
         df = pd.DataFrame(entries)
@@ -469,17 +433,14 @@ def render_credit_ledger_tab(supabase: Client, business_id: str) -> None:
 
             # Get contact names
             contact_ids = contact_totals["contact_id"].unique().tolist()
-            contacts_result = safe_query(
-                lambda: supabase.table("contacts")
-                .select("id, name, phone")
-                .in_("id", contact_ids)
-                .execute()
+            contacts = safe_query(
+                lambda: fetch_by_ids(supabase, "contacts", contact_ids, columns="id, name, phone")
             )
 
-            if contacts_result:
+            if contacts is not None:
                 contact_map = {
-                    c["id"]: f"{c.get('name', 'Unknown')} ({c.get('phone', '')})"
-                    for c in contacts_result.data
+                    cid: f"{c.get('name', 'Unknown')} ({c.get('phone', '')})"
+                    for cid, c in contacts.items()
                 }
                 contact_totals["contact_name"] = contact_totals["contact_id"].map(
                     contact_map
@@ -505,7 +466,7 @@ def render_credit_ledger_tab(supabase: Client, business_id: str) -> None:
                 break
 
         if date_source_col is not None:
-            df["transaction_date_fmt"] = df[date_source_col].apply(format_datetime)
+            df["transaction_date_fmt"] = format_datetime_series(df[date_source_col])
 
         display_columns = [
             "contact_id",
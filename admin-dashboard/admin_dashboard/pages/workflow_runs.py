@@ -1,13 +1,40 @@
 """Workflow Runs page for the admin dashboard Streamlit app."""
 
-from datetime import datetime, timedelta
-from typing import Dict, List
+from datetime import datetime, time, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
 
 import pandas as pd
+import plotly.express as px
 import streamlit as st
 from supabase import Client
 
-from ..supabase_utils import format_datetime, format_duration, get_subscription_plans, safe_query
+from .. import tiles
+from ..business_directory import load_business_directory
+from ..export import EXPORT_FORMATS, EXPORT_MAX_MB, export_runs
+from ..pagination import KeysetCursor
+from ..run_cache import (
+    RUN_LIST_COLUMNS,
+    RunFilters,
+    count_runs,
+    fetch_run,
+    fetch_runs_page,
+    run_cache,
+)
+from ..supabase_utils import (
+    format_datetime,
+    format_datetime_series,
+    format_duration,
+    format_duration_series,
+    get_subscription_plans,
+    safe_query,
+)
+from ..ui import business_picker, fragment
+
+PAGE_SIZES = [50, 100, 200, 500]
+
+# Columns of the step table embedded in the run detail view
+RUN_STEP_COLUMNS = "id, step_order, node_name, module_phase, intent_action, status, started_at, duration_ms"
 
 
 def render_workflow_runs_page(supabase: Client) -> None:
@@ -35,18 +62,10 @@ def render_workflow_runs_page(supabase: Client) -> None:
     with col3:
         workflow_name_filter = st.text_input("Workflow Name", key="runs_workflow")
 
-    col4, col5 = st.columns(2)
+    col4, col5, col6 = st.columns(3)
 
     with col4:
-        # Get businesses for dropdown
-        businesses_result = safe_query(
-            lambda: supabase.table("businesses").select("id, name").execute()
-        )
-        businesses = businesses_result.data if businesses_result else []
-        business_options: Dict[str, str] = {b["name"]: b["id"] for b in businesses}
-        business_filter = st.selectbox(
-            "Business", options=["All"] + list(business_options.keys()), key="runs_business"
-        )
+        business_filter = business_picker(supabase, key="runs_business", allow_all=True)
 
     with col5:
         plans = get_subscription_plans(supabase)
@@ -55,55 +74,76 @@ def render_workflow_runs_page(supabase: Client) -> None:
             "Plan", options=["All"] + plan_codes, key="runs_plan"
         )
 
-    # Build query
-    query = supabase.table("workflow_runs").select("*")
-
-    if date_range and len(date_range) == 2:
-        query = query.gte("start_time", date_range[0].isoformat())
-        query = query.lte("start_time", (date_range[1] + timedelta(days=1)).isoformat())
-
-    if status_filter:
-        query = query.in_("status", status_filter)
-
-    if workflow_name_filter:
-        query = query.ilike("workflow_name", f"%{workflow_name_filter}%")
-
-    if business_filter != "All":
-        business_id = business_options[business_filter]
-        query = query.eq("business_id", business_id)
-
-    if plan_filter != "All":
-        query = query.eq("plan_code", plan_filter)
+    with col6:
+        page_size = st.selectbox(
+            "Page size", options=PAGE_SIZES, index=PAGE_SIZES.index(100), key="runs_page_size"
+        )
 
-    # Execute query
-    result = safe_query(
-        lambda: query.order("start_time", desc=True).limit(100).execute()
+    # Build filter spec; results are served from the incremental run cache,
+    # so reruns only download runs created or updated since the last fetch.
+    has_range = bool(date_range) and len(date_range) == 2
+    filters = RunFilters(
+        start=date_range[0].isoformat() if has_range else None,
+        end=(date_range[1] + timedelta(days=1)).isoformat() if has_range else None,
+        statuses=tuple(sorted(status_filter)),
+        workflow_name=workflow_name_filter,
+        business_id=business_filter,
+        plan_code=plan_filter if plan_filter != "All" else None,
     )
 
-    if result and result.data:
-        runs = result.data
-
-        st.subheader(f"Results ({len(runs)} runs)")
+    if has_range:
+        render_range_overview(
+            supabase,
+            datetime.combine(date_range[0], time.min),
+            datetime.combine(date_range[1] + timedelta(days=1), time.min),
+        )
 
-        # Get business names for display
-        business_ids: List[str] = list({r["business_id"] for r in runs})
-        businesses_result = safe_query(
-            lambda: supabase.table("businesses")
-            .select("id, name")
-            .in_("id", business_ids)
-            .execute()
+    # Keyset pagination: remember the cursor of every page navigated past, and
+    # start over whenever the filters or the page size change.
+    if st.session_state.get("runs_page_spec") != (filters, page_size):
+        st.session_state.runs_page_spec = (filters, page_size)
+        st.session_state.runs_cursors = []
+    cursors: List[KeysetCursor] = st.session_state.runs_cursors
+
+    # Execute query. The first page is served from the incremental run cache;
+    # deeper pages are keyset queries that cost the same as the first page.
+    if cursors:
+        page = safe_query(
+            lambda: fetch_runs_page(
+                supabase, filters, page_size, cursors[-1], columns=RUN_LIST_COLUMNS
+            )
         )
-        business_map: Dict[str, str] = (
-            {b["id"]: b["name"] for b in businesses_result.data}
-            if businesses_result
-            else {}
+        runs, next_cursor = page if page else ([], None)
+    else:
+        # One extra row tells whether a next page exists, as in fetch_keyset_page
+        runs = (
+            safe_query(
+                lambda: run_cache.fetch(
+                    supabase, filters, limit=page_size + 1, columns=RUN_LIST_COLUMNS
+                )
+            )
+            or []
+        )
+        next_cursor = None
+        if len(runs) > page_size:
+            runs = runs[:page_size]
+            next_cursor = KeysetCursor.after(runs[-1], "start_time")
+
+    total = safe_query(lambda: count_runs(supabase, filters), "Failed to count workflow runs")
+
+    if runs:
+        first_row = len(cursors) * page_size + 1
+        st.subheader(f"Results ({total if total is not None else '?'} runs)")
+        st.caption(
+            f"Page {len(cursors) + 1} · showing runs {first_row}–{first_row + len(runs) - 1}"
         )
 
         # Create display dataframe
         df = pd.DataFrame(runs)
-        df["business_name"] = df["business_id"].map(business_map)
-        df["start_time_fmt"] = df["start_time"].apply(format_datetime)
-        df["duration_fmt"] = df["duration_ms"].apply(format_duration)
+        directory = load_business_directory(supabase)
+        df["business_name"] = directory.map_names(df["business_id"])
+        df["start_time_fmt"] = format_datetime_series(df["start_time"])
+        df["duration_fmt"] = format_duration_series(df["duration_ms"])
 
         display_df = df[
             [
@@ -131,16 +171,22 @@ def render_workflow_runs_page(supabase: Client) -> None:
         ]
 
         st.dataframe(display_df, use_container_width=True, hide_index=True)
+    else:
+        st.info("No workflow runs found matching the filters")
 
-        # Export to CSV
-        if st.button("📥 Export to CSV"):
-            csv = df.to_csv(index=False)
-            st.download_button(
-                label="Download CSV",
-                data=csv,
-                file_name=f"workflow_runs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
-            )
+    # Outside the results block so an emptied page can always go back
+    col1, col2, _ = st.columns([1, 1, 6])
+    with col1:
+        if st.button("◀ Previous", disabled=not cursors, key="runs_prev_page"):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        if st.button("Next ▶", disabled=next_cursor is None, key="runs_next_page"):
+            cursors.append(next_cursor)
+            st.rerun()
+
+    if runs:
+        render_export(supabase, filters, total)
 
         # Run detail view
         st.markdown("---")
@@ -149,23 +195,163 @@ def render_workflow_runs_page(supabase: Client) -> None:
         run_options: Dict[str, str] = {
             f"{r['workflow_name']} - {r['id'][:8]}": r["id"] for r in runs
         }
-        selected_run_label = st.selectbox(
-            "Select run to view details",
-            options=list(run_options.keys()),
-            key="selected_run",
+        render_run_picker(supabase, run_options)
+
+
+def render_range_overview(supabase: Client, start: datetime, end: datetime) -> None:
+    """Status counts, runs per day and durations of all runs in ``[start, end)``.
+
+    Assembled from cached day/hour tiles, so long ranges cost about as much as
+    short ones. The other filters are not applied.
+    """
+    with st.expander("📈 Range overview"):
+        run_tiles = safe_query(
+            lambda: tiles.run_tiles(supabase, start, end), "Failed to load run statistics"
         )
+        if not run_tiles:
+            return
+        runs = tiles.combine(run_tiles, start)
+        if not runs.total:
+            st.info("No workflow runs in this date range")
+            return
+
+        st.caption("All runs in the date range; the other filters are not applied.")
+        columns = st.columns(len(runs.by_status) + 1)
+        columns[0].metric("Runs", f"{runs.total:,}")
+        for column, (status, count) in zip(columns[1:], sorted(runs.by_status.items())):
+            column.metric(status, f"{count:,}")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            daily_counts = pd.DataFrame(
+                [
+                    {"date": day.start.date(), "status": status, "count": count}
+                    for day in tiles.by_day(run_tiles)
+                    for status, count in day.by_status.items()
+                ]
+            )
+            fig = px.bar(
+                daily_counts,
+                x="date",
+                y="count",
+                color="status",
+                title="Runs per Day",
+                labels={"date": "Date", "count": "Number of Runs", "status": "Status"},
+            )
+            st.plotly_chart(fig, use_container_width=True)
+        with col2:
+            durations = pd.DataFrame(
+                {"duration": tiles.DURATION_BIN_LABELS, "runs": runs.histogram}
+            )
+            fig = px.bar(
+                durations,
+                x="duration",
+                y="runs",
+                title="Run Durations",
+                labels={"duration": "Duration", "runs": "Number of Runs"},
+            )
+            st.plotly_chart(fig, use_container_width=True)
 
-        if selected_run_label:
-            selected_run_id = run_options[selected_run_label]
-            selected_run = next(r for r in runs if r["id"] == selected_run_id)
 
-            render_run_detail(supabase, selected_run)
-    else:
-        st.info("No workflow runs found matching the filters")
+def render_export(supabase: Client, filters: RunFilters, total: Optional[int]) -> None:
+    """Export every run matching ``filters`` (not just this page) to a file."""
+    with st.expander("📥 Export all matching runs"):
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            fmt = st.radio(
+                "Format", options=list(EXPORT_FORMATS), horizontal=True, key="runs_export_format"
+            )
+        suffix = EXPORT_FORMATS[fmt]
+        st.caption(
+            f"Files are capped at {EXPORT_MAX_MB:g} MB; narrow the filters to export more."
+        )
+
+        # The finished file is kept per (filters, format) until either changes,
+        # so the download survives reruns without re-exporting.
+        previous = st.session_state.get("runs_export")
+        if previous and previous["spec"] != (filters, suffix):
+            Path(previous["path"]).unlink(missing_ok=True)
+            st.session_state.runs_export = previous = None
+
+        with col2:
+            start = st.button("Prepare export", key="runs_export_start")
+        if start:
+            if previous:
+                Path(previous["path"]).unlink(missing_ok=True)
+                st.session_state.runs_export = previous = None
+            progress = st.progress(0.0, text="Exporting…")
+
+            def on_progress(written: int) -> None:
+                fraction = min(written / total, 1.0) if total else 0.0
+                progress.progress(fraction, text=f"Exported {written:,} runs…")
+
+            result = safe_query(
+                lambda: export_runs(
+                    supabase,
+                    filters,
+                    suffix=suffix,
+                    directory=load_business_directory(supabase),
+                    on_progress=on_progress,
+                ),
+                "Failed to export workflow runs",
+            )
+            progress.empty()
+            if result:
+                path, written, truncated = result
+                previous = {
+                    "spec": (filters, suffix),
+                    "path": str(path),
+                    "rows": written,
+                    "truncated": truncated,
+                }
+                st.session_state.runs_export = previous
+
+        if previous:
+            path = Path(previous["path"])
+            if previous["rows"] and path.exists():
+                if previous["truncated"]:
+                    st.warning(
+                        f"Export stopped at {previous['rows']:,} runs, the {EXPORT_MAX_MB:g} MB "
+                        "size cap; narrow the filters to export the rest."
+                    )
+                # Read only when clicked, not into memory on every rerun
+                st.download_button(
+                    label=f"Download {previous['rows']:,} runs ({path.stat().st_size / 1_048_576:.1f} MB)",
+                    data=path.read_bytes,
+                    file_name=f"workflow_runs_{datetime.now().strftime('%Y%m%d_%H%M%S')}{suffix}",
+                    mime="application/gzip" if suffix.endswith(".gz") else "application/octet-stream",
+                    key="runs_export_download",
+                )
+            elif previous["rows"]:
+                st.info("This export has expired; prepare it again")
+            else:
+                st.info("No runs to export")
+
+
+@fragment
+def render_run_picker(supabase: Client, run_options: Dict[str, str]) -> None:
+    """Run selector plus detail view; switching runs reruns only this fragment."""
+    selected_run_label = st.selectbox(
+        "Select run to view details",
+        options=list(run_options.keys()),
+        key="selected_run",
+    )
+
+    if selected_run_label:
+        render_run_detail(supabase, run_options[selected_run_label])
+
+
+def render_run_detail(supabase: Client, run_id: str) -> None:
+    """Render detailed view of a single workflow run.
 
+    The listing only carries scalar columns, so the full row (with its JSON
+    payloads) is fetched here for the selected run alone.
+    """
+    run = safe_query(lambda: fetch_run(supabase, run_id), "Failed to load workflow run")
+    if not run:
+        st.info("This run no longer exists")
+        return
 
-def render_run_detail(supabase: Client, run: Dict) -> None:
-    """Render detailed view of a single workflow run."""
     col1, col2 = st.columns(2)
 
     with col1:
@@ -199,7 +385,7 @@ def render_run_detail(supabase: Client, run: Dict) -> None:
 
     steps_result = safe_query(
         lambda: supabase.table("workflow_step_logs")
-        .select("*")
+        .select(RUN_STEP_COLUMNS)
         .eq("run_id", run["id"])
         .order("step_order")
         .execute()
@@ -209,8 +395,8 @@ def render_run_detail(supabase: Client, run: Dict) -> None:
         steps = steps_result.data
 
         df = pd.DataFrame(steps)
-        df["started_at_fmt"] = df["started_at"].apply(format_datetime)
-        df["duration_fmt"] = df["duration_ms"].apply(format_duration)
+        df["started_at_fmt"] = format_datetime_series(df["started_at"])
+        df["duration_fmt"] = format_duration_series(df["duration_ms"])
 
         display_df = df[
             [
@@ -0,0 +1,69 @@
+"""Keyset (cursor) pagination helpers for PostgREST queries.
+
+OFFSET pagination makes the database walk and discard every skipped row, so
+deep pages get slower as the table grows. Keyset pagination instead asks for
+rows strictly after the last row already seen, ordered by ``(sort_column, id)``,
+which an index on those columns serves in constant time at any depth.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class KeysetCursor:
+    """Position after which the next page starts: the last row's sort key and id."""
+
+    sort_value: str
+    row_id: str
+
+    @classmethod
+    def after(cls, row: Dict, sort_column: str, id_column: str = "id") -> "KeysetCursor":
+        return cls(str(row[sort_column]), str(row[id_column]))
+
+
+def apply_keyset(
+    query,
+    cursor: Optional[KeysetCursor],
+    sort_column: str,
+    desc: bool = True,
+    id_column: str = "id",
+):
+    """Filter ``query`` to rows after ``cursor`` and order it by ``(sort_column, id)``."""
+    if cursor is not None:
+        op = "lt" if desc else "gt"
+        # Values are double-quoted because timestamps contain characters
+        # (".", ":") that are reserved in PostgREST logic-tree syntax.
+        value = cursor.sort_value.replace('"', '\\"')
+        row_id = cursor.row_id.replace('"', '\\"')
+        query = query.or_(
+            f'{sort_column}.{op}."{value}",'
+            f'and({sort_column}.eq."{value}",{id_column}.{op}."{row_id}")'
+        )
+    return query.order(sort_column, desc=desc).order(id_column, desc=desc)
+
+
+def fetch_keyset_page(
+    query,
+    page_size: int,
+    cursor: Optional[KeysetCursor],
+    sort_column: str,
+    desc: bool = True,
+    id_column: str = "id",
+) -> Tuple[List[Dict], Optional[KeysetCursor]]:
+    """Fetch one page and return ``(rows, next_cursor)``.
+
+    One extra row is requested to learn whether another page exists;
+    ``next_cursor`` is ``None`` on the last page. Raises on query failure.
+    """
+    rows = (
+        apply_keyset(query, cursor, sort_column, desc, id_column)
+        .limit(page_size + 1)
+        .execute()
+        .data
+        or []
+    )
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, KeysetCursor.after(rows[-1], sort_column, id_column)
@@ -0,0 +1,139 @@
+"""Opt-in ``cProfile`` profiling of page renders.
+
+With ``PROFILE_PAGES=on`` each ``render_*_page`` call runs under ``cProfile``.
+The stats are saved as ``.prof`` files in ``PROFILE_DIR`` (the newest
+``PROFILE_KEEP`` are kept) for offline analysis with ``snakeviz``,
+``flameprof`` or ``python -m pstats``. ``app.py`` shows a summary under the
+page: self time grouped by library (PostgREST/HTTP, pandas, plotly,
+Streamlit, ...) and the top functions by cumulative time.
+
+``cProfile`` only sees the script thread; queries run on the shared pool show
+up as time spent waiting on their futures. Only one render in the process is
+profiled at a time; concurrent renders by other sessions run unprofiled.
+"""
+
+import cProfile
+import pstats
+import re
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import get_bool_config, get_config_value, get_int_config
+
+PROFILE_DIR = Path(
+    get_config_value("PROFILE_DIR") or Path(tempfile.gettempdir()) / "admin-dashboard-profiles"
+)
+PROFILE_KEEP = get_int_config("PROFILE_KEEP", 20)
+
+# Library buckets for self time, matched against the function's file path
+_CATEGORIES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("PostgREST / HTTP", ("postgrest", "supabase", "httpx", "httpcore", "h2", "ssl", "socket")),
+    ("pandas / numpy", ("pandas", "numpy", "pyarrow")),
+    ("plotly", ("plotly",)),
+    ("Streamlit", ("streamlit",)),
+    ("Waiting on threads", ("threading", "concurrent")),
+    ("admin_dashboard", ("admin_dashboard", "app.py")),
+]
+
+# Serializes profilers: only one cProfile can be active per process
+_active = threading.Lock()
+
+
+@dataclass
+class PageProfile:
+    """Summary of one profiled page render."""
+
+    page: str
+    total_ms: float
+    path: Optional[Path]
+    categories: Dict[str, float] = field(default_factory=dict)  # self time (ms)
+    top: List[Dict] = field(default_factory=list)
+
+
+def profiling_enabled() -> bool:
+    return get_bool_config("PROFILE_PAGES", False)
+
+
+def _category(filename: str, name: str) -> str:
+    if filename == "~":
+        # Built-ins: a blocking lock acquire is the script waiting on the pool
+        return "Waiting on threads" if "lock" in name else "Other"
+    parts = set(re.split(r"[\\/.]", filename))
+    for label, packages in _CATEGORIES:
+        if any(p in parts for p in packages) or any(filename.endswith(p) for p in packages):
+            return label
+    return "Other"
+
+
+def _summarize(stats: pstats.Stats, limit: int) -> Tuple[Dict[str, float], List[Dict]]:
+    categories: Dict[str, float] = {}
+    rows = []
+    for (filename, line, name), (_, calls, self_time, cumulative, _) in stats.stats.items():
+        label = _category(filename, name)
+        categories[label] = categories.get(label, 0.0) + self_time * 1000
+        rows.append(
+            {
+                "function": f"{name} ({Path(filename).name}:{line})",
+                "library": label,
+                "calls": calls,
+                "self_ms": round(self_time * 1000, 1),
+                "cumulative_ms": round(cumulative * 1000, 1),
+            }
+        )
+    rows.sort(key=lambda r: r["cumulative_ms"], reverse=True)
+    categories = dict(sorted(categories.items(), key=lambda kv: kv[1], reverse=True))
+    return categories, rows[:limit]
+
+
+def _save(profiler: cProfile.Profile, page: str) -> Optional[Path]:
+    """Dump the stats to ``PROFILE_DIR`` and prune old files; None on failure."""
+    slug = re.sub(r"[^a-z0-9]+", "-", page.lower()).strip("-") or "page"
+    try:
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        path = PROFILE_DIR / f"{datetime.now():%Y%m%d_%H%M%S_%f}_{slug}.prof"
+        profiler.dump_stats(path)
+        for old in sorted(PROFILE_DIR.glob("*.prof"))[: -max(PROFILE_KEEP, 1)]:
+            old.unlink(missing_ok=True)
+        return path
+    except OSError:
+        return None
+
+
+def profile_call(
+    page: str, func: Callable[..., Any], *args: Any, limit: int = 25, **kwargs: Any
+) -> Optional[PageProfile]:
+    """Call ``func`` under ``cProfile`` and return a summary of the run.
+
+    Returns ``None`` (after calling ``func`` unprofiled) when another render is
+    already being profiled. Exceptions from ``func``, including Streamlit's
+    rerun/stop control flow, propagate; the profile is discarded then.
+    """
+    if not _active.acquire(blocking=False):
+        func(*args, **kwargs)
+        return None
+
+    profiler = cProfile.Profile()
+    try:
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            func(*args, **kwargs)
+        finally:
+            profiler.disable()
+        total_ms = (time.perf_counter() - started) * 1000
+    finally:
+        _active.release()
+
+    categories, top = _summarize(pstats.Stats(profiler), limit)
+    return PageProfile(
+        page=page,
+        total_ms=total_ms,
+        path=_save(profiler, page),
+        categories=categories,
+        top=top,
+    )
@@ -0,0 +1,281 @@
+"""Incremental, high-water-mark cache of ``workflow_runs`` result sets.
+
+The Workflow Runs page re-runs the same filtered query on every rerun. Instead
+of re-downloading the whole window each time, the cache keeps the rows already
+fetched for each filter spec and afterwards only asks for rows whose
+``updated_at`` is newer than the last high-water mark. Changed rows (e.g. a run
+going from Running to Succeeded) replace their cached version by ``id``.
+
+Relies on the ``updated_at`` column and trigger from
+``migrations/002_workflow_runs_updated_at.sql``. If the column is missing, the
+first query fails with PostgREST's "undefined column" error; the cache then
+stops asking for ``updated_at`` and falls back to a full reload on every
+fetch.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from supabase import Client
+
+from .cache import cached_query
+from .pagination import KeysetCursor, fetch_keyset_page
+
+logger = logging.getLogger(__name__)
+
+UPDATED_AT_COLUMN = "updated_at"
+
+# Postgres "undefined_column" error code, as reported by PostgREST
+_UNDEFINED_COLUMN = "42703"
+
+# Scalar columns shown in run listings. Heavy JSON columns
+# (``entry_payload_summary``, ``allowed_modules``) are only loaded for the
+# selected run via ``fetch_run``.
+RUN_LIST_COLUMNS = (
+    "id, workflow_name, business_id, plan_code, status, trigger_type, "
+    "environment, start_time, duration_ms"
+)
+
+
+def _parse_ts(value: Optional[str]) -> datetime:
+    if not value:
+        return datetime.min
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+
+
+@dataclass(frozen=True)
+class RunFilters:
+    """Hashable filter spec for a ``workflow_runs`` listing.
+
+    ``statuses`` is the only filter on a mutable column; it is applied
+    server-side on full loads and client-side to incremental deltas, so runs
+    that change status drop out of (or into) the cached result correctly.
+    """
+
+    start: Optional[str] = None
+    end: Optional[str] = None
+    statuses: Tuple[str, ...] = ()
+    workflow_name: str = ""
+    business_id: Optional[str] = None
+    plan_code: Optional[str] = None
+
+    def apply(self, query, include_mutable: bool = True):
+        """Apply the filters to a PostgREST query builder."""
+        if self.start:
+            query = query.gte("start_time", self.start)
+        if self.end:
+            query = query.lte("start_time", self.end)
+        if self.workflow_name:
+            query = query.ilike("workflow_name", f"%{self.workflow_name}%")
+        if self.business_id:
+            query = query.eq("business_id", self.business_id)
+        if self.plan_code:
+            query = query.eq("plan_code", self.plan_code)
+        if include_mutable and self.statuses:
+            query = query.in_("status", list(self.statuses))
+        return query
+
+    def matches(self, row: Dict) -> bool:
+        """Client-side check for the mutable filters."""
+        return not self.statuses or row.get("status") in self.statuses
+
+
+@dataclass
+class _Snapshot:
+    rows: Dict[str, Dict]
+    high_water_mark: Optional[str]
+    truncated: bool
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+class IncrementalRunCache:
+    """Process-wide cache of ``workflow_runs`` rows keyed by filter spec."""
+
+    def __init__(
+        self,
+        max_specs: int = 64,
+        lookback_seconds: float = 30.0,
+        resync_seconds: float = 900.0,
+        max_delta_rows: int = 1000,
+    ) -> None:
+        self.max_specs = max_specs
+        self.lookback = timedelta(seconds=lookback_seconds)
+        self.resync_seconds = resync_seconds
+        self.max_delta_rows = max_delta_rows
+        self._lock = threading.Lock()
+        self._snapshots: "OrderedDict[Tuple, _Snapshot]" = OrderedDict()
+        # Cleared once a query shows migration 002 is not applied
+        self.has_updated_at = True
+
+    def fetch(
+        self,
+        supabase: Client,
+        filters: RunFilters,
+        limit: int = 100,
+        columns: str = "*",
+    ) -> List[Dict]:
+        """Return the newest ``limit`` runs matching ``filters``.
+
+        The first call per ``(filters, limit, columns)`` does a full load; later
+        calls fetch only the delta since the high-water mark. A full reload is
+        forced every ``resync_seconds`` (to pick up deletes), when the delta is
+        unexpectedly large, or when a truncated result can no longer be
+        completed from the delta alone. Without the ``updated_at`` column every
+        call is a full load.
+        """
+        if columns != "*" and UPDATED_AT_COLUMN not in columns and self.has_updated_at:
+            try:
+                return self._fetch(supabase, filters, limit, f"{columns}, {UPDATED_AT_COLUMN}")
+            except Exception as e:
+                if getattr(e, "code", None) != _UNDEFINED_COLUMN or UPDATED_AT_COLUMN not in str(e):
+                    raise
+                logger.warning(
+                    "workflow_runs.%s is missing (apply migrations/002); "
+                    "falling back to full reloads",
+                    UPDATED_AT_COLUMN,
+                )
+                self.has_updated_at = False
+        return self._fetch(supabase, filters, limit, columns)
+
+    def _fetch(self, supabase: Client, filters: RunFilters, limit: int, columns: str) -> List[Dict]:
+        key = (filters, limit, columns)
+
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None:
+                self._snapshots.move_to_end(key)
+
+        if snapshot is None or time.monotonic() - snapshot.loaded_at >= self.resync_seconds:
+            snapshot = self._full_load(supabase, filters, limit, columns)
+        else:
+            snapshot = self._refresh(supabase, filters, limit, columns, snapshot)
+
+        with self._lock:
+            self._snapshots[key] = snapshot
+            self._snapshots.move_to_end(key)
+            while len(self._snapshots) > self.max_specs:
+                self._snapshots.popitem(last=False)
+
+        return self._ordered(snapshot.rows.values())[:limit]
+
+    def clear(self) -> None:
+        """Drop every cached result set."""
+        with self._lock:
+            self._snapshots.clear()
+
+    @staticmethod
+    def _ordered(rows) -> List[Dict]:
+        return sorted(
+            rows, key=lambda r: (_parse_ts(r.get("start_time")), r["id"]), reverse=True
+        )
+
+    @staticmethod
+    def _high_water_mark(rows, current: Optional[str] = None) -> Optional[str]:
+        marks = [r.get(UPDATED_AT_COLUMN) for r in rows if r.get(UPDATED_AT_COLUMN)]
+        if current:
+            marks.append(current)
+        return max(marks, key=_parse_ts) if marks else None
+
+    def _full_load(self, supabase: Client, filters: RunFilters, limit: int, columns: str) -> _Snapshot:
+        query = filters.apply(supabase.table("workflow_runs").select(columns))
+        rows = (
+            query.order("start_time", desc=True).order("id", desc=True).limit(limit).execute().data
+            or []
+        )
+        return _Snapshot(
+            rows={r["id"]: r for r in rows},
+            high_water_mark=self._high_water_mark(rows),
+            truncated=len(rows) >= limit,
+        )
+
+    def _refresh(
+        self, supabase: Client, filters: RunFilters, limit: int, columns: str, snapshot: _Snapshot
+    ) -> _Snapshot:
+        if snapshot.high_water_mark is None:
+            return self._full_load(supabase, filters, limit, columns)
+
+        since = _parse_ts(snapshot.high_water_mark) - self.lookback
+        query = filters.apply(
+            supabase.table("workflow_runs").select(columns), include_mutable=False
+        )
+        try:
+            delta = (
+                query.gte(UPDATED_AT_COLUMN, since.isoformat())
+                .order(UPDATED_AT_COLUMN)
+                .limit(self.max_delta_rows)
+                .execute()
+                .data
+                or []
+            )
+        except Exception as e:
+            logger.warning("Incremental workflow_runs refresh failed, reloading: %s", e)
+            return self._full_load(supabase, filters, limit, columns)
+
+        if len(delta) >= self.max_delta_rows:
+            return self._full_load(supabase, filters, limit, columns)
+
+        rows = dict(snapshot.rows)
+        oldest = (
+            min((_parse_ts(r.get("start_time")) for r in rows.values()), default=None)
+            if snapshot.truncated
+            else None
+        )
+        for row in delta:
+            if not filters.matches(row):
+                rows.pop(row["id"], None)
+            elif oldest is None or _parse_ts(row.get("start_time")) >= oldest:
+                rows[row["id"]] = row
+
+        # A truncated result that lost rows cannot be completed from the delta
+        # (the next-older runs were never fetched), so reload it.
+        if snapshot.truncated and len(rows) < limit:
+            return self._full_load(supabase, filters, limit, columns)
+
+        if len(rows) > limit:
+            rows = {r["id"]: r for r in self._ordered(rows.values())[:limit]}
+
+        return _Snapshot(
+            rows=rows,
+            high_water_mark=self._high_water_mark(delta, snapshot.high_water_mark),
+            truncated=snapshot.truncated or len(rows) >= limit,
+            loaded_at=snapshot.loaded_at,
+        )
+
+
+run_cache = IncrementalRunCache()
+
+
+@cached_query("workflow_runs", ttl=120)
+def count_runs(_supabase: Client, filters: RunFilters) -> Optional[int]:
+    """Cached exact count of runs matching ``filters``; raises on failure."""
+    query = filters.apply(_supabase.table("workflow_runs").select("id", count="exact", head=True))
+    return query.execute().count
+
+
+@cached_query("workflow_runs", ttl=60)
+def fetch_runs_page(
+    _supabase: Client,
+    filters: RunFilters,
+    page_size: int,
+    cursor: KeysetCursor,
+    columns: str = "*",
+) -> Tuple[List[Dict], Optional[KeysetCursor]]:
+    """Fetch the page of runs after ``cursor`` (newest first) by keyset pagination.
+
+    The first page comes from ``run_cache``; this serves the deeper pages, which
+    cost the same as the first one thanks to the ``(start_time, id)`` index.
+    """
+    query = filters.apply(_supabase.table("workflow_runs").select(columns))
+    return fetch_keyset_page(query, page_size, cursor, sort_column="start_time")
+
+
+@cached_query("workflow_runs", ttl=30)
+def fetch_run(_supabase: Client, run_id: str) -> Optional[Dict]:
+    """Cached full row (including JSON columns) for one run; raises on failure."""
+    rows = _supabase.table("workflow_runs").select("*").eq("id", run_id).limit(1).execute().data
+    return rows[0] if rows else None
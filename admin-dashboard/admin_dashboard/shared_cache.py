@@ -0,0 +1,275 @@
+"""Cross-process second-level cache for ``cached_query`` results.
+
+``query_cache`` lives in one process, so every replica (and the warmup CLI
+started by ``start.sh``) pays for its own cold queries. With
+``SHARED_CACHE_PATH`` set, ``cached_query`` also looks misses up in a
+``SharedCache`` and stores fresh results there, so a result computed by any
+process on the host is reused by the others.
+
+Values are pickled and zlib-compressed, expire after the query's TTL and count
+against a size budget (least recently used entries are evicted first).
+Invalidation is version-stamped: each table has a version number in the
+backend, cache keys embed the versions of the tables they read, and
+``invalidate`` bumps them, so writes in one process make the other processes'
+keys miss without scanning entries. Versions are re-read at most every
+``SHARED_CACHE_VERSION_TTL_SECONDS``, which bounds how stale another process
+can be after a write.
+
+``SQLiteBackend`` stores everything in one SQLite file (use a volume shared
+by the processes). A networked store such as Redis can be plugged in by
+implementing ``SharedCacheBackend`` and installing it with
+``cache.set_shared_cache(SharedCache(MyBackend(...)))``.
+
+Backend errors are logged and treated as misses; the shared cache never makes
+a query fail. While versions cannot be read, ``cached_query`` skips the shared
+layer and behaves as if none were configured.
+"""
+
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .config import get_config_value, get_float_config
+
+logger = logging.getLogger(__name__)
+
+
+class SharedCacheBackend(ABC):
+    """Storage for compressed entries and per-tag version numbers."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the stored bytes for ``key``, or ``None`` if missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store ``value`` for ``ttl`` seconds, evicting entries over the budget."""
+
+    @abstractmethod
+    def versions(self, tags: Iterable[str]) -> Dict[str, int]:
+        """Return the current version of each tag (0 if never bumped)."""
+
+    @abstractmethod
+    def bump(self, tags: Iterable[str]) -> None:
+        """Increment the version of each tag."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every entry and invalidate every tag."""
+
+
+class SQLiteBackend(SharedCacheBackend):
+    """``SharedCacheBackend`` in a SQLite file, safe across processes (WAL mode)."""
+
+    # Refresh an entry's LRU timestamp at most this often (seconds), to keep
+    # hits read-mostly
+    ACCESS_RESOLUTION = 60
+    # Check the size budget every this many writes
+    EVICT_EVERY = 20
+
+    def __init__(self, path: str, max_bytes: int) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._writes = 0
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(
+            path, timeout=5, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (accessed_at)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS tag_versions ("
+            " tag TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, expires_at, accessed_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at, accessed_at = row
+            if expires_at <= now:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            if now - accessed_at > self.ACCESS_RESOLUTION:
+                self._db.execute(
+                    "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+        return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now + ttl, now),
+            )
+            self._writes += 1
+            if self._writes % self.EVICT_EVERY == 0:
+                self._evict(now)
+
+    def versions(self, tags: Iterable[str]) -> Dict[str, int]:
+        tags = list(tags)
+        if not tags:
+            return {}
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT tag, version FROM tag_versions WHERE tag IN ({','.join('?' * len(tags))})",
+                tags,
+            ).fetchall()
+        found = dict(rows)
+        return {tag: found.get(tag, 0) for tag in tags}
+
+    def bump(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO tag_versions (tag, version) VALUES (?, 1)"
+                " ON CONFLICT (tag) DO UPDATE SET version = version + 1",
+                [(tag,) for tag in tags],
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._db.execute("UPDATE tag_versions SET version = version + 1")
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones down to 90%."""
+        self._db.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        total = self._db.execute("SELECT total(size) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        while total > target:
+            rows = self._db.execute(
+                "SELECT key, size FROM entries ORDER BY accessed_at LIMIT 50"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                if total <= target:
+                    break
+
+
+class SharedCache:
+    """Compressed, version-stamped cache on top of a ``SharedCacheBackend``."""
+
+    def __init__(
+        self, backend: SharedCacheBackend, max_entry_bytes: int, version_ttl: float = 1.0
+    ) -> None:
+        self.backend = backend
+        self.max_entry_bytes = max_entry_bytes
+        self.version_ttl = version_ttl
+        self._lock = threading.Lock()
+        # tag -> (version, monotonic time it was read)
+        self._versions: Dict[str, Tuple[int, float]] = {}
+
+    def version_stamp(self, tags: Iterable[str]) -> Optional[str]:
+        """Return ``"tag=version,..."`` for ``tags``, to be embedded in cache keys.
+
+        Returns ``None`` when the versions cannot be read; callers then bypass
+        the shared cache and use plain local keys.
+        """
+        tags = sorted(set(tags))
+        now = time.monotonic()
+        with self._lock:
+            stale = [
+                tag
+                for tag in tags
+                if tag not in self._versions or now - self._versions[tag][1] > self.version_ttl
+            ]
+        if stale:
+            try:
+                fresh = self.backend.versions(stale)
+            except Exception as e:
+                logger.warning("Shared cache version read failed: %s", e)
+                return None
+            with self._lock:
+                for tag, version in fresh.items():
+                    self._versions[tag] = (version, now)
+        with self._lock:
+            return ",".join(f"{tag}={self._versions[tag][0]}" for tag in tags)
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return ``(value, remaining_ttl)``, or ``None`` if missing or unreadable."""
+        try:
+            payload = self.backend.get(key)
+            if payload is None:
+                return None
+            expires_at, value = pickle.loads(zlib.decompress(payload))
+        except Exception as e:
+            logger.warning("Shared cache read failed: %s", e)
+            return None
+        remaining = expires_at - time.time()
+        return (value, remaining) if remaining > 0 else None
+
+    def set(self, key: str, value: Any, ttl: float) -> bool:
+        """Store ``value``; returns False if it is too large or the write failed."""
+        try:
+            payload = zlib.compress(
+                pickle.dumps((time.time() + ttl, value), protocol=pickle.HIGHEST_PROTOCOL)
+            )
+            if len(payload) > self.max_entry_bytes:
+                return False
+            self.backend.set(key, payload, ttl)
+            return True
+        except Exception as e:
+            logger.warning("Shared cache write failed: %s", e)
+            return False
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        """Bump the versions of ``tags`` so every process's keys for them miss."""
+        tags = list(tags)
+        try:
+            self.backend.bump(tags)
+        except Exception as e:
+            logger.warning("Shared cache invalidation failed: %s", e)
+        with self._lock:
+            for tag in tags:
+                self._versions.pop(tag, None)
+
+    def clear(self) -> None:
+        try:
+            self.backend.clear()
+        except Exception as e:
+            logger.warning("Shared cache clear failed: %s", e)
+        with self._lock:
+            self._versions.clear()
+
+
+def from_config() -> Optional[SharedCache]:
+    """Build the SQLite-backed shared cache from settings; ``None`` if disabled."""
+    path = get_config_value("SHARED_CACHE_PATH")
+    if not path:
+        return None
+    try:
+        backend = SQLiteBackend(
+            path, max_bytes=int(get_float_config("SHARED_CACHE_MAX_MB", 256) * 1024 * 1024)
+        )
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("Shared cache disabled: cannot open %s: %s", path, e)
+        return None
+    return SharedCache(
+        backend,
+        max_entry_bytes=int(get_float_config("SHARED_CACHE_MAX_ENTRY_MB", 8) * 1024 * 1024),
+        version_ttl=get_float_config("SHARED_CACHE_VERSION_TTL_SECONDS", 1.0),
+    )
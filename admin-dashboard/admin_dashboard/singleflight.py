@@ -0,0 +1,138 @@
+"""Process-wide coalescing of identical concurrent work ("singleflight").
+
+When several sessions open the same page at once, or Refresh is clicked
+twice, identical queries used to run side by side and each paid full cost.
+Two layers now share one in-flight call between concurrent callers:
+
+- ``cached_query`` runs a cache miss through ``SingleFlight`` keyed by the
+  cache key, so concurrent misses compute once and the followers read the
+  freshly cached value.
+- ``CoalescingTransport`` wraps the pooled HTTP transport, so concurrent
+  identical GET/HEAD requests (same URL, normalized query and headers) share
+  one response. This covers queries that are not cached.
+
+Only concurrent calls are coalesced; nothing is kept once the call finishes.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from urllib.parse import parse_qsl
+
+import httpx
+
+# Request headers that do not change the response
+_IGNORED_HEADERS = {"user-agent", "accept-encoding", "connection", "x-client-info"}
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share it."""
+
+    def __init__(self, timeout: Optional[float] = None) -> None:
+        # Followers waiting longer than ``timeout`` seconds run ``fn`` themselves
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.led = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return ``(fn(), True)``, or ``(value, False)`` when joining a call in flight.
+
+        Followers receive the leader's value (the same object) or re-raise its
+        exception.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.led += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            if not call.done.wait(self.timeout):
+                return fn(), True
+            if call.error is not None:
+                raise call.error
+            return call.value, False
+
+        try:
+            call.value = fn()
+            return call.value, True
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Tuple[int, int]:
+        """Return ``(calls_led, calls_shared)`` since start."""
+        with self._lock:
+            return self.led, self.shared
+
+
+def request_key(request: httpx.Request) -> Tuple:
+    """Normalized identity of a request: URL, sorted query and relevant headers."""
+    url = request.url
+    query = tuple(sorted(parse_qsl(url.query.decode(), keep_blank_values=True)))
+    headers = tuple(
+        sorted(
+            (k.lower(), v)
+            for k, v in request.headers.items()
+            if k.lower() not in _IGNORED_HEADERS
+        )
+    )
+    return (request.method, url.scheme, url.netloc, url.path, query, headers)
+
+
+class CoalescingTransport(httpx.BaseTransport):
+    """Transport wrapper sharing one response among identical concurrent requests.
+
+    Only ``GET`` and ``HEAD`` requests are coalesced. The shared body is the
+    raw (still encoded) bytes, so each caller's client decodes its own copy.
+    Responses carry ``extensions["coalesced"] = True`` for callers that joined
+    another request.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, timeout: Optional[float] = None) -> None:
+        self._transport = transport
+        self.flight = SingleFlight(timeout)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method not in ("GET", "HEAD"):
+            return self._transport.handle_request(request)
+
+        def send() -> Tuple[int, list, bytes, Dict]:
+            response = self._transport.handle_request(request)
+            try:
+                body = b"".join(response.stream)
+            finally:
+                response.close()
+            extensions = {
+                k: v
+                for k, v in response.extensions.items()
+                if k in ("http_version", "reason_phrase")
+            }
+            return response.status_code, response.headers.raw, body, extensions
+
+        (status, headers, body, extensions), leader = self.flight.do(request_key(request), send)
+        return httpx.Response(
+            status,
+            headers=headers,
+            stream=httpx.ByteStream(body),
+            request=request,
+            extensions=dict(extensions, coalesced=not leader),
+        )
+
+    def close(self) -> None:
+        self._transport.close()
@@ -0,0 +1,61 @@
+"""Cold-start timing report.
+
+The container scales to zero, so the first request pays for imports, config
+resolution and client creation before the login form appears. ``app.py`` and
+``pages.load_page`` record how long each step took the first time it ran in
+this process; ``report()`` returns the phases in order and ``ui`` shows them
+in the performance panel. Each phase is also logged once at INFO level.
+
+Only this module and ``config`` should be imported before login: everything
+else (pandas, supabase, plotly) is loaded after the password check.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Process "start" as far as the app can tell: the first import of this module
+PROCESS_STARTED = time.perf_counter()
+
+_lock = threading.Lock()
+# phase -> (duration ms, ms since start when it finished)
+_phases: Dict[str, Tuple[float, float]] = {}
+
+
+def record(phase: str, duration_ms: float) -> None:
+    """Record ``phase`` the first time it happens in this process."""
+    with _lock:
+        if phase in _phases:
+            return
+        _phases[phase] = (duration_ms, since_start_ms())
+    logger.info(
+        "startup: %s took %.0f ms (%.0f ms since start)", phase, duration_ms, _phases[phase][1]
+    )
+
+
+def since_start_ms() -> float:
+    return (time.perf_counter() - PROCESS_STARTED) * 1000
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Record the duration of the ``with`` block as ``phase``.
+
+    The phase is recorded even if the block raises (e.g. ``st.stop()`` after
+    drawing the login form).
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, (time.perf_counter() - started) * 1000)
+
+
+def report() -> List[Tuple[str, float, float]]:
+    """Return ``(phase, duration_ms, since_start_ms)`` in the order recorded."""
+    with _lock:
+        return [(phase, *times) for phase, times in _phases.items()]
@@ -1,14 +1,21 @@
 """Supabase client initialization and shared utilities for the admin dashboard."""
 
-import os
+import contextvars
+import threading
 import warnings
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional
 
-from dotenv import load_dotenv
+import numpy as np
+import pandas as pd
 import streamlit as st
-from supabase import Client, create_client
+from supabase import Client
+
+from .config import get_config_value as _get_config_value, get_int_config
+from .cache import cached_query, clear_caches
+from .client_registry import PoolSettings, registry as _client_registry
+from .run_cache import run_cache
 
 # Suppress Streamlit warnings during import
 # These warnings are harmless and occur when Streamlit code is imported
@@ -17,44 +24,14 @@ warnings.filterwarnings("ignore", message=".*missing ScriptRunContext.*")
 warnings.filterwarnings("ignore", message=".*No runtime found.*")
 warnings.filterwarnings("ignore", message=".*Session state does not function.*")
 
-# Load environment variables from a .env file (if present).
-# Checks both the admin-dashboard directory and the monorepo root directory.
-# In production you should prefer real environment variables or Streamlit secrets;
-# this is mainly for local development.
-_current_dir = Path(__file__).parent.parent  # admin-dashboard directory
-_root_dir = _current_dir.parent  # monorepo root directory
-
-# Try loading from root first, then fall back to admin-dashboard directory
-load_dotenv(dotenv_path=_root_dir / ".env", override=False)
-load_dotenv(dotenv_path=_current_dir / ".env", override=False)
-
 
-def _get_config_value(name: str) -> Optional[str]:
-    """Return configuration value from Streamlit secrets or environment.
+def get_supabase_client() -> Client:
+    """Return the process-wide pooled Supabase client (service role key).
 
-    Order of precedence:
-    1. ``st.secrets[name]`` if available
-    2. ``os.environ[name]`` (which may have been populated by ``.env``)
+    The client is created once per server process and shared across sessions
+    and reruns; pool size and timeouts come from the ``SUPABASE_POOL_*`` and
+    ``SUPABASE_*_TIMEOUT`` settings.
     """
-
-    # 1) Streamlit secrets (e.g. for Streamlit Cloud or secret-managed envs)
-    try:
-        if hasattr(st, "secrets") and name in st.secrets:
-            value = st.secrets[name]
-            return str(value) if value is not None else None
-    except (RuntimeError, AttributeError):
-        # If not in Streamlit context or secrets are misconfigured, fall back to environment.
-        pass
-    except Exception:
-        # Other exceptions, fall back to environment
-        pass
-
-    # 2) Plain environment variables (including those loaded from .env)
-    return os.environ.get(name)
-
-
-def get_supabase_client() -> Client:
-    """Initialize and return Supabase client with service role key."""
     url = _get_config_value("SUPABASE_URL")
     key = _get_config_value("SUPABASE_SERVICE_KEY")
 
@@ -63,7 +40,7 @@ def get_supabase_client() -> Client:
         st.stop()
 
     try:
-        return create_client(url, key)
+        return _client_registry.get(url, key, PoolSettings.from_config(_get_config_value))
     except Exception as e:  # pragma: no cover - runtime error surface via Streamlit
         st.error(f"❌ Failed to initialize Supabase client: {e}")
         st.stop()
@@ -83,8 +60,82 @@ def safe_query(func: Callable[[], Any], error_msg: str = "Database query failed"
         return None
 
 
+_query_executor: Optional[ThreadPoolExecutor] = None
+_query_executor_lock = threading.Lock()
+# Marks the pool's worker threads (set by the executor's initializer)
+_pool_thread = threading.local()
+
+
+def _mark_pool_thread() -> None:
+    _pool_thread.active = True
+
+
+def _in_query_pool() -> bool:
+    """Return True on a query pool worker, where waiting on the pool could deadlock."""
+    return getattr(_pool_thread, "active", False)
+
+
+def _get_query_executor() -> ThreadPoolExecutor:
+    """Return the process-wide thread pool used by ``safe_query_batch``."""
+    global _query_executor
+    with _query_executor_lock:
+        if _query_executor is None:
+            workers = get_int_config("SUPABASE_QUERY_WORKERS", 8)
+            _query_executor = ThreadPoolExecutor(
+                max_workers=max(workers, 1),
+                thread_name_prefix="supabase-query",
+                initializer=_mark_pool_thread,
+            )
+        return _query_executor
+
+
+def _submit(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """Submit ``func`` to the query pool in a copy of the caller's context.
+
+    Context variables (e.g. the render log that query instrumentation writes
+    to) would otherwise be unset in the pool threads.
+    """
+    context = contextvars.copy_context()
+    return _get_query_executor().submit(context.run, func, *args, **kwargs)
+
+
+def safe_query_batch(
+    queries: Dict[str, Callable[[], Any]], error_msg: str = "Database query failed"
+) -> Dict[str, Optional[Any]]:
+    """Run independent queries concurrently with ``safe_query`` semantics.
+
+    Each callable runs on a shared thread pool, so the batch takes roughly as
+    long as its slowest query. Results are returned under the same keys; a
+    failed query maps to ``None`` and its error is rendered (from the calling
+    script thread, in key order) as ``"<error_msg> (<key>): <exception>"``.
+    """
+
+    futures = {name: _submit(func) for name, func in queries.items()}
+
+    results: Dict[str, Optional[Any]] = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as e:  # pragma: no cover - runtime error surface via Streamlit
+            st.error(f"{error_msg} ({name}): {str(e)}")
+            results[name] = None
+    return results
+
+
+def submit_query(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """Run ``func`` on the shared query pool without waiting for it.
+
+    Used to warm caches in the background; the callable must not call
+    Streamlit APIs.
+    """
+    return _submit(func, *args, **kwargs)
+
+
 def format_datetime(dt_str: Optional[str]) -> str:
-    """Format ISO datetime string for display."""
+    """Format ISO datetime string for display.
+
+    For DataFrame columns use ``format_datetime_series``.
+    """
     if not dt_str:
         return "N/A"
     try:
@@ -95,8 +146,11 @@ def format_datetime(dt_str: Optional[str]) -> str:
 
 
 def format_duration(ms: Optional[int]) -> str:
-    """Format duration in milliseconds to human-readable string."""
-    if ms is None:
+    """Format duration in milliseconds to human-readable string.
+
+    For DataFrame columns use ``format_duration_series``.
+    """
+    if ms is None or ms != ms:  # None or NaN
         return "N/A"
     if ms < 1000:
         return f"{ms}ms"
@@ -105,27 +159,81 @@ def format_duration(ms: Optional[int]) -> str:
     return f"{ms/60000:.2f}min"
 
 
-@st.cache_data(ttl=300)
+# Time part of an ISO timestamp followed by its UTC offset ("Z", "+05:30", ...)
+_ISO_OFFSET = r"([T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)(?:Z|[+-]\d{2}(?::?\d{2})?)$"
+
+
+def format_datetime_series(values: pd.Series) -> pd.Series:
+    """Vectorized ``format_datetime`` for a column of ISO timestamp strings.
+
+    Gives the same output as ``values.apply(format_datetime)``: like the
+    scalar version it shows each timestamp's own wall-clock time (the UTC
+    offset is dropped, not converted). The column is parsed once with
+    ``pd.to_datetime`` and formatted with ``Series.dt.strftime``. Empty values
+    become ``"N/A"`` and unparseable ones are returned unchanged.
+    """
+    if values.empty:
+        return pd.Series([], index=values.index, dtype=object)
+    text = values.astype(object).where(values.notna(), None)
+    is_text = text.map(lambda v: isinstance(v, str))
+    wall_clock = text.where(is_text, None).str.replace(_ISO_OFFSET, r"\1", regex=True)
+    parsed = pd.to_datetime(wall_clock, errors="coerce", format="ISO8601")
+    formatted = parsed.dt.strftime("%Y-%m-%d %H:%M").astype(object)
+    empty = text.isna() | (text == "")
+    return formatted.where(parsed.notna(), values).where(~empty, "N/A")
+
+
+def format_duration_series(ms: pd.Series) -> pd.Series:
+    """Vectorized ``format_duration`` for a column of millisecond durations.
+
+    Gives the same output as ``ms.apply(format_duration)``. Units are bucketed
+    with ``np.select``; the number-to-text step uses the original values so
+    that it matches the scalar version exactly.
+    """
+    if ms.empty:
+        return pd.Series([], index=ms.index, dtype=object)
+    values = pd.to_numeric(ms, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    units = np.select([values < 1000, values < 60000], ["ms", "s"], default="min")
+    text = [
+        "N/A" if v != v
+        else f"{o}ms" if u == "ms"
+        else f"{o/1000:.2f}s" if u == "s"
+        else f"{o/60000:.2f}min"
+        for v, o, u in zip(values.tolist(), ms.tolist(), units.tolist())
+    ]
+    return pd.Series(text, index=ms.index, dtype=object)
+
+
+@cached_query("module_types")
+def _fetch_module_types(_supabase: Client) -> List[Dict]:
+    return _supabase.table("module_types").select("*").execute().data
+
+
+@cached_query("subscription_plans")
+def _fetch_subscription_plans(_supabase: Client) -> List[Dict]:
+    return _supabase.table("subscription_plans").select("*").execute().data
+
+
 def get_module_types(_supabase: Client) -> List[Dict]:
     """Cached fetch of all module types."""
     result = safe_query(
-        lambda: _supabase.table("module_types").select("*").execute(),
+        lambda: _fetch_module_types(_supabase),
         "Failed to fetch module types",
     )
-    return result.data if result else []
+    return result if result else []
 
 
-@st.cache_data(ttl=300)
 def get_subscription_plans(_supabase: Client) -> List[Dict]:
     """Cached fetch of all subscription plans."""
     result = safe_query(
-        lambda: _supabase.table("subscription_plans").select("*").execute(),
+        lambda: _fetch_subscription_plans(_supabase),
         "Failed to fetch subscription plans",
     )
-    return result.data if result else []
+    return result if result else []
 
 
 def clear_cache() -> None:
     """Clear all cached data used by this app."""
-    st.cache_data.clear()
+    clear_caches()
+    run_cache.clear()
     st.success("✅ Cache cleared - data refreshed")
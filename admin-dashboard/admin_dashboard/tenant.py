@@ -0,0 +1,81 @@
+"""Single-request "tenant 360" snapshot of a business for the detail view.
+
+Opening a business needs the business row, its channels, latest subscription
+and module assignments, plus the global module types and subscription plans.
+``load_tenant_snapshot`` fetches all of them in one RPC call to
+``admin_tenant_snapshot`` (``migrations/004_tenant_snapshot.sql``) and caches
+the result per business, tagged with every table it reads, so a write to any
+of them refreshes it.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from supabase import Client
+
+from .cache import cached_query
+from .supabase_utils import safe_query
+
+SNAPSHOT_TABLES = (
+    "businesses",
+    "business_channels",
+    "business_subscriptions",
+    "business_modules",
+    "module_types",
+    "subscription_plans",
+)
+
+
+@dataclass(frozen=True)
+class TenantSnapshot:
+    """A business and its related rows, as returned by ``admin_tenant_snapshot``."""
+
+    business: Dict
+    channels: List[Dict]
+    subscription: Optional[Dict]
+    modules: List[Dict]
+    module_types: List[Dict]
+    subscription_plans: List[Dict]
+
+    @classmethod
+    def from_json(cls, data: Dict) -> "TenantSnapshot":
+        return cls(
+            business=data["business"],
+            channels=data.get("channels") or [],
+            subscription=data.get("subscription"),
+            modules=data.get("modules") or [],
+            module_types=data.get("module_types") or [],
+            subscription_plans=data.get("subscription_plans") or [],
+        )
+
+    @property
+    def business_id(self) -> str:
+        return self.business["id"]
+
+    @property
+    def module_map(self) -> Dict[str, Dict]:
+        """Module assignments keyed by ``module_code``."""
+        return {m["module_code"]: m for m in self.modules}
+
+    @property
+    def plan_codes(self) -> List[str]:
+        return [p["code"] for p in self.subscription_plans]
+
+
+@cached_query(*SNAPSHOT_TABLES)
+def fetch_tenant_snapshot(_supabase: Client, business_id: str) -> Optional[TenantSnapshot]:
+    """Cached snapshot of one business, or ``None`` if it does not exist.
+
+    Raises on query failure.
+    """
+    data = _supabase.rpc(
+        "admin_tenant_snapshot", {"p_business_id": business_id}, get=True
+    ).execute().data
+    return TenantSnapshot.from_json(data) if data else None
+
+
+def load_tenant_snapshot(supabase: Client, business_id: str) -> Optional[TenantSnapshot]:
+    """``fetch_tenant_snapshot`` with ``safe_query`` error handling."""
+    return safe_query(
+        lambda: fetch_tenant_snapshot(supabase, business_id), "Failed to load business"
+    )
@@ -0,0 +1,236 @@
+"""Time-bucketed aggregate tiles of ``workflow_runs`` and ``workflow_step_logs``.
+
+Past hours and days of runs effectively never change, yet every chart used to
+re-aggregate them from raw rows, so a 90-day range cost 13 times a 7-day one.
+A tile holds the aggregates of one UTC hour or day: counts by status, by
+(workflow, status) and by (business, status), duration sums and a duration
+histogram. Tiles come from the ``admin_run_tiles`` / ``admin_step_tiles``
+functions in ``migrations/007_run_tiles.sql``.
+
+``run_tiles`` / ``step_tiles`` assemble a range from day tiles, with hour tiles
+for the partial days at its edges, so ranges are aligned to whole hours.
+Settled tiles (ended more than ``TILE_SETTLE_MINUTES`` ago and with no run
+still Running) are cached indefinitely in ``tile_cache`` and survive
+``invalidate_tables``; only the open tiles are refetched, after
+``AGGREGATE_CACHE_TTL_SECONDS`` or a write. Only missing tiles are queried,
+one request per contiguous span. Naive datetimes are taken as UTC.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from supabase import Client
+
+from .aggregates import AGGREGATE_TTL
+from .cache import _MISSING, TaggedCache, register_cache
+from .config import get_float_config, get_int_config
+
+# Upper edges of the duration histogram bins; keep in sync with the migration
+DURATION_EDGES_MS = (1_000, 5_000, 30_000, 120_000, 600_000)
+DURATION_BIN_LABELS = ("< 1 s", "1–5 s", "5–30 s", "30 s–2 min", "2–10 min", "≥ 10 min")
+
+BUCKET_SIZES = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+# A tile is only final once its bucket ended this long ago...
+SETTLE_MINUTES = get_int_config("TILE_SETTLE_MINUTES", 60)
+# ...and none of its rows can still change status
+UNSETTLED_STATUSES = frozenset({"Running"})
+
+tile_cache = register_cache(
+    TaggedCache(
+        max_bytes=int(get_float_config("TILE_CACHE_MAX_MB", 32) * 1024 * 1024),
+        max_entry_bytes=2 * 1024 * 1024,
+    )
+)
+
+
+@dataclass
+class Tile:
+    """Aggregates of one table over ``[start, start + size)`` (or a merge of tiles)."""
+
+    start: datetime
+    by_status: Dict[str, int] = field(default_factory=dict)
+    by_workflow: Dict[Tuple[str, str], int] = field(default_factory=dict)  # (name, status)
+    by_business: Dict[Tuple[str, str], int] = field(default_factory=dict)  # (id, status)
+    duration_ms_sum: int = 0
+    duration_count: int = 0
+    histogram: List[int] = field(default_factory=lambda: [0] * (len(DURATION_EDGES_MS) + 1))
+
+    @property
+    def total(self) -> int:
+        return sum(self.by_status.values())
+
+    @property
+    def avg_duration_ms(self) -> Optional[float]:
+        return self.duration_ms_sum / self.duration_count if self.duration_count else None
+
+    def add(self, other: "Tile") -> None:
+        """Add ``other``'s counts to this tile."""
+        for mine, theirs in (
+            (self.by_status, other.by_status),
+            (self.by_workflow, other.by_workflow),
+            (self.by_business, other.by_business),
+        ):
+            for key, count in theirs.items():
+                mine[key] = mine.get(key, 0) + count
+        self.duration_ms_sum += other.duration_ms_sum
+        self.duration_count += other.duration_count
+        self.histogram = [a + b for a, b in zip(self.histogram, other.histogram)]
+
+
+def _run_tile_rows(tile: Tile, row: Dict) -> None:
+    status, count = row["status"], int(row["run_count"])
+    if row["dimension"] == "workflow":
+        tile.by_workflow[(row["key"], status)] = count
+    elif row["dimension"] == "business":
+        tile.by_business[(row["key"], status)] = count
+    else:
+        tile.by_status[status] = count
+        tile.duration_ms_sum += int(row["duration_ms_sum"])
+        tile.duration_count += int(row["duration_count"])
+        tile.histogram = [a + int(b) for a, b in zip(tile.histogram, row["duration_hist"] or [])]
+
+
+def _step_tile_rows(tile: Tile, row: Dict) -> None:
+    tile.by_status[row["status"]] = int(row["step_count"])
+    tile.duration_ms_sum += int(row["duration_ms_sum"])
+    tile.duration_count += int(row["duration_count"])
+
+
+# table -> (tile function, row loader)
+_TABLES: Dict[str, Tuple[str, Callable[[Tile, Dict], None]]] = {
+    "workflow_runs": ("admin_run_tiles", _run_tile_rows),
+    "workflow_step_logs": ("admin_step_tiles", _step_tile_rows),
+}
+
+
+def _utc(ts: datetime) -> datetime:
+    """Naive UTC version of ``ts`` (naive values are assumed to be UTC)."""
+    return ts.astimezone(timezone.utc).replace(tzinfo=None) if ts.tzinfo else ts
+
+
+def _parse_bucket(value: str) -> datetime:
+    return _utc(datetime.fromisoformat(value.replace("Z", "+00:00")))
+
+
+def plan_buckets(start: datetime, end: datetime, now: datetime) -> List[Tuple[str, datetime]]:
+    """Return ``(bucket, start)`` pairs covering ``[start, end)`` with as few tiles as possible.
+
+    Whole days use day tiles and partial days hour tiles. A day that reaches
+    past ``end`` still gets a day tile when ``end`` is not in the past, since
+    there is no data after now.
+    """
+    day, hour = BUCKET_SIZES["day"], BUCKET_SIZES["hour"]
+    cursor = start.replace(minute=0, second=0, microsecond=0)
+    plan: List[Tuple[str, datetime]] = []
+    while cursor < end:
+        midnight = cursor.hour == 0
+        if midnight and (cursor + day <= end or end >= now):
+            plan.append(("day", cursor))
+            cursor += day
+        else:
+            plan.append(("hour", cursor))
+            cursor += hour
+    return plan
+
+
+def _spans(starts: List[datetime], size: timedelta) -> List[Tuple[datetime, datetime]]:
+    """Group sorted bucket starts into contiguous ``[from, to)`` spans."""
+    spans: List[Tuple[datetime, datetime]] = []
+    for start in starts:
+        if spans and spans[-1][1] == start:
+            spans[-1] = (spans[-1][0], start + size)
+        else:
+            spans.append((start, start + size))
+    return spans
+
+
+def _fetch_tiles(
+    supabase: Client, table: str, bucket: str, starts: List[datetime], now: datetime
+) -> Dict[datetime, Tile]:
+    """Return the ``bucket`` tiles of ``table`` at ``starts``, fetching the missing ones."""
+    function, load_row = _TABLES[table]
+    size = BUCKET_SIZES[bucket]
+    tiles: Dict[datetime, Tile] = {}
+    missing: List[datetime] = []
+    for start in starts:
+        tile = tile_cache.get(f"{table}:{bucket}:{start.isoformat()}")
+        if tile is _MISSING:
+            missing.append(start)
+        else:
+            tiles[start] = tile
+
+    settled_before = now - timedelta(minutes=SETTLE_MINUTES)
+    for span_from, span_to in _spans(missing, size):
+        fetched = {}
+        cursor = span_from
+        while cursor < span_to:
+            fetched[cursor] = Tile(cursor)
+            cursor += size
+        params = {
+            "p_from": f"{span_from.isoformat()}+00:00",
+            "p_to": f"{span_to.isoformat()}+00:00",
+            "p_bucket": bucket,
+        }
+        for row in supabase.rpc(function, params, get=True).execute().data or []:
+            load_row(fetched[_parse_bucket(row["bucket"])], row)
+
+        for start, tile in fetched.items():
+            settled = start + size <= settled_before and not any(
+                tile.by_status.get(status) for status in UNSETTLED_STATUSES
+            )
+            # Settled tiles get their own tag so writes (and Refresh) keep them
+            tile_cache.set(
+                f"{table}:{bucket}:{start.isoformat()}",
+                tile,
+                tags=(f"{table}:settled",) if settled else (table,),
+                ttl=float("inf") if settled else AGGREGATE_TTL,
+            )
+            tiles[start] = tile
+    return tiles
+
+
+def fetch_range(
+    supabase: Client, table: str, start: datetime, end: Optional[datetime] = None
+) -> List[Tile]:
+    """Return the tiles of ``table`` covering ``[start, end)`` (default: until now), in order.
+
+    Raises on query failure; wrap it in ``safe_query`` at the call site.
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    plan = plan_buckets(_utc(start), _utc(end) if end else now, now)
+    fetched = {
+        bucket: _fetch_tiles(
+            supabase, table, bucket, [s for b, s in plan if b == bucket], now
+        )
+        for bucket in BUCKET_SIZES
+    }
+    return [fetched[bucket][start] for bucket, start in plan]
+
+
+def run_tiles(supabase: Client, start: datetime, end: Optional[datetime] = None) -> List[Tile]:
+    """``fetch_range`` for ``workflow_runs`` (by start time)."""
+    return fetch_range(supabase, "workflow_runs", start, end)
+
+
+def step_tiles(supabase: Client, start: datetime, end: Optional[datetime] = None) -> List[Tile]:
+    """``fetch_range`` for ``workflow_step_logs`` (by start time)."""
+    return fetch_range(supabase, "workflow_step_logs", start, end)
+
+
+def combine(tiles: Iterable[Tile], start: Optional[datetime] = None) -> Tile:
+    """Merge ``tiles`` into one; its ``start`` is ``start`` or the first tile's."""
+    tiles = list(tiles)
+    merged = Tile(start or (tiles[0].start if tiles else datetime.min))
+    for tile in tiles:
+        merged.add(tile)
+    return merged
+
+
+def by_day(tiles: Iterable[Tile]) -> List[Tile]:
+    """Merge hour tiles into their UTC day; returns one tile per day, in order."""
+    days: Dict[datetime, List[Tile]] = {}
+    for tile in tiles:
+        days.setdefault(tile.start.replace(hour=0), []).append(tile)
+    return [combine(day_tiles, day) for day, day_tiles in days.items()]
@@ -0,0 +1,224 @@
+"""Reusable Streamlit widgets for the admin dashboard pages."""
+
+import logging
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, TypeVar
+
+import pandas as pd
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+from supabase import Client
+
+from .business_directory import get_business_directory
+from .business_list import search_filter
+from .instrumentation import RenderLog, reset_stats, signature_stats
+from .profiling import PageProfile
+from .startup import report as startup_report
+from .warmup import warmup_status
+from .supabase_utils import safe_query, submit_query
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable)
+
+# Session flag: the background business directory load was already requested
+_DIRECTORY_REQUESTED = "business_directory_requested"
+
+_st_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+
+def fragment(func: F) -> F:
+    """Run ``func`` as an independently rerunnable Streamlit fragment.
+
+    Widget interactions inside a fragment rerun only that function, not the
+    whole page, so its queries are the only ones repeated. Falls back to a
+    plain function on Streamlit versions without fragments.
+    """
+    return _st_fragment(func) if _st_fragment is not None else func
+
+
+def rerun_fragment() -> None:
+    """Rerun the enclosing fragment, or the whole app when that is not possible.
+
+    Streamlit only allows fragment-scoped reruns while a fragment is itself
+    being rerun; during a full-page run this falls back to a full rerun.
+    """
+    if _st_fragment is not None:
+        try:
+            st.rerun(scope="fragment")
+        except StreamlitAPIException:
+            pass
+    st.rerun()
+
+
+def _search_businesses_remote(supabase: Client, text: str, limit: int) -> List[Dict]:
+    """Server-side ``ilike`` search used while the business directory is cold."""
+    query = supabase.table("businesses").select("id, name, slug")
+    clause = search_filter(text)
+    if clause:
+        query = query.or_(clause)
+    result = safe_query(
+        lambda: query.order("name").limit(limit).execute(), "Failed to search businesses"
+    )
+    return result.data if result else []
+
+
+def _log_directory_load(future: Future) -> None:
+    error = future.exception()
+    if error is not None:
+        logger.warning("Background business directory load failed: %s", error)
+
+
+def business_picker(
+    supabase: Client,
+    label: str = "Business",
+    key: str = "business",
+    allow_all: bool = False,
+    limit: int = 25,
+) -> Optional[str]:
+    """Render a searchable business selector and return the selected business ID.
+
+    Typing in the search box narrows the dropdown to the top ``limit`` matches
+    from the cached business directory's prefix/trigram index. While the
+    directory is cold the matches come from a server-side ``ilike`` query and
+    the directory is loaded in the background (once per session) for a later
+    rerun.
+
+    Returns ``None`` when "All" (``allow_all=True``) or nothing is selected.
+    """
+    search = st.text_input(
+        f"Search {label.lower()}", key=f"{key}_search", placeholder="Name or slug"
+    )
+
+    directory = get_business_directory.peek(supabase)
+    if directory is not None:
+        matches = directory.search(search, limit)
+    else:
+        matches = _search_businesses_remote(supabase, search, limit)
+        if not st.session_state.get(_DIRECTORY_REQUESTED):
+            st.session_state[_DIRECTORY_REQUESTED] = True
+            submit_query(get_business_directory, supabase).add_done_callback(
+                _log_directory_load
+            )
+
+    options: Dict[str, str] = {f"{m['name']} ({m.get('slug') or '-'})": m["id"] for m in matches}
+
+    # Keep the current selection available even when the search no longer
+    # matches it, so typing does not silently change the filter.
+    selected_key = f"{key}_selected"
+    selected = st.session_state.get(selected_key)
+    if selected and selected[1] not in options.values():
+        options = {selected[0]: selected[1], **options}
+
+    labels = (["All"] if allow_all else []) + list(options)
+    if not labels:
+        st.selectbox(
+            label, options=["No matching businesses"], disabled=True, key=f"{key}_select"
+        )
+        return None
+
+    choice = st.selectbox(
+        label,
+        options=labels,
+        index=labels.index(selected[0]) if selected and selected[0] in labels else 0,
+        key=f"{key}_select",
+    )
+
+    business_id = options.get(choice)
+    st.session_state[selected_key] = (choice, business_id) if business_id else None
+    return business_id
+
+
+def lazy_tabs(labels: List[str], key: str) -> str:
+    """Tab-style section selector that only renders the selected section.
+
+    ``st.tabs`` executes every tab body on every run, so each tab's queries
+    run even if it is never opened. This draws the tab labels as a horizontal
+    radio and returns the selected label; the caller renders only that
+    section. The selection is kept in ``st.session_state[key]``.
+    """
+    return st.radio(
+        "Section", options=labels, key=key, horizontal=True, label_visibility="collapsed"
+    )
+
+
+def render_performance_panel(render: RenderLog, limit: int = 10) -> None:
+    """Show the slowest queries of ``render`` and rolling p50/p95 per signature."""
+    http = [r for r in render.records if r.source == "http"]
+    cached = [r for r in render.records if r.source == "cache"]
+    hits = sum(r.cache == "hit" for r in cached)
+    shared_hits = sum(r.cache == "shared" for r in cached)
+    coalesced = sum(r.coalesced for r in http)
+    st.caption(
+        f"Render {render.elapsed_ms:,.0f} ms · {len(http)} requests "
+        f"({sum(r.duration_ms for r in http):,.0f} ms"
+        f"{f', {coalesced} shared' if coalesced else ''}) · "
+        f"cache {hits}/{len(cached)} hits"
+        f"{f' (+{shared_hits} shared)' if shared_hits else ''}"
+    )
+
+    slowest = sorted(render.records, key=lambda r: r.duration_ms, reverse=True)[:limit]
+    if slowest:
+        st.markdown("**Slowest this render**")
+        st.dataframe(
+            pd.DataFrame(
+                {
+                    "Query": [r.signature for r in slowest],
+                    "ms": [round(r.duration_ms, 1) for r in slowest],
+                    "Rows": [r.rows for r in slowest],
+                    "KB": [None if r.bytes is None else round(r.bytes / 1024, 1) for r in slowest],
+                }
+            ),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+    stats = signature_stats()[:limit]
+    if stats:
+        st.markdown("**Rolling p50 / p95**")
+        st.dataframe(
+            pd.DataFrame(stats)
+            .round(1)
+            .rename(
+                columns={
+                    "signature": "Query",
+                    "count": "N",
+                    "p50_ms": "p50",
+                    "p95_ms": "p95",
+                    "max_ms": "max",
+                }
+            ),
+            use_container_width=True,
+            hide_index=True,
+        )
+        if st.button("Reset stats", key="perf_reset_stats"):
+            reset_stats()
+
+    warmup = warmup_status()
+    if warmup.state == "running":
+        st.caption(f"Cache warmup: {warmup.completed}/{len(warmup.datasets)} datasets…")
+    elif warmup.state == "done" and warmup.errors:
+        st.caption(f"Cache warmup failed for: {', '.join(warmup.errors)}")
+
+    phases = startup_report()
+    if phases:
+        st.markdown("**Cold start (this process)**")
+        st.dataframe(
+            pd.DataFrame(phases, columns=["Phase", "ms", "At (ms)"]).round(0),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+
+def render_profile(profile: PageProfile) -> None:
+    """Show a ``profiling.profile_call`` summary in an expander."""
+    with st.expander(f"🔬 Profile: {profile.page} ({profile.total_ms:,.0f} ms)"):
+        st.caption(
+            "Self time by library (script thread only; pool queries appear as "
+            "waiting on threads)"
+        )
+        st.bar_chart(pd.Series(profile.categories, name="ms"), horizontal=True)
+        st.markdown("**Top functions by cumulative time**")
+        st.dataframe(pd.DataFrame(profile.top), use_container_width=True, hide_index=True)
+        if profile.path is not None:
+            st.caption(f"Saved to `{profile.path}` (open with `snakeviz` or `python -m pstats`)")
@@ -0,0 +1,248 @@
+"""Background prefetch of shared datasets into the process-level cache.
+
+After a deploy or restart the first admin to open each page would pay every
+cold query. ``start_background_warmup()`` is called by ``app.py`` at the top of
+the first script run in the process, before login, and fetches the shared
+datasets (``DATASETS``) concurrently on a background thread. The data-layer
+imports happen on that thread too, so both are done while the admin types the
+password. Each dataset's time is logged, recorded in the startup report and
+shown in the performance panel.
+
+``python -m admin_dashboard.warmup`` runs the same warmup in the foreground
+and prints progress and timings. ``start.sh`` runs it in the background at
+container start with ``--on-start``, which only warms when ``WARMUP_ON_START``
+is on and ``SHARED_CACHE_PATH`` is set: the CLI's in-memory cache dies with
+its process, so without the shared cache its results would be discarded.
+For the same reason the CLI skips ``PROCESS_LOCAL_DATASETS`` (kept only in
+the process's memory) unless they are named on the command line.
+
+Settings: ``WARMUP_ON_START`` (default on) and ``WARMUP_DATASETS``, a comma
+separated subset of ``DATASETS`` (default all).
+"""
+
+import logging
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from . import startup
+from .config import get_bool_config, get_config_value
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+# Heavy modules (supabase, pandas) are imported inside the fetchers so that
+# importing this module stays cheap before login.
+
+
+def _module_types(client: "Client") -> None:
+    from .supabase_utils import _fetch_module_types
+
+    _fetch_module_types(client)
+
+
+def _subscription_plans(client: "Client") -> None:
+    from .supabase_utils import _fetch_subscription_plans
+
+    _fetch_subscription_plans(client)
+
+
+def _business_directory(client: "Client") -> None:
+    from .business_directory import get_business_directory
+
+    get_business_directory(client)
+
+
+def _run_tiles(client: "Client") -> None:
+    from . import aggregates, tiles
+
+    since = aggregates.window_start(days=7)
+    tiles.run_tiles(client, since)
+    tiles.step_tiles(client, since)
+
+
+def _dashboard_counts(client: "Client") -> None:
+    from . import aggregates
+
+    aggregates.subscriptions_by_plan(client, "active")
+
+
+DATASETS: Dict[str, Callable] = {
+    "module_types": _module_types,
+    "subscription_plans": _subscription_plans,
+    "business_directory": _business_directory,
+    "run_tiles": _run_tiles,
+    "dashboard_counts": _dashboard_counts,
+}
+
+# Datasets cached outside ``cached_query`` (tiles live in ``tiles.tile_cache``),
+# so they never reach the shared cache and only warm the running process
+PROCESS_LOCAL_DATASETS = frozenset({"run_tiles"})
+
+
+@dataclass
+class WarmupStatus:
+    """Progress of the process's warmup."""
+
+    state: str = "idle"  # idle / running / done / skipped
+    datasets: List[str] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)  # name -> ms
+    errors: Dict[str, str] = field(default_factory=dict)
+    total_ms: Optional[float] = None
+
+    @property
+    def completed(self) -> int:
+        return len(self.timings) + len(self.errors)
+
+
+_lock = threading.Lock()
+_status = WarmupStatus()
+
+
+def configured_datasets() -> List[str]:
+    """Return the dataset names selected by ``WARMUP_DATASETS``."""
+    raw = get_config_value("WARMUP_DATASETS")
+    if not raw:
+        return list(DATASETS)
+    names = [name.strip() for name in raw.split(",") if name.strip()]
+    unknown = [name for name in names if name not in DATASETS]
+    if unknown:
+        logger.warning("Ignoring unknown WARMUP_DATASETS entries: %s", ", ".join(unknown))
+    return [name for name in names if name in DATASETS]
+
+
+def warmup_status() -> WarmupStatus:
+    """Return a snapshot of the warmup progress."""
+    with _lock:
+        return WarmupStatus(
+            state=_status.state,
+            datasets=list(_status.datasets),
+            timings=dict(_status.timings),
+            errors=dict(_status.errors),
+            total_ms=_status.total_ms,
+        )
+
+
+def run_warmup(
+    datasets: Optional[List[str]] = None,
+    on_progress: Optional[Callable[[str, Optional[float], Optional[str]], None]] = None,
+) -> WarmupStatus:
+    """Fetch ``datasets`` (default: configured ones) concurrently and wait.
+
+    ``on_progress(name, ms, error)`` is called as each dataset finishes.
+    Returns the final status; failures are recorded, never raised.
+    """
+    names = configured_datasets() if datasets is None else datasets
+    with _lock:
+        _status.state = "running"
+        _status.datasets = list(names)
+    started = time.perf_counter()
+
+    with startup.timed("warmup imports"):
+        from .client_registry import PoolSettings, registry
+        from .supabase_utils import _submit
+
+    url = get_config_value("SUPABASE_URL")
+    key = get_config_value("SUPABASE_SERVICE_KEY")
+    if not url or not key:
+        logger.warning("Skipping warmup: SUPABASE_URL or SUPABASE_SERVICE_KEY is not set")
+        with _lock:
+            _status.state = "skipped"
+        return warmup_status()
+    # Same registry entry as get_supabase_client(), so the pool is warm too
+    client = registry.get(url, key, PoolSettings.from_config(get_config_value))
+
+    def fetch(name: str) -> None:
+        dataset_started = time.perf_counter()
+        error = None
+        try:
+            DATASETS[name](client)
+        except Exception as e:
+            error = str(e)
+        elapsed = (time.perf_counter() - dataset_started) * 1000
+        with _lock:
+            if error is None:
+                _status.timings[name] = elapsed
+            else:
+                _status.errors[name] = error
+        if error is None:
+            startup.record(f"warmup {name}", elapsed)
+        else:
+            logger.warning("Warmup of %s failed after %.0f ms: %s", name, elapsed, error)
+        if on_progress is not None:
+            on_progress(name, elapsed, error)
+
+    for future in [_submit(fetch, name) for name in names]:
+        future.result()
+
+    total_ms = (time.perf_counter() - started) * 1000
+    with _lock:
+        _status.state = "done"
+        _status.total_ms = total_ms
+    startup.record("warmup", total_ms)
+    return warmup_status()
+
+
+def start_background_warmup() -> bool:
+    """Start ``run_warmup`` on a daemon thread, once per process.
+
+    Returns True if this call started it.
+    """
+    with _lock:
+        if _status.state != "idle":
+            return False
+        _status.state = "running"
+
+    def target() -> None:
+        try:
+            run_warmup()
+        except Exception:  # pragma: no cover - never let warmup kill anything
+            logger.exception("Warmup failed")
+            with _lock:
+                _status.state = "done"
+
+    threading.Thread(target=target, name="cache-warmup", daemon=True).start()
+    return True
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """CLI: warm the given (or configured) datasets and print timings.
+
+    With ``--on-start`` (used by ``start.sh``) it does nothing unless
+    ``WARMUP_ON_START`` is on and a shared cache is configured. Without named
+    datasets, ``PROCESS_LOCAL_DATASETS`` are skipped since their results would
+    die with this process. Exits with 1 if any dataset failed or is unknown.
+    """
+    args = sys.argv[1:] if argv is None else list(argv)
+    if "--on-start" in args:
+        args.remove("--on-start")
+        if not get_bool_config("WARMUP_ON_START", True):
+            return 0
+        if not get_config_value("SHARED_CACHE_PATH"):
+            print("[warmup] skipped: SHARED_CACHE_PATH is not set", flush=True)
+            return 0
+    unknown = [name for name in args if name not in DATASETS]
+    if unknown:
+        print(f"[warmup] unknown datasets: {', '.join(unknown)}; choose from {', '.join(DATASETS)}")
+        return 1
+    names = args or [name for name in configured_datasets() if name not in PROCESS_LOCAL_DATASETS]
+
+    def on_progress(name: str, ms: Optional[float], error: Optional[str]) -> None:
+        outcome = f"failed: {error}" if error else "ok"
+        done = warmup_status().completed
+        print(f"[warmup] {done}/{len(names)} {name}: {ms:.0f} ms, {outcome}", flush=True)
+
+    status = run_warmup(names, on_progress=on_progress)
+    if status.state == "skipped":
+        print("[warmup] skipped: SUPABASE_URL or SUPABASE_SERVICE_KEY is not set", flush=True)
+        return 0
+    print(f"[warmup] finished {len(names)} datasets in {status.total_ms:.0f} ms", flush=True)
+    return 1 if status.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
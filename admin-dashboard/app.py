@@ -5,7 +5,9 @@ Streamlit entrypoint that wires authentication, Supabase client initialization,
 and navigation to page modules in the ``admin_dashboard`` package.
 """
 
+import time
 import warnings
+from typing import TYPE_CHECKING
 
 # Suppress Streamlit warnings that occur during import/bare mode
 # These warnings are harmless and don't affect functionality
@@ -13,16 +15,29 @@ warnings.filterwarnings("ignore", message=".*missing ScriptRunContext.*")
 warnings.filterwarnings("ignore", message=".*No runtime found.*")
 warnings.filterwarnings("ignore", message=".*Session state does not function.*")
 
+from admin_dashboard import startup
+
+_import_started = time.perf_counter()
+
 import streamlit as st
 
+# Only lightweight modules are imported before login. The data layer (pandas,
+# supabase) is imported in main() once the password check has passed, and
+# each page module (plotly, ...) on first navigation via ``load_page``.
 from admin_dashboard.auth import require_login
-from admin_dashboard.supabase_utils import clear_cache, get_supabase_client
-from admin_dashboard.pages.dashboard import render_dashboard_page
-from admin_dashboard.pages.businesses import render_businesses_page
-from admin_dashboard.pages.plans_modules import render_plans_modules_page
-from admin_dashboard.pages.workflow_runs import render_workflow_runs_page
-from admin_dashboard.pages.step_logs import render_step_logs_page
-from admin_dashboard.pages.vertical_data import render_vertical_data_page
+from admin_dashboard.config import get_bool_config
+from admin_dashboard.pages import PAGE_LABELS, load_page
+from admin_dashboard.warmup import start_background_warmup
+
+startup.record("import app", (time.perf_counter() - _import_started) * 1000)
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+
+def render_page(page: str, supabase: "Client") -> None:
+    """Render the page selected in the sidebar, importing its module if needed."""
+    load_page(page)(supabase)
 
 
 def main() -> None:
@@ -34,27 +49,29 @@ def main() -> None:
         initial_sidebar_state="expanded",
     )
 
-    # Require login
-    require_login()
+    # Prefetch shared datasets once per process, while the admin logs in
+    if get_bool_config("WARMUP_ON_START", True):
+        start_background_warmup()
 
-    # Initialize Supabase client
-    supabase = get_supabase_client()
+    # Require login (the first run in a process draws the login form here)
+    with startup.timed("login check"):
+        require_login()
+
+    with startup.timed("import data layer"):
+        from admin_dashboard.instrumentation import start_render
+        from admin_dashboard.profiling import profile_call, profiling_enabled
+        from admin_dashboard.supabase_utils import clear_cache, get_supabase_client
+        from admin_dashboard.ui import render_performance_panel, render_profile
+
+    # Initialize Supabase client (resolves config and builds the HTTP pool)
+    with startup.timed("config and Supabase client"):
+        supabase = get_supabase_client()
 
     # Sidebar navigation
     st.sidebar.title("🎛️ Admin Dashboard")
     st.sidebar.markdown("---")
 
-    page = st.sidebar.radio(
-        "Navigation",
-        options=[
-            "📊 Dashboard",
-            "🏢 Businesses",
-            "📦 Plans & Modules",
-            "🔄 Workflow Runs",
-            "📝 Workflow Step Logs",
-            "🛒 Vertical Data",
-        ],
-    )
+    page = st.sidebar.radio("Navigation", options=PAGE_LABELS)
 
     st.sidebar.markdown("---")
 
@@ -67,23 +84,31 @@ def main() -> None:
     if st.sidebar.button("🔄 Clear Cache"):
         clear_cache()
 
+    # Query timings for this render, filled in after the page has run
+    perf_panel = (
+        st.sidebar.expander("⏱ Performance")
+        if get_bool_config("PERFORMANCE_PANEL", True)
+        else None
+    )
+
     st.sidebar.markdown("---")
     st.sidebar.caption("Multi-tenant Automation Platform")
     st.sidebar.caption("Admin Dashboard v1.0")
 
+    render = start_render(page)
+
     # Route to appropriate page
-    if page == "📊 Dashboard":
-        render_dashboard_page(supabase)
-    elif page == "🏢 Businesses":
-        render_businesses_page(supabase)
-    elif page == "📦 Plans & Modules":
-        render_plans_modules_page(supabase)
-    elif page == "🔄 Workflow Runs":
-        render_workflow_runs_page(supabase)
-    elif page == "📝 Workflow Step Logs":
-        render_step_logs_page(supabase)
-    elif page == "🛒 Vertical Data":
-        render_vertical_data_page(supabase)
+    with startup.timed(f"first render {page}"):
+        if profiling_enabled():
+            profile = profile_call(page, render_page, page, supabase)
+            if profile is not None:
+                render_profile(profile)
+        else:
+            render_page(page, supabase)
+
+    if perf_panel is not None:
+        with perf_panel:
+            render_performance_panel(render)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,37 @@
+-- Server-side aggregates for the admin dashboard KPIs and charts.
+--
+-- The dashboard used to download raw rows only to count them in pandas. This
+-- function returns grouped counts instead, so the payload stays a handful of
+-- rows no matter how large the underlying tables grow. It is called through
+-- PostgREST RPC (GET) from admin_dashboard/aggregates.py. Run and step log
+-- charts use the tiles from 007_run_tiles.sql.
+
+create index if not exists workflow_runs_start_time_idx
+    on public.workflow_runs (start_time);
+
+create index if not exists workflow_runs_status_start_time_idx
+    on public.workflow_runs (status, start_time);
+
+create index if not exists workflow_step_logs_status_idx
+    on public.workflow_step_logs (status);
+
+create index if not exists business_subscriptions_status_plan_idx
+    on public.business_subscriptions (status, plan_code);
+
+
+create or replace function public.admin_subscriptions_by_plan(p_status text default 'active')
+returns table (plan_code text, subscription_count bigint)
+language sql
+stable
+as $$
+    select s.plan_code, count(*)
+    from public.business_subscriptions s
+    where s.status = p_status
+    group by s.plan_code;
+$$;
+
+
+-- Subscription counts across all tenants are for the admin dashboard only.
+revoke execute on function public.admin_subscriptions_by_plan(text) from public, anon, authenticated;
+
+grant execute on function public.admin_subscriptions_by_plan(text) to service_role;
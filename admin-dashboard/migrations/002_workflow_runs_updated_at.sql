@@ -0,0 +1,28 @@
+-- Track when each workflow run last changed.
+--
+-- The Workflow Runs page keeps already-fetched rows per filter spec and only
+-- asks PostgREST for runs with updated_at newer than its last high-water mark
+-- (see admin_dashboard/run_cache.py). The trigger bumps updated_at on every
+-- update, so status transitions such as Running -> Succeeded are picked up.
+
+alter table public.workflow_runs
+    add column if not exists updated_at timestamptz not null default now();
+
+create or replace function public.admin_touch_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at := now();
+    return new;
+end;
+$$;
+
+drop trigger if exists workflow_runs_touch_updated_at on public.workflow_runs;
+create trigger workflow_runs_touch_updated_at
+    before update on public.workflow_runs
+    for each row
+    execute function public.admin_touch_updated_at();
+
+create index if not exists workflow_runs_updated_at_idx
+    on public.workflow_runs (updated_at);
@@ -0,0 +1,12 @@
+-- Indexes for keyset pagination of the Workflow Runs page.
+--
+-- Pages are fetched with "(start_time, id) < (cursor)" ordered by
+-- start_time desc, id desc (see admin_dashboard/pagination.py), so every page,
+-- however deep, is an index range scan instead of an OFFSET walk.
+
+create index if not exists workflow_runs_start_time_id_idx
+    on public.workflow_runs (start_time desc, id desc);
+
+-- The business filter is the most common one on this page.
+create index if not exists workflow_runs_business_start_time_id_idx
+    on public.workflow_runs (business_id, start_time desc, id desc);
@@ -0,0 +1,62 @@
+-- One-request "tenant 360" snapshot for the business detail view.
+--
+-- Opening a business used to take a round trip each for the business,
+-- its channels, latest subscription and module assignments, plus the global
+-- module types and subscription plans. This function returns all of them as
+-- one JSON document; it is called through PostgREST RPC (GET) from
+-- admin_dashboard/tenant.py.
+
+create index if not exists business_channels_business_id_idx
+    on public.business_channels (business_id);
+
+create index if not exists business_subscriptions_business_valid_from_idx
+    on public.business_subscriptions (business_id, valid_from desc);
+
+create index if not exists business_modules_business_id_idx
+    on public.business_modules (business_id);
+
+
+create or replace function public.admin_tenant_snapshot(p_business_id uuid)
+returns jsonb
+language sql
+stable
+as $$
+    select jsonb_build_object(
+        'business', to_jsonb(b),
+        'channels', coalesce(
+            (select jsonb_agg(to_jsonb(c))
+             from public.business_channels c
+             where c.business_id = b.id),
+            '[]'::jsonb
+        ),
+        'subscription', (
+            select to_jsonb(s)
+            from public.business_subscriptions s
+            where s.business_id = b.id
+            order by s.valid_from desc
+            limit 1
+        ),
+        'modules', coalesce(
+            (select jsonb_agg(to_jsonb(m))
+             from public.business_modules m
+             where m.business_id = b.id),
+            '[]'::jsonb
+        ),
+        'module_types', coalesce(
+            (select jsonb_agg(to_jsonb(t)) from public.module_types t),
+            '[]'::jsonb
+        ),
+        'subscription_plans', coalesce(
+            (select jsonb_agg(to_jsonb(p)) from public.subscription_plans p),
+            '[]'::jsonb
+        )
+    )
+    from public.businesses b
+    where b.id = p_business_id;
+$$;
+
+
+-- Returns any tenant's full records by id: service role (the dashboard) only.
+revoke execute on function public.admin_tenant_snapshot(uuid) from public, anon, authenticated;
+
+grant execute on function public.admin_tenant_snapshot(uuid) to service_role;
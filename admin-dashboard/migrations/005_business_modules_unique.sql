@@ -0,0 +1,17 @@
+-- Unique (business_id, module_code) for bulk module upserts.
+--
+-- The Modules section of the business detail view applies all staged module
+-- changes in one PostgREST upsert with on_conflict=business_id,module_code
+-- (see render_business_modules), which needs a unique index on those columns
+-- to resolve conflicts. If this fails, remove duplicate assignments first:
+--
+--   select business_id, module_code, count(*)
+--   from public.business_modules
+--   group by 1, 2
+--   having count(*) > 1;
+
+create unique index if not exists business_modules_business_module_key
+    on public.business_modules (business_id, module_code);
+
+-- Superseded by the unique index above.
+drop index if exists public.business_modules_business_id_idx;
@@ -0,0 +1,23 @@
+-- Trigram and keyset indexes for the Businesses list.
+--
+-- The list filters with ilike '%text%' on name/slug (search box), city and
+-- industry. A leading wildcard cannot use a btree index, so without these GIN
+-- trigram indexes every search is a sequential scan of businesses. Pages are
+-- fetched by keyset on (created_at, id) (see admin_dashboard/business_list.py).
+
+create extension if not exists pg_trgm;
+
+create index if not exists businesses_name_trgm_idx
+    on public.businesses using gin (name gin_trgm_ops);
+
+create index if not exists businesses_slug_trgm_idx
+    on public.businesses using gin (slug gin_trgm_ops);
+
+create index if not exists businesses_city_trgm_idx
+    on public.businesses using gin (city gin_trgm_ops);
+
+create index if not exists businesses_industry_trgm_idx
+    on public.businesses using gin (industry gin_trgm_ops);
+
+create index if not exists businesses_created_at_id_idx
+    on public.businesses (created_at desc, id desc);
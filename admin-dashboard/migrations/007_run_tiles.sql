@@ -0,0 +1,116 @@
+-- Per-hour / per-day aggregate "tiles" of workflow runs and step logs.
+--
+-- Dashboard and Workflow Runs charts used to re-aggregate every raw row of the
+-- requested window on each load, so a 90-day chart cost 13 times a 7-day one.
+-- These functions return the aggregates of each UTC bucket in a range;
+-- admin_dashboard/tiles.py keeps finished buckets indefinitely and only asks
+-- for the missing ones and the current, still changing one.
+--
+-- Run tiles come back as grouping sets: one row per (bucket, status), per
+-- (bucket, workflow_name, status) and per (bucket, business_id, status);
+-- "dimension" says which. Duration histograms (status rows only) count
+-- finished runs per bin, with bin edges at 1 s, 5 s, 30 s, 2 min and 10 min;
+-- keep them in sync with DURATION_EDGES_MS in tiles.py.
+
+create index if not exists workflow_step_logs_started_at_idx
+    on public.workflow_step_logs (started_at);
+
+
+create or replace function public.admin_run_tiles(
+    p_from timestamptz,
+    p_to timestamptz,
+    p_bucket text default 'day'
+)
+returns table (
+    bucket timestamptz,
+    dimension text,
+    key text,
+    status text,
+    run_count bigint,
+    duration_ms_sum bigint,
+    duration_count bigint,
+    duration_hist bigint[]
+)
+language sql
+stable
+as $$
+    with runs as (
+        select date_trunc(p_bucket, r.start_time, 'UTC') as bucket,
+               r.workflow_name,
+               r.business_id::text as business_id,
+               r.status,
+               r.duration_ms
+        from public.workflow_runs r
+        where p_bucket in ('hour', 'day')
+          and r.start_time >= p_from
+          and r.start_time < p_to
+    )
+    select bucket,
+           case
+               when grouping(workflow_name) = 0 then 'workflow'
+               when grouping(business_id) = 0 then 'business'
+               else 'status'
+           end,
+           case
+               when grouping(workflow_name) = 0 then workflow_name
+               when grouping(business_id) = 0 then business_id
+           end,
+           status,
+           count(*),
+           coalesce(sum(duration_ms), 0)::bigint,
+           count(duration_ms),
+           case
+               when grouping(workflow_name) = 1 and grouping(business_id) = 1 then array[
+                   count(*) filter (where duration_ms < 1000),
+                   count(*) filter (where duration_ms >= 1000 and duration_ms < 5000),
+                   count(*) filter (where duration_ms >= 5000 and duration_ms < 30000),
+                   count(*) filter (where duration_ms >= 30000 and duration_ms < 120000),
+                   count(*) filter (where duration_ms >= 120000 and duration_ms < 600000),
+                   count(*) filter (where duration_ms >= 600000)
+               ]
+           end
+    from runs
+    group by grouping sets (
+        (bucket, status),
+        (bucket, workflow_name, status),
+        (bucket, business_id, status)
+    )
+    order by 1;
+$$;
+
+
+create or replace function public.admin_step_tiles(
+    p_from timestamptz,
+    p_to timestamptz,
+    p_bucket text default 'day'
+)
+returns table (
+    bucket timestamptz,
+    status text,
+    step_count bigint,
+    duration_ms_sum bigint,
+    duration_count bigint
+)
+language sql
+stable
+as $$
+    select date_trunc(p_bucket, l.started_at, 'UTC'),
+           l.status,
+           count(*),
+           coalesce(sum(l.duration_ms), 0)::bigint,
+           count(l.duration_ms)
+    from public.workflow_step_logs l
+    where p_bucket in ('hour', 'day')
+      and l.started_at >= p_from
+      and l.started_at < p_to
+    group by 1, 2
+    order by 1;
+$$;
+
+
+-- Tiles expose workflow activity per business; only the dashboard reads them.
+revoke execute on function public.admin_run_tiles(timestamptz, timestamptz, text) from public, anon, authenticated;
+revoke execute on function public.admin_step_tiles(timestamptz, timestamptz, text) from public, anon, authenticated;
+
+grant execute on function public.admin_run_tiles(timestamptz, timestamptz, text) to service_role;
+grant execute on function public.admin_step_tiles(timestamptz, timestamptz, text) to service_role;
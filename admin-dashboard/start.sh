@@ -5,6 +5,11 @@
 # Use PORT from environment, default to 8501 if not set
 PORT="${PORT:-8501}"
 
+# Prefetch shared datasets into the shared cache while Streamlit boots.
+# --on-start checks WARMUP_ON_START and SHARED_CACHE_PATH the same way the app
+# does; the server process also prefetches into its own cache.
+python -m admin_dashboard.warmup --on-start &
+
 echo "Starting Streamlit on port $PORT"
 
 # Run Streamlit with the port from environment
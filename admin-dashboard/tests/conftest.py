@@ -0,0 +1,93 @@
+"""Shared fixtures: an in-memory stand-in for the PostgREST query builder."""
+
+from types import SimpleNamespace
+from typing import Dict, List
+
+import pytest
+
+from admin_dashboard.cache import clear_caches
+
+
+class FakeQuery:
+    """Supports the builder calls the data layer makes, evaluated in memory."""
+
+    def __init__(self, client: "FakeClient", table: str) -> None:
+        self.client = client
+        self.table = table
+        self.filters = []
+        self.orders = []
+        self.max_rows = None
+        self.inserted = None
+
+    def select(self, columns="*", count=None, head=None):
+        return self
+
+    def _filter(self, column, predicate):
+        self.filters.append(lambda row: row.get(column) is not None and predicate(row[column]))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, lambda v: v == value)
+
+    def gt(self, column, value):
+        return self._filter(column, lambda v: v > value)
+
+    def lt(self, column, value):
+        return self._filter(column, lambda v: v < value)
+
+    def gte(self, column, value):
+        return self._filter(column, lambda v: v >= value)
+
+    def lte(self, column, value):
+        return self._filter(column, lambda v: v <= value)
+
+    def in_(self, column, values):
+        return self._filter(column, lambda v: v in values)
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, count):
+        self.max_rows = count
+        return self
+
+    def insert(self, rows):
+        self.inserted = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def execute(self):
+        if self.inserted is not None:
+            table = self.client.tables.setdefault(self.table, [])
+            created = [dict(r, id=f"{self.table}-{len(table) + i}") for i, r in enumerate(self.inserted)]
+            table.extend(created)
+            self.client.requests.append((self.table, len(created)))
+            return SimpleNamespace(data=[dict(r) for r in created], count=None)
+        rows = [r for r in self.client.tables[self.table] if all(f(r) for f in self.filters)]
+        for column, desc in reversed(self.orders):
+            rows.sort(key=lambda r: r[column], reverse=desc)
+        cap = self.client.max_rows
+        if self.max_rows is not None:
+            cap = min(cap, self.max_rows)
+        rows = rows[:cap]
+        self.client.requests.append((self.table, len(rows)))
+        return SimpleNamespace(data=[dict(r) for r in rows], count=None)
+
+
+class FakeClient:
+    """In-memory tables with a PostgREST-like ``max_rows`` response cap."""
+
+    def __init__(self, tables: Dict[str, List[Dict]], max_rows: int = 1000) -> None:
+        self.tables = tables
+        self.max_rows = max_rows
+        self.requests: List = []
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+
+@pytest.fixture(autouse=True)
+def _empty_caches():
+    clear_caches()
+    yield
+    clear_caches()
@@ -0,0 +1,59 @@
+import datetime
+
+import pandas as pd
+
+from admin_dashboard.bulk_import import BUSINESS_COLUMNS, import_businesses, validate_businesses
+from admin_dashboard.business_directory import BusinessDirectory
+
+from .conftest import FakeClient
+
+
+def _frame(rows):
+    df = pd.DataFrame(rows)
+    df.index = pd.RangeIndex(1, len(df) + 1, name="row")
+    return df
+
+
+def test_dates_are_checked_per_row_not_by_first_row_format():
+    rows = [
+        {"name": "A", "slug": "a", "valid_from": "05/01/2024"},
+        {"name": "B", "slug": "b", "valid_from": "2024-01-05"},
+        {"name": "C", "slug": "c", "valid_from": "2024-01-05T09:30:00"},
+        {"name": "D", "slug": "d", "valid_from": ""},
+    ]
+    for ordered in (rows, rows[::-1]):
+        checked = validate_businesses(_frame(ordered), BusinessDirectory([]), []).set_index("slug")
+
+        assert "valid_from must be an ISO date" in checked.loc["a", "error"]
+        assert checked.loc[["b", "c", "d"], "error"].eq("").all()
+        assert checked.loc["b", "valid_from"] == datetime.date(2024, 1, 5)
+        assert checked.loc["c", "valid_from"] == datetime.date(2024, 1, 5)
+        assert pd.isna(checked.loc["d", "valid_from"])
+
+
+def test_uppercase_slugs_are_rejected_not_rewritten():
+    directory = BusinessDirectory([{"id": "1", "name": "Old", "slug": "taken"}])
+    checked = validate_businesses(
+        _frame([{"name": "A", "slug": "Acme"}, {"name": "B", "slug": "TAKEN"}]), directory, []
+    )
+
+    assert list(checked["slug"]) == ["Acme", "TAKEN"]
+    assert "slug must be lowercase" in checked.loc[1, "error"]
+    assert "slug already exists" in checked.loc[2, "error"]
+
+
+def test_imported_rows_match_the_single_business_form():
+    checked = validate_businesses(
+        _frame([{"name": "Acme", "slug": "acme", "city": "Lahore"}]), BusinessDirectory([]), []
+    )
+    client = FakeClient({"businesses": []})
+
+    report = import_businesses(client, checked)
+
+    assert report.created == 1 and not report.errors
+    row = client.tables["businesses"][0]
+    assert row["country"] == "Pakistan"
+    assert row["city"] == "Lahore"
+    assert row["legal_name"] == ""
+    assert row["is_active"] is True
+    assert set(BUSINESS_COLUMNS) <= set(row)
@@ -0,0 +1,27 @@
+from admin_dashboard import business_directory
+from admin_dashboard.business_directory import get_business_directory
+
+from .conftest import FakeClient
+
+
+def test_directory_loads_every_page(monkeypatch):
+    monkeypatch.setattr(business_directory, "DIRECTORY_PAGE_SIZE", 1000)
+    rows = [{"id": f"b{i:05d}", "name": f"Shop {i}", "slug": f"shop-{i}"} for i in range(2500)]
+    client = FakeClient({"businesses": rows}, max_rows=1000)
+
+    directory = get_business_directory(client)
+
+    assert len(directory.names) == 2500
+    assert directory.name("b02499") == "Shop 2499"
+    assert [count for _, count in client.requests] == [1000, 1000, 500]
+
+
+def test_directory_stops_after_exact_multiple(monkeypatch):
+    monkeypatch.setattr(business_directory, "DIRECTORY_PAGE_SIZE", 2)
+    rows = [{"id": f"b{i}", "name": f"Shop {i}", "slug": f"shop-{i}"} for i in range(4)]
+    client = FakeClient({"businesses": rows})
+
+    directory = get_business_directory(client)
+
+    assert sorted(directory.names) == ["b0", "b1", "b2", "b3"]
+    assert [count for _, count in client.requests] == [2, 2, 0]
@@ -0,0 +1,90 @@
+import sqlite3
+import threading
+
+from admin_dashboard.cache import (
+    TaggedCache,
+    cached_query,
+    invalidate_tables,
+    query_cache,
+    set_shared_cache,
+)
+from admin_dashboard.shared_cache import SharedCache, SQLiteBackend
+
+
+def test_result_computed_across_an_invalidation_is_not_cached():
+    started = threading.Event()
+    release = threading.Event()
+    rows = {"value": "before write"}
+    calls = []
+
+    @cached_query("widgets")
+    def load_widgets():
+        calls.append(1)
+        value = rows["value"]
+        started.set()
+        release.wait(5)
+        return value
+
+    reader = threading.Thread(target=load_widgets)
+    reader.start()
+    assert started.wait(5)
+    # A write lands while the read is still running
+    rows["value"] = "after write"
+    invalidate_tables("widgets")
+    release.set()
+    reader.join()
+
+    assert load_widgets() == "after write"
+    assert len(calls) == 2
+
+
+def test_result_is_cached_without_invalidation():
+    calls = []
+
+    @cached_query("widgets")
+    def load_widgets():
+        calls.append(1)
+        return ["a"]
+
+    assert load_widgets() == ["a"]
+    assert load_widgets() == ["a"]
+    assert len(calls) == 1
+
+
+def test_set_skips_stale_generation_only_for_invalidated_tags():
+    cache = TaggedCache(max_bytes=1 << 20, max_entry_bytes=1 << 16)
+    generation = cache.generation(["a"])
+    cache.invalidate("b")
+    assert cache.set("k1", 1, tags=["a"], ttl=60, generation=generation)
+    cache.invalidate("a")
+    assert not cache.set("k2", 2, tags=["a"], ttl=60, generation=generation)
+    generation = cache.generation(["a"])
+    cache.clear()
+    assert not cache.set("k3", 3, tags=["a"], ttl=60, generation=generation)
+
+
+class _DownBackend(SQLiteBackend):
+    def versions(self, tags):
+        raise sqlite3.OperationalError("database is locked")
+
+
+def test_unreadable_shared_versions_fall_back_to_local_keys(tmp_path):
+    shared = SharedCache(_DownBackend(str(tmp_path / "shared.db"), 1 << 20), 1 << 20)
+    set_shared_cache(shared)
+    calls = []
+
+    @cached_query("widgets")
+    def load_widgets():
+        calls.append(1)
+        return ["a"]
+
+    try:
+        assert shared.version_stamp(["widgets"]) is None
+        assert load_widgets() == ["a"]
+        assert load_widgets() == ["a"]
+        assert load_widgets.peek() == ["a"]
+    finally:
+        set_shared_cache(None)
+
+    assert len(calls) == 1
+    assert [key.rsplit(".", 1)[1] for key in query_cache._entries] == ["load_widgets:[]"]
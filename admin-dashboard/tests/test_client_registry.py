@@ -0,0 +1,48 @@
+import threading
+import time
+
+from admin_dashboard import client_registry
+from admin_dashboard.client_registry import ClientRegistry, PoolSettings
+
+URL = "https://example.supabase.co"
+KEY = "service-role-key"
+
+
+def test_health_probe_does_not_block_other_sessions(monkeypatch):
+    registry = ClientRegistry()
+    settings = PoolSettings(healthcheck_interval=0)
+    first = registry.get(URL, KEY, settings)
+
+    probing = threading.Event()
+    release = threading.Event()
+
+    def slow_probe(self):
+        probing.set()
+        release.wait(5)
+        return True
+
+    monkeypatch.setattr(client_registry._PooledClient, "is_healthy", slow_probe)
+    prober = threading.Thread(target=registry.get, args=(URL, KEY, settings))
+    prober.start()
+    assert probing.wait(5)
+
+    started = time.monotonic()
+    assert registry.get(URL, KEY, settings) is first
+    assert time.monotonic() - started < 1
+
+    release.set()
+    prober.join()
+
+
+def test_unhealthy_client_is_replaced_but_not_closed(monkeypatch):
+    registry = ClientRegistry()
+    settings = PoolSettings(healthcheck_interval=0)
+    old = registry.get(URL, KEY, settings)
+    (old_entry,) = registry._entries.values()
+
+    monkeypatch.setattr(client_registry._PooledClient, "is_healthy", lambda self: False)
+    new = registry.get(URL, KEY, settings)
+
+    assert new is not old
+    assert not old_entry.http_client.is_closed
+    registry.close_all()
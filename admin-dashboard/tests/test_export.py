@@ -0,0 +1,43 @@
+import os
+import time
+
+from admin_dashboard import export
+from admin_dashboard.run_cache import RunFilters
+
+from .conftest import FakeClient
+
+
+def test_sweep_removes_only_old_exports(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_DIR", tmp_path)
+    old = tmp_path / "workflow_runs_old.csv.gz"
+    fresh = tmp_path / "workflow_runs_fresh.csv.gz"
+    unrelated = tmp_path / "notes.txt"
+    for path in (old, fresh, unrelated):
+        path.write_text("x")
+    stale = time.time() - 7200
+    os.utime(old, (stale, stale))
+    os.utime(unrelated, (stale, stale))
+
+    assert export.sweep_exports(max_age=3600) == 1
+    assert not old.exists()
+    assert fresh.exists() and unrelated.exists()
+
+
+def test_export_stops_at_the_size_cap(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_DIR", tmp_path)
+    runs = [{"id": i, "payload": os.urandom(64).hex()} for i in range(3000)]
+
+    def fetch_keyset_page(query, page_size, cursor, sort_column):
+        offset = cursor or 0
+        rows = runs[offset : offset + page_size]
+        return rows, (offset + page_size if offset + page_size < len(runs) else None)
+
+    monkeypatch.setattr(export, "fetch_keyset_page", fetch_keyset_page)
+    client = FakeClient({"workflow_runs": []})
+
+    path, written, truncated = export.export_runs(client, RunFilters(), page_size=500, max_bytes=1)
+    assert truncated and written == 500
+    path.unlink()
+
+    path, written, truncated = export.export_runs(client, RunFilters(), page_size=500)
+    assert not truncated and written == 3000
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from admin_dashboard.supabase_utils import (
+    format_datetime,
+    format_datetime_series,
+    format_duration,
+    format_duration_series,
+)
+
+TIMESTAMPS = [
+    "2024-05-01T10:20:30+00:00",
+    "2024-05-01T10:20:30Z",
+    "2024-05-01T10:20:30.123456+00:00",
+    "2024-05-01T23:59:59+05:30",
+    "2024-05-01T00:10:00-08:00",
+    "2024-05-01 10:20:30",
+    "2024-05-01",
+    "not a date",
+    "",
+    None,
+]
+
+DURATIONS = [0, 5, 999, 523.5, 0.1234567, 1000, 1500, 59999, 60000, 90000, 3_600_000, None]
+
+
+@pytest.mark.parametrize("values", [TIMESTAMPS, TIMESTAMPS[:5], [None, None]])
+def test_datetime_series_matches_scalar(values):
+    series = pd.Series(values, dtype=object)
+    assert format_datetime_series(series).tolist() == [format_datetime(v) for v in values]
+
+
+def test_datetime_series_keeps_index():
+    series = pd.Series(TIMESTAMPS[:3], index=[7, 3, 5])
+    assert format_datetime_series(series).index.tolist() == [7, 3, 5]
+
+
+@pytest.mark.parametrize(
+    "series",
+    [
+        pd.Series(DURATIONS, dtype=object),
+        pd.Series(DURATIONS, dtype="float64"),
+        pd.Series([5, 1500, 90000]),
+    ],
+)
+def test_duration_series_matches_scalar(series):
+    assert format_duration_series(series).tolist() == series.map(format_duration).tolist()
+
+
+def test_nan_duration_is_na():
+    assert format_duration(np.nan) == "N/A"
+
+
+@pytest.mark.parametrize("dtype", [object, "float64"])
+def test_empty_series(dtype):
+    empty = pd.Series([], dtype=dtype)
+    assert format_datetime_series(empty).tolist() == []
+    assert format_duration_series(empty).tolist() == []
@@ -0,0 +1,24 @@
+import json
+import threading
+import time
+
+from admin_dashboard import instrumentation
+from admin_dashboard.instrumentation import QueryRecord
+
+
+def test_query_log_is_written_without_holding_the_stats_lock(tmp_path, monkeypatch):
+    path = tmp_path / "queries.jsonl"
+    monkeypatch.setattr(instrumentation, "_query_log", instrumentation._query_logger(str(path)))
+    lock = threading.Lock()
+    monkeypatch.setattr(instrumentation, "_lock", lock)
+
+    # Hold the stats lock after the record is queued: the writer must not need it
+    instrumentation.record(QueryRecord(signature="GET businesses", source="http", duration_ms=12.5))
+    with lock:
+        deadline = time.monotonic() + 5
+        while not (path.exists() and path.read_text()) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    (line,) = path.read_text().splitlines()
+    assert json.loads(line)["signature"] == "GET businesses"
+    assert json.loads(line)["duration_ms"] == 12.5
@@ -0,0 +1,31 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from admin_dashboard.lookups import fetch_by_ids
+from admin_dashboard.supabase_utils import _in_query_pool, _submit
+
+from .conftest import FakeClient, FakeQuery
+
+
+def test_missing_ids_from_pandas_are_not_sent(monkeypatch):
+    sent = []
+    original = FakeQuery.in_
+
+    def in_(self, column, values):
+        sent.extend(values)
+        return original(self, column, values)
+
+    monkeypatch.setattr(FakeQuery, "in_", in_)
+    client = FakeClient({"businesses": [{"id": "a", "name": "Acme"}]})
+    ids = pd.Series(["a", np.nan, None, "a"], dtype=object)
+
+    assert fetch_by_ids(client, "businesses", ids) == {"a": {"id": "a", "name": "Acme"}}
+    assert sent == ["a"]
+    assert not any(isinstance(v, float) and math.isnan(v) for v in sent)
+
+
+def test_pool_threads_are_flagged_explicitly():
+    assert not _in_query_pool()
+    assert _submit(_in_query_pool).result(timeout=5)
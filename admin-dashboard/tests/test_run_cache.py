@@ -0,0 +1,59 @@
+import pytest
+from postgrest.exceptions import APIError
+
+from admin_dashboard.run_cache import IncrementalRunCache, RunFilters
+
+from .conftest import FakeClient, FakeQuery
+
+RUNS = [
+    {"id": f"r{i}", "status": "Succeeded", "start_time": f"2024-05-01T10:{i:02d}:00+00:00"}
+    for i in range(5)
+]
+
+
+class NoUpdatedAtQuery(FakeQuery):
+    """``workflow_runs`` before migration 002: selecting updated_at fails."""
+
+    def select(self, columns="*", count=None, head=None):
+        if "updated_at" in columns:
+            self.client.requests.append(("rejected", columns))
+            raise APIError(
+                {"code": "42703", "message": "column workflow_runs.updated_at does not exist"}
+            )
+        return super().select(columns, count, head)
+
+
+class NoUpdatedAtClient(FakeClient):
+    def table(self, name):
+        return NoUpdatedAtQuery(self, name)
+
+
+def test_missing_updated_at_falls_back_to_full_reloads():
+    client = NoUpdatedAtClient({"workflow_runs": RUNS})
+    cache = IncrementalRunCache()
+
+    first = cache.fetch(client, RunFilters(), limit=3, columns="id, status, start_time")
+    second = cache.fetch(client, RunFilters(), limit=3, columns="id, status, start_time")
+
+    assert [r["id"] for r in first] == ["r4", "r3", "r2"]
+    assert second == first
+    assert not cache.has_updated_at
+    # Only the first query asked for the missing column
+    assert [r for r in client.requests if r[0] == "rejected"] == [
+        ("rejected", "id, status, start_time, updated_at")
+    ]
+
+
+def test_other_errors_propagate():
+    class BrokenQuery(FakeQuery):
+        def execute(self):
+            raise APIError({"code": "57014", "message": "canceling statement due to timeout"})
+
+    class BrokenClient(FakeClient):
+        def table(self, name):
+            return BrokenQuery(self, name)
+
+    cache = IncrementalRunCache()
+    with pytest.raises(APIError):
+        cache.fetch(BrokenClient({"workflow_runs": RUNS}), RunFilters(), columns="id")
+    assert cache.has_updated_at
@@ -0,0 +1,33 @@
+import time as time_module
+from datetime import datetime, timedelta, timezone
+
+from admin_dashboard import aggregates
+from admin_dashboard.tiles import plan_buckets
+
+
+def test_window_start_is_utc(monkeypatch):
+    monkeypatch.setenv("TZ", "America/New_York")
+    if hasattr(time_module, "tzset"):
+        time_module.tzset()
+    try:
+        expected = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=7)
+        since = aggregates.window_start(days=7)
+    finally:
+        monkeypatch.delenv("TZ")
+        if hasattr(time_module, "tzset"):
+            time_module.tzset()
+    assert since.tzinfo is None
+    assert abs(since - expected) <= timedelta(minutes=aggregates.WINDOW_STEP_MINUTES)
+
+
+def test_plan_uses_hours_for_partial_days_and_days_otherwise():
+    now = datetime(2024, 5, 10, 14, 30)
+    plan = plan_buckets(datetime(2024, 5, 7, 21, 10), now, now)
+    assert plan == [
+        ("hour", datetime(2024, 5, 7, 21)),
+        ("hour", datetime(2024, 5, 7, 22)),
+        ("hour", datetime(2024, 5, 7, 23)),
+        ("day", datetime(2024, 5, 8)),
+        ("day", datetime(2024, 5, 9)),
+        ("day", datetime(2024, 5, 10)),
+    ]
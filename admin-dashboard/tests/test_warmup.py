@@ -0,0 +1,17 @@
+from admin_dashboard import warmup
+
+
+def test_cli_skips_process_local_datasets(monkeypatch):
+    ran = []
+
+    def run_warmup(names, on_progress=None):
+        ran.extend(names)
+        return warmup.WarmupStatus(state="done", total_ms=0)
+
+    monkeypatch.setenv("SHARED_CACHE_PATH", "/tmp/shared.db")
+    monkeypatch.delenv("WARMUP_DATASETS", raising=False)
+    monkeypatch.setattr(warmup, "run_warmup", run_warmup)
+
+    assert warmup.main(["--on-start"]) == 0
+    assert "run_tiles" not in ran
+    assert set(ran) == set(warmup.DATASETS) - warmup.PROCESS_LOCAL_DATASETS